@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Benchmark: plate Bloom filter build/load cost, memory and measured false-positive rate.
+
+Run from the project root:
+  python benchmarks/bench_plate_filter.py [--sizes 1000 10000 100000] [--fpr 0.01]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.matching import PlateFilter
+
+
+def make_plates(n, seed, prefix=""):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+    plates = set()
+    while len(plates) < n:
+        plates.add(prefix + "".join(rng.choice(alphabet) for _ in range(7)))
+    return list(plates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--fpr", type=float, default=0.01)
+    parser.add_argument("--probes", type=int, default=20000)
+    args = parser.parse_args()
+
+    misses = make_plates(args.probes, seed=2, prefix="Q")
+    print(f"target false-positive rate {args.fpr}, {args.probes} unknown plates probed\n")
+    print(f"  {'plates':>8} {'KiB':>8} {'k':>3} {'build ms':>9} {'load ms':>8} "
+          f"{'fp rate':>8} {'miss us':>8} {'set us':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            plates = make_plates(n, seed=1)
+            plate_filter = PlateFilter.for_plates(plates, args.fpr, headroom=1.0)
+            path = os.path.join(tmp, f"{n}.bloom")
+            plate_filter.save(path, (n,))
+            start = time.perf_counter()
+            loaded = PlateFilter.load(path, (n,))
+            load_ms = (time.perf_counter() - start) * 1000
+            rate = sum(p in loaded for p in misses) / len(misses)
+            lookup = min(timeit.repeat(lambda: [p in loaded for p in misses], number=1, repeat=3))
+            snapshot = frozenset(plates)
+            set_lookup = min(timeit.repeat(
+                lambda: [p.strip().upper() in snapshot for p in misses], number=1, repeat=3
+            ))
+            print(f"  {n:>8} {plate_filter.size / 1024:8.1f} {plate_filter.hashes:>3} "
+                  f"{plate_filter.build_seconds * 1000:9.1f} {load_ms:8.2f} {rate:8.4f} "
+                  f"{lookup / len(misses) * 1e6:8.2f} {set_lookup / len(misses) * 1e6:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
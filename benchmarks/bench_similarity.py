@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Benchmark: per-pair cost of the plate similarity backends.
+
+Run from the project root:
+  python benchmarks/bench_similarity.py [--pairs 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.matching.similarity import SIMILARITY_BACKENDS, index_positions, sequence_ratio
+
+
+def make_pairs(n, seed=0):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+    pairs = []
+    for _ in range(n):
+        plate = "".join(rng.choice(alphabet) for _ in range(rng.randint(5, 10)))
+        ocr = list(plate)
+        for _ in range(rng.randint(0, 2)):
+            ocr[rng.randrange(len(ocr))] = rng.choice(alphabet)
+        pairs.append(("".join(ocr), plate))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.pairs)
+    indexed = [(a, b, index_positions(b)) for a, b in pairs]
+    cases = {name: (lambda fn=fn: [fn(a, b) for a, b in pairs]) for name, fn in SIMILARITY_BACKENDS.items()}
+    cases["compat (cached b2j)"] = lambda: [sequence_ratio(a, b, b2j) for a, b, b2j in indexed]
+
+    mismatches = sum(
+        SIMILARITY_BACKENDS["difflib"](a, b) != sequence_ratio(a, b, b2j) for a, b, b2j in indexed
+    )
+    print(f"{len(pairs)} OCR/plate pairs, best of {args.repeat}; compat mismatches vs difflib: {mismatches}\n")
+    baseline = None
+    print(f"  {'backend':<22} {'us/pair':>8} {'speedup':>8}")
+    for name, run in cases.items():
+        per_pair = min(timeit.repeat(run, number=1, repeat=args.repeat)) / len(pairs) * 1e6
+        baseline = baseline or per_pair
+        print(f"  {name:<22} {per_pair:8.2f} {baseline / per_pair:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
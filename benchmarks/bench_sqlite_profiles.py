@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark: concurrent read/write throughput of VehicleDB per PRAGMA profile.
+
+One writer thread logs detection events (like the detector) while reader
+threads poll recent events and check plates (like the dashboard).
+
+Run from the project root:
+  python benchmarks/bench_sqlite_profiles.py [--seconds 3] [--readers 4]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database import PRAGMA_PROFILES, VehicleDB
+
+
+def run_profile(profile, seconds, readers):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    db = VehicleDB(path, profile=profile, pool_size=readers + 1)
+    for i in range(200):
+        db.add_vehicle(f"BEN{i:04d}")
+    stop = threading.Event()
+    writes = [0]
+    reads = [0] * readers
+    read_latencies = [[] for _ in range(readers)]
+
+    def writer():
+        while not stop.is_set():
+            db.log_detection_event("vehicle_detected", 8.5)
+            writes[0] += 1
+
+    def reader(n):
+        while not stop.is_set():
+            start = time.perf_counter()
+            db.get_recent_events(limit=50)
+            db.is_authorized(f"BEN{n:04d}")
+            read_latencies[n].append(time.perf_counter() - start)
+            reads[n] += 1
+
+    threads = [threading.Thread(target=writer)] + [
+        threading.Thread(target=reader, args=(n,)) for n in range(readers)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    stats = db.get_storage_stats()
+    db.close()
+    for leftover in glob.glob(path + "*"):
+        os.remove(leftover)
+    latencies = sorted(x for per_thread in read_latencies for x in per_thread)
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float('nan')
+    return writes[0] / seconds, sum(reads) / seconds, p95, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--profiles", nargs="+", default=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    print(f"1 writer + {args.readers} readers, {args.seconds:g}s per profile\n")
+    print(f"  {'profile':<10} {'journal':<8} {'sync':>4} {'writes/s':>9} {'reads/s':>9} {'read p95 ms':>12}")
+    for profile in args.profiles:
+        w, r, p95, stats = run_profile(profile, args.seconds, args.readers)
+        print(f"  {profile:<10} {stats['journal_mode']:<8} {stats['synchronous']:>4} "
+              f"{w:9.0f} {r:9.0f} {p95:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
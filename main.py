@@ -23,12 +23,11 @@ def initialize_system():
     db = VehicleDB("smartgate.db")
     
     print_info("Setting up authorized vehicles...")
-    for plate in ["ABC123", "XYZ789", "DEF456"]:
-        db.add_vehicle(plate)
+    db.bulk_import(["ABC123", "XYZ789", "DEF456"])
     print_success(f"3 vehicles authorized")
     
-    def log_to_db(event):
-        db.log_detection_event(event['type'], event['data'].get('distance'))
+    # Queued and written in batches by a background thread, so detection never waits on disk
+    log_to_db = db.get_event_writer()
     
     detector.on_vehicle_detected(print_event)
     detector.on_vehicle_detected(log_to_db)
@@ -49,6 +48,8 @@ def show_main_menu():
         ("5", "View Vehicles", "List all authorized vehicles"),
         ("6", "Check Plate", "Check if plate is authorized"),
         ("7", "Web Dashboard", "Open web dashboard"),
+        ("8", "Import Vehicles", "Authorize plates from a CSV/JSONL file"),
+        ("9", "Export Vehicles", "Save authorized plates to a CSV/JSONL file"),
         ("0", "Exit", "Exit application"),
     ]
     
@@ -107,6 +108,18 @@ def main():
                 print_info("Dashboard will be available at: http://localhost:5000")
                 print_warning("Press Ctrl+C in the dashboard terminal to stop")
                 start_dashboard(db)
+            elif choice == "8":
+                path = input(f"{Colors.CYAN}File to import (.csv/.jsonl): {Colors.RESET}").strip()
+                if path:
+                    command_handler.handle_import(path)
+                else:
+                    print_warning("No file provided")
+            elif choice == "9":
+                path = input(f"{Colors.CYAN}File to export (.csv/.jsonl): {Colors.RESET}").strip()
+                if path:
+                    command_handler.handle_export(path)
+                else:
+                    print_warning("No file provided")
             else:
                 print_warning("Invalid option. Please select a number from the menu.")
         
@@ -116,6 +129,8 @@ def main():
         except Exception as e:
             print_error(f"Error: {e}")
     
+    detector.close()
+    db.close()
     print_header("System Shutdown Complete")
 
 
@@ -32,15 +32,24 @@ picam2 = None
 
 
 # ---------------- DATABASE ----------------
+_plates_conn = None
+_plates_cache = (None, ())  # (PRAGMA data_version, plates)
+
+
 def get_authorized_plates():
-    conn = sqlite3.connect(DB_FILE)
-    try:
-        c = conn.cursor()
-        c.execute("SELECT plate FROM authorized_plates")
-        results = [row[0].upper() for row in c.fetchall()]
-        return results
-    finally:
-        conn.close()
+    """
+    Authorized plates as a tuple. The table is only re-read when PRAGMA data_version
+    shows another connection committed since the last call; the same tuple is
+    returned otherwise, so decide_gate_action reuses its compiled matcher.
+    """
+    global _plates_conn, _plates_cache
+    if _plates_conn is None:
+        _plates_conn = sqlite3.connect(DB_FILE)
+    version = _plates_conn.execute("PRAGMA data_version").fetchone()[0]
+    if version != _plates_cache[0]:
+        c = _plates_conn.execute("SELECT plate FROM authorized_plates")
+        _plates_cache = (version, tuple(row[0].upper() for row in c.fetchall()))
+    return _plates_cache[1]
 
 
 # ---------------- SERVO ----------------
@@ -321,6 +330,8 @@ def main():
         if picam2 is not None:
             picam2.stop()
         cv2.destroyAllWindows()
+        if _plates_conn is not None:
+            _plates_conn.close()
 
 
 if __name__ == "__main__":
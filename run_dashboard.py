@@ -12,7 +12,9 @@ _TEMPLATES = os.path.join(_SCRIPT_DIR, 'templates')
 
 from flask import Flask, render_template, jsonify, request
 from src.database import VehicleDB
-from src.common.dashboard import SCENARIOS, run_scenario
+from src.common.dashboard import (
+    SCENARIOS, run_scenario, import_vehicles_upload, export_vehicles_response, query_events,
+)
 
 app = Flask(__name__, template_folder=_TEMPLATES)
 db = VehicleDB("smartgate.db")
@@ -28,14 +30,38 @@ def dashboard():
 
 @app.route('/api/events')
 def api_events():
-    """API endpoint for events."""
-    return jsonify(db.get_recent_events(limit=50))
+    """API endpoint for events: latest 50; ?after=<id> returns only newer ones (oldest first),
+    ?before=<id> pages back through history (newest first). ?limit= caps the page (max 1000).
+    """
+    return jsonify(query_events(db, request.args))
 
 @app.route('/api/vehicles')
 def api_vehicles():
     """API endpoint for vehicles."""
     return jsonify(db.get_all_vehicles())
 
+@app.route('/api/vehicles/import', methods=['POST'])
+def api_vehicles_import():
+    """Bulk-authorize plates from an uploaded CSV/JSONL file (form field 'file'; ?format= overrides
+    the extension). Returns counts of inserted, duplicate and rejected rows.
+    """
+    upload = request.files.get('file')
+    if not upload or upload.filename == '':
+        return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+    try:
+        report = import_vehicles_upload(db, upload, request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **report.to_dict()})
+
+@app.route('/api/vehicles/export')
+def api_vehicles_export():
+    """Download all authorized vehicles, streamed; ?format=csv (default) or jsonl."""
+    try:
+        return export_vehicles_response(db, request.args.get('format', 'csv'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/api/scenarios')
 def api_scenarios():
     """API endpoint for scenario list (for future scenario simulation with real imagery)."""
@@ -52,8 +78,8 @@ def api_vision_check():
     """Run plate OCR on uploaded image and check authorization.
     Optional form field 'backend': 'tesseract' (default) or 'easyocr'.
     """
-    from src.vision import ocr_from_bytes, ocr_available
-    from src.fuzzy_logic import check_plate_authorization
+    from src.vision import ocr_candidates_from_bytes, ocr_available
+    from src.fuzzy_logic import check_plate_candidates
 
     backend = (request.form.get('backend') or request.args.get('backend') or 'tesseract').strip().lower()
     if backend == 'easyocr':
@@ -78,7 +104,7 @@ def api_vision_check():
         if not file or file.filename == '':
             return jsonify({'success': False, 'error': 'No image file uploaded'}), 400
         data = file.read()
-        plate_text, err = ocr_from_bytes(data)
+        candidates, err = ocr_candidates_from_bytes(data)
     finally:
         if backend == 'easyocr' and prev is not None:
             os.environ.pop('SMARTGATE_OCR_BACKEND', None)
@@ -87,18 +113,23 @@ def api_vision_check():
 
     if err is not None:
         return jsonify({'success': False, 'error': err}), 200
-    authorized_plates = [v['plate_number'] for v in db.get_all_vehicles()]
+    plate_text = candidates[0]
+    matcher = db.get_matcher()
     if db.is_authorized(plate_text):
         return jsonify({
             'success': True, 'plate': plate_text, 'authorized': True,
             'match': plate_text, 'score': 1.0, 'similar': []
         })
-    ok, match, score = check_plate_authorization(plate_text, authorized_plates or None, threshold=0.85)
-    similar = db.find_similar_plates(plate_text, threshold=0.5)
-    similar_list = [{'plate': p, 'score': s} for p, s in similar[:5]]
+    # Score every OCR reading at once; report the one that matched best
+    ok, candidate, match, score = check_plate_candidates(candidates, matcher or None, threshold=0.85)
+    if ok:
+        plate_text = candidate
+    similar = db.find_similar_plates(plate_text, threshold=0.5, limit=5)
+    similar_list = [{'plate': p, 'score': s} for p, s in similar]
     return jsonify({
         'success': True, 'plate': plate_text, 'authorized': ok,
-        'match': match or '', 'score': round(score, 2), 'similar': similar_list
+        'match': match or '', 'score': round(score, 2), 'similar': similar_list,
+        'candidates': candidates
     })
 
 if __name__ == '__main__':
@@ -111,4 +142,7 @@ if __name__ == '__main__':
     print("\nPress Ctrl+C to stop the server\n")
     print("="*70 + "\n")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    try:
+        app.run(host='0.0.0.0', port=5000, debug=True)
+    finally:
+        db.close()
@@ -4,6 +4,7 @@ import time
 from src.vehicle_detection import MockSensor, VehicleDetector
 from src.vehicle_detection.detector import VEHICLE_DETECTED
 from src.database import VehicleDB
+from src.database.bulk import format_from_path, read_plates
 from .colors import Colors, print_info, print_success, print_warning, print_error
 
 
@@ -50,6 +51,38 @@ class CommandHandler:
         else:
             print_warning("No authorized vehicles")
     
+    def handle_import(self, path: str):
+        """Authorize every plate in a CSV or JSONL file."""
+        try:
+            fmt = format_from_path(path)
+            with open(path, newline='', encoding='utf-8') as f:
+                report = self.db.bulk_import(read_plates(f, fmt))
+        except (OSError, ValueError) as e:
+            print_error(f"Import failed: {e}")
+            return
+        print_success(f"Imported {report.inserted} vehicles from {path}")
+        if report.duplicates:
+            print_info(f"{report.duplicates} already authorized (skipped)")
+        if report.rejected:
+            print_warning(f"{report.rejected} rows rejected:")
+            for row, reason in report.errors[:10]:
+                print(f"  {Colors.DIM}row {row}: {reason}{Colors.RESET}")
+    
+    def handle_export(self, path: str):
+        """Write all authorized vehicles to a CSV or JSONL file."""
+        try:
+            fmt = format_from_path(path)
+            count = 0
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                for line in self.db.bulk_export(fmt):
+                    f.write(line)
+                    count += 1
+        except (OSError, ValueError) as e:
+            print_error(f"Export failed: {e}")
+            return
+        vehicles = count - 1 if fmt == "csv" else count
+        print_success(f"Exported {vehicles} vehicles to {path}")
+    
     def handle_check(self, plate: str):
         """Check if plate is authorized."""
         plate = plate.strip().upper()
@@ -1,5 +1,6 @@
 """Web dashboard launcher."""
 
+import io
 import os
 
 from .colors import print_success, print_info, print_error
@@ -22,14 +23,33 @@ SCENARIOS = [
 ]
 
 
+# /api/events page size: default and cap (the cap also keeps a negative ?limit= from meaning "no limit")
+EVENTS_PAGE_SIZE = 50
+MAX_EVENTS_PAGE_SIZE = 1000
+
+
+def query_events(db, args):
+    """
+    Events for /api/events query args: the latest page; after=<id> returns only newer
+    ones (oldest first), before=<id> pages back (newest first). limit is clamped to 1..1000.
+    """
+    after = args.get('after', type=int)
+    before = args.get('before', type=int)
+    limit = max(1, min(args.get('limit', EVENTS_PAGE_SIZE, type=int), MAX_EVENTS_PAGE_SIZE))
+    if after is not None:
+        return db.get_events_since(after, limit=limit)
+    if before is not None:
+        return db.get_events_before(before, limit=limit)
+    return db.get_recent_events(limit=limit)
+
+
 def run_scenario(db, scenario_id: str):
     """Run a scenario (mock sensor + detector), log events to db. Returns (success, message)."""
     from src.vehicle_detection import MockSensor, VehicleDetector
     sensor = MockSensor(mode="manual")
     detector = VehicleDetector(sensor, threshold_cm=10.0)
 
-    def log_event(event):
-        db.log_detection_event(event["type"], event["data"].get("distance"))
+    log_event = db.get_event_writer()
 
     detector.on_vehicle_detected(log_event)
     detector.on_no_vehicle(log_event)
@@ -50,10 +70,32 @@ def run_scenario(db, scenario_id: str):
     for step in scenario:
         sensor.set_distance(step["distance"])
         detector.check()
+    # Make the scenario's events visible to the next /api/events poll
+    log_event.flush(timeout=2.0)
 
     return True, f"Scenario '{scenario_id}' completed"
 
 
+def import_vehicles_upload(db, upload, fmt=None):
+    """Bulk-import an uploaded CSV/JSONL file (streamed, not read into memory). Returns an ImportReport."""
+    from src.database.bulk import format_from_path, read_plates
+    fmt = format_from_path(upload.filename or "", fmt)
+    lines = io.TextIOWrapper(upload.stream, encoding='utf-8', newline='')
+    return db.bulk_import(read_plates(lines, fmt))
+
+
+def export_vehicles_response(db, fmt="csv"):
+    """Streaming Flask response with every authorized vehicle as CSV or JSONL."""
+    from flask import Response
+    from src.database.bulk import format_from_path
+    fmt = format_from_path("", fmt)
+    mimetype = 'text/csv' if fmt == "csv" else 'application/x-ndjson'
+    return Response(
+        db.bulk_export(fmt), mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=vehicles.{fmt}'}
+    )
+
+
 def start_dashboard(db):
     """Start the web dashboard."""
     try:
@@ -70,12 +112,31 @@ def start_dashboard(db):
         
         @app.route('/api/events')
         def api_events():
-            return jsonify(db.get_recent_events(limit=50))
+            """Latest events; ?after=<id> returns only newer ones (oldest first), ?before=<id> pages back."""
+            return jsonify(query_events(db, request.args))
         
         @app.route('/api/vehicles')
         def api_vehicles():
             return jsonify(db.get_all_vehicles())
 
+        @app.route('/api/vehicles/import', methods=['POST'])
+        def api_vehicles_import():
+            upload = request.files.get('file')
+            if not upload or upload.filename == '':
+                return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+            try:
+                report = import_vehicles_upload(db, upload, request.args.get('format'))
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            return jsonify({'success': True, **report.to_dict()})
+
+        @app.route('/api/vehicles/export')
+        def api_vehicles_export():
+            try:
+                return export_vehicles_response(db, request.args.get('format', 'csv'))
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+
         @app.route('/api/scenarios')
         def api_scenarios():
             return jsonify(SCENARIOS)
@@ -88,30 +149,35 @@ def start_dashboard(db):
         @app.route('/api/vision/check', methods=['POST'])
         def api_vision_check():
             """Run plate OCR on uploaded image and check authorization."""
-            from src.vision import ocr_from_bytes, ocr_available
-            from src.fuzzy_logic import check_plate_authorization
+            from src.vision import ocr_candidates_from_bytes, ocr_available
+            from src.fuzzy_logic import check_plate_candidates
             if not ocr_available():
                 return jsonify({'success': False, 'error': 'OCR not available (install pytesseract and Tesseract)'}), 503
             file = request.files.get('image')
             if not file or file.filename == '':
                 return jsonify({'success': False, 'error': 'No image file uploaded'}), 400
             data = file.read()
-            plate_text, err = ocr_from_bytes(data)
+            candidates, err = ocr_candidates_from_bytes(data)
             if err is not None:
                 return jsonify({'success': False, 'error': err}), 200
-            authorized_plates = [v['plate_number'] for v in db.get_all_vehicles()]
+            plate_text = candidates[0]
+            matcher = db.get_matcher()
             authorized_direct = db.is_authorized(plate_text)
             if authorized_direct:
                 return jsonify({
                     'success': True, 'plate': plate_text, 'authorized': True,
                     'match': plate_text, 'score': 1.0, 'similar': []
                 })
-            ok, match, score = check_plate_authorization(plate_text, authorized_plates or None, threshold=0.85)
-            similar = db.find_similar_plates(plate_text, threshold=0.5)
-            similar_list = [{'plate': p, 'score': s} for p, s in similar[:5]]
+            # Score every OCR reading at once; report the one that matched best
+            ok, candidate, match, score = check_plate_candidates(candidates, matcher or None, threshold=0.85)
+            if ok:
+                plate_text = candidate
+            similar = db.find_similar_plates(plate_text, threshold=0.5, limit=5)
+            similar_list = [{'plate': p, 'score': s} for p, s in similar]
             return jsonify({
                 'success': True, 'plate': plate_text, 'authorized': ok,
-                'match': match or '', 'score': round(score, 2), 'similar': similar_list
+                'match': match or '', 'score': round(score, 2), 'similar': similar_list,
+                'candidates': candidates
             })
 
         def run_flask():
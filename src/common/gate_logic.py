@@ -4,12 +4,16 @@ This module stays pure (no GPIO/camera access) so it can be tested on any platfo
 """
 
 from dataclasses import dataclass
-from difflib import SequenceMatcher
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Union
+
+from src.matching import DecisionCache, PlateMatcher, get_plate_matcher
 
 
 GateStatus = Literal["NO_PLATE", "AUTHORIZED_OPEN", "AUTHORIZED_FAR", "UNAUTHORIZED"]
 
+# (best match, similarity) per (plate text, authorized-list state); see decision_cache.info()
+decision_cache = DecisionCache(maxsize=1024)
+
 
 @dataclass
 class GateDecision:
@@ -22,34 +26,33 @@ class GateDecision:
 def decide_gate_action(
     plate_text: Optional[str],
     distance_cm: float,
-    authorized_plates: List[str],
+    authorized_plates: Union[List[str], PlateMatcher],
     open_distance_cm: float,
     fuzzy_threshold: float = 0.90,
+    use_cache: bool = True,
 ) -> GateDecision:
     """
     Decide what the gate should do based on OCR plate text and distance.
 
     - plate_text: raw plate string from OCR (may be None/empty)
     - distance_cm: current distance from sensor
-    - authorized_plates: list of known authorized plate strings
+    - authorized_plates: list of known authorized plate strings, or a prebuilt PlateMatcher
     - open_distance_cm: distance threshold at/below which gate may open
     - fuzzy_threshold: minimum similarity for fuzzy authorization (0..1)
+    - use_cache: reuse the match for a repeated plate text while the authorized list is unchanged
     """
     normalized = (plate_text or "").strip().upper()
     if not normalized:
         return GateDecision(status="NO_PLATE", plate=None, match=None, similarity=0.0)
 
-    best_match: Optional[str] = None
-    best_ratio: float = 0.0
-
-    for auth in authorized_plates:
-        candidate = auth.strip().upper()
-        if not candidate:
-            continue
-        ratio = SequenceMatcher(None, normalized, candidate).ratio()
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = candidate
+    matcher = get_plate_matcher(authorized_plates)
+    if use_cache:
+        key = (normalized, matcher.uid, matcher.version)
+        best_match, best_ratio = decision_cache.get_or_compute(
+            key, lambda: matcher.best_match(normalized, stop_on_exact=True)
+        )
+    else:
+        best_match, best_ratio = matcher.best_match(normalized, stop_on_exact=True)
 
     if best_match is not None and best_ratio >= fuzzy_threshold:
         if distance_cm <= open_distance_cm:
@@ -7,6 +7,6 @@ so that sensors and storage can be swapped (mock vs real hardware) without
 changing business logic.
 """
 
-from .protocols import DistanceSensor, PlateStorage
+from .protocols import AsyncPlateStorage, DistanceSensor, PlateStorage
 
-__all__ = ["DistanceSensor", "PlateStorage"]
+__all__ = ["DistanceSensor", "PlateStorage", "AsyncPlateStorage"]
@@ -0,0 +1,59 @@
+"""Bounded Queue - Non-blocking queue that drops events instead of stalling the producer."""
+
+import queue
+import time
+from typing import Any, Optional
+
+# Overflow policies when the queue is full: discard the incoming item or the oldest queued one
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+OVERFLOW_POLICIES = (DROP_NEWEST, DROP_OLDEST)
+# Used by every event queue (EventWriter, detector listeners): under overload the latest readings matter most
+DEFAULT_OVERFLOW = DROP_OLDEST
+
+
+class BoundedQueue(queue.Queue):
+    """
+    queue.Queue whose offer() never blocks.
+
+    When the queue is full, `overflow` decides whether the incoming item or
+    the oldest queued one is discarded. A discarded queued item is marked
+    done, so unfinished_tasks and wait_empty() stay accurate.
+    """
+
+    def __init__(self, maxsize: int, overflow: str = DEFAULT_OVERFLOW):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        super().__init__(maxsize=maxsize)
+        self.overflow = overflow
+
+    def offer(self, item: Any) -> bool:
+        """Queue item without waiting. Returns False if it (or, with drop_oldest, an older one) was dropped."""
+        try:
+            self.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        if self.overflow == DROP_OLDEST:
+            try:
+                self.get_nowait()
+                self.task_done()
+            except queue.Empty:
+                pass
+            try:
+                self.put_nowait(item)
+            except queue.Full:
+                pass
+        return False
+
+    def wait_empty(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued item was marked done. Returns False on timeout."""
+        if timeout is None:
+            self.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.002)
+        return True
@@ -4,9 +4,10 @@ Ports (interfaces) for SmartGate-IoT — Ports & Adapters (Hexagonal) design.
 Implementations:
 - DistanceSensor: src.vehicle_detection.sensor_mock.MockSensor (and future real sensor adapter)
 - PlateStorage: src.database.vehicle_db.VehicleDB
+- AsyncPlateStorage: src.database.async_db.AsyncVehicleDB
 """
 
-from typing import Protocol, List, Optional, Tuple
+from typing import Iterable, Protocol, List, Optional, Tuple
 
 
 class DistanceSensor(Protocol):
@@ -48,8 +49,62 @@ class PlateStorage(Protocol):
         """Return recent detection events."""
         ...
 
+    def get_events_before(self, before_id: Optional[int] = None, limit: int = 50) -> List[dict]:
+        """Return up to limit events older than before_id, newest first."""
+        ...
+
+    def get_events_since(self, after_id: int = 0, limit: int = 1000) -> List[dict]:
+        """Return events newer than after_id, oldest first."""
+        ...
+
     def find_similar_plates(
-        self, plate_number: str, threshold: float = 0.85
+        self, plate_number: str, threshold: float = 0.85, limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """Return list of (plate, similarity) for fuzzy matching, best first (at most `limit`)."""
+        ...
+
+
+class AsyncPlateStorage(Protocol):
+    """PlateStorage for asyncio code: the same operations, awaitable, never blocking the event loop."""
+
+    async def is_authorized(self, plate_number: str) -> bool:
+        """Return True if the plate is authorized."""
+        ...
+
+    async def get_all_vehicles(self) -> List[dict]:
+        """Return all authorized vehicles."""
+        ...
+
+    async def add_vehicle(self, plate_number: str) -> bool:
+        """Add a plate. Return True if added."""
+        ...
+
+    async def remove_vehicle(self, plate_number: str) -> bool:
+        """Remove a plate. Return True if removed."""
+        ...
+
+    async def bulk_import(self, plates: Iterable, chunk_size: int = 1000):
+        """Add many plates; return a report of inserted, duplicate and rejected rows."""
+        ...
+
+    async def log_detection_event(self, event_type: str, distance: Optional[float] = None) -> None:
+        """Log a detection event."""
+        ...
+
+    async def get_recent_events(self, limit: int = 50) -> List[dict]:
+        """Return recent detection events."""
+        ...
+
+    async def get_events_before(self, before_id: Optional[int] = None, limit: int = 50) -> List[dict]:
+        """Return up to limit events older than before_id, newest first."""
+        ...
+
+    async def get_events_since(self, after_id: int = 0, limit: int = 1000) -> List[dict]:
+        """Return events newer than after_id, oldest first."""
+        ...
+
+    async def find_similar_plates(
+        self, plate_number: str, threshold: float = 0.85, limit: Optional[int] = None
     ) -> List[Tuple[str, float]]:
-        """Return list of (plate, similarity) for fuzzy matching."""
+        """Return list of (plate, similarity) for fuzzy matching, best first (at most `limit`)."""
         ...
@@ -1,5 +1,12 @@
 """Database Module - Manages SQLite database for authorized vehicles and event logging."""
 
-from .vehicle_db import VehicleDB
+from .vehicle_db import VehicleDB, AuthorizedSnapshot
+from .connection_pool import ConnectionPool, PRAGMA_PROFILES
+from .event_writer import EventWriter
+from .retention import RetentionPolicy, RetentionReport
+from .bulk import ImportReport
+from .async_db import AsyncVehicleDB
 
-__all__ = ['VehicleDB']
+__all__ = ['VehicleDB', 'AuthorizedSnapshot', 'ConnectionPool', 'PRAGMA_PROFILES', 'EventWriter',
+           'RetentionPolicy', 'RetentionReport', 'ImportReport',
+           'AsyncVehicleDB']
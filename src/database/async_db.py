@@ -0,0 +1,144 @@
+"""Async Vehicle Database - asyncio adapter running VehicleDB on one dedicated thread."""
+
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from .bulk import CSV, ImportReport
+from .vehicle_db import VehicleDB
+
+
+class AsyncVehicleDB:
+    """
+    Awaitable VehicleDB (implements core.protocols.AsyncPlateStorage).
+
+    Every query runs on a single executor thread, so the event loop never
+    blocks on SQLite. Given a path, the adapter owns a VehicleDB with a
+    one-connection pool, which that thread keeps open for its lifetime;
+    given a VehicleDB, it shares it and leaves closing it to the caller.
+
+    Concurrent is_authorized() calls are coalesced: lookups issued while
+    another batch is running (or in the same loop iteration) are answered
+    together by one executor job against one AuthorizedSnapshot.
+    """
+
+    def __init__(self, db: Union[str, VehicleDB] = "authorized_vehicles.db", **options):
+        if isinstance(db, VehicleDB):
+            self.db = db
+            self._owns_db = False
+        else:
+            options.setdefault('pool_size', 1)
+            self.db = VehicleDB(db, **options)
+            self._owns_db = True
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-db")
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flushing = False
+        self._closed = False
+        self.lookups = 0
+        self.lookup_batches = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _run(self, fn, *args, **kwargs):
+        """Run fn on the database thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def is_authorized(self, plate_number: str) -> bool:
+        """Check if vehicle is authorized (batched with concurrent lookups)."""
+        plate = plate_number.upper().strip()
+        self.lookups += 1
+        future = self._pending.get(plate)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[plate] = future
+            if not self._flushing:
+                self._flushing = True
+                asyncio.get_running_loop().call_soon(self._start_batch)
+        return await future
+
+    def _start_batch(self):
+        batch, self._pending = self._pending, {}
+        if not batch:
+            self._flushing = False
+            return
+        asyncio.ensure_future(self._answer(batch))
+
+    async def _answer(self, batch: Dict[str, asyncio.Future]):
+        self.lookup_batches += 1
+        try:
+            results = await self._run(self._lookup_many, list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for plate, future in batch.items():
+                if not future.done():
+                    future.set_result(results[plate])
+        # Lookups that arrived while this batch ran go out together as the next one
+        self._start_batch()
+
+    def _lookup_many(self, plates: List[str]) -> Dict[str, bool]:
+        authorized = self.db.authorized_snapshot().plates
+        return {plate: plate in authorized for plate in plates}
+
+    async def get_all_vehicles(self) -> List[dict]:
+        return await self._run(self.db.get_all_vehicles)
+
+    async def add_vehicle(self, plate_number: str) -> bool:
+        return await self._run(self.db.add_vehicle, plate_number)
+
+    async def remove_vehicle(self, plate_number: str) -> bool:
+        return await self._run(self.db.remove_vehicle, plate_number)
+
+    async def bulk_import(self, plates: Iterable, chunk_size: int = 1000) -> ImportReport:
+        """VehicleDB.bulk_import on the database thread (`plates` is consumed there)."""
+        return await self._run(self.db.bulk_import, plates, chunk_size)
+
+    async def bulk_export(self, fmt: str = CSV, chunk_size: int = 1000) -> AsyncIterator[str]:
+        """Yield export lines, fetching `chunk_size` of them per executor job."""
+        lines = self.db.bulk_export(fmt, chunk_size)
+        while True:
+            chunk = await self._run(lambda: list(itertools.islice(lines, chunk_size)))
+            for line in chunk:
+                yield line
+            if len(chunk) < chunk_size:
+                return
+
+    async def log_detection_event(
+        self, event_type: str, distance: Optional[float] = None, lane_id: Optional[str] = None
+    ) -> None:
+        await self._run(self.db.log_detection_event, event_type, distance, None, lane_id)
+
+    async def log_detection_events(self, events: Iterable[Tuple]) -> None:
+        await self._run(self.db.log_detection_events, list(events))
+
+    async def get_recent_events(self, limit: int = 50) -> List[dict]:
+        return await self._run(self.db.get_recent_events, limit)
+
+    async def get_events_before(self, before_id: Optional[int] = None, limit: int = 50) -> List[dict]:
+        return await self._run(self.db.get_events_before, before_id, limit)
+
+    async def get_events_since(self, after_id: int = 0, limit: int = 1000) -> List[dict]:
+        return await self._run(self.db.get_events_since, after_id, limit)
+
+    async def find_similar_plates(
+        self, plate_number: str, threshold: float = 0.85, limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        return await self._run(self.db.find_similar_plates, plate_number, threshold, limit)
+
+    async def close(self):
+        """Finish queued work, close the owned VehicleDB and stop the thread. Idempotent."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._owns_db:
+            await self._run(self.db.close)
+        self._executor.shutdown(wait=True)
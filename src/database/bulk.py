@@ -0,0 +1,137 @@
+"""Bulk - Streaming CSV/JSONL readers and writers for authorized vehicles."""
+
+import csv
+import io
+import itertools
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+CSV = "csv"
+JSONL = "jsonl"
+FORMATS = (CSV, JSONL)
+
+EXPORT_FIELDS = ("plate_number", "created_at")
+
+# Normalized plates: letters and digits, optionally split by spaces or hyphens
+_PLATE_RE = re.compile(r"^[A-Z0-9](?:[A-Z0-9 -]{0,14}[A-Z0-9])?$")
+
+# Rejected rows kept in a report; the rest are only counted, so memory stays constant
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportReport:
+    """
+    Outcome of a bulk import.
+
+    `duplicates` counts plates already authorized or repeated in the input;
+    `errors` lists (row number, reason) for the first rejected rows.
+    """
+    inserted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.duplicates + self.rejected
+
+    def reject(self, row: int, reason: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, reason))
+
+    def to_dict(self) -> dict:
+        return {
+            'inserted': self.inserted, 'duplicates': self.duplicates,
+            'rejected': self.rejected, 'errors': [list(e) for e in self.errors],
+        }
+
+
+def normalize_plate(value) -> Tuple[Optional[str], Optional[str]]:
+    """Return (plate, None) for a valid plate, else (None, reason)."""
+    if not isinstance(value, str):
+        return None, "missing plate_number"
+    plate = value.upper().strip()
+    if not plate:
+        return None, "empty plate_number"
+    if not _PLATE_RE.match(plate):
+        return None, f"invalid plate_number: {value!r}"
+    return plate, None
+
+
+def format_from_path(path: str, fmt: Optional[str] = None) -> str:
+    """Pick the format from `fmt` or the file extension (.csv, .jsonl/.ndjson)."""
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower()
+        fmt = JSONL if ext in (".jsonl", ".ndjson") else CSV
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (choose from {', '.join(FORMATS)})")
+    return fmt
+
+
+def read_plates(lines: Iterable[str], fmt: str = CSV) -> Iterator[object]:
+    """
+    Yield one plate value per input record, lazily.
+
+    CSV: a `plate_number` (or `plate`) column if the first row is a header,
+    else the first column. JSONL: objects with `plate_number`/`plate`, or bare
+    strings. Unreadable records yield None so they are counted as rejected.
+    """
+    if fmt == CSV:
+        yield from _read_csv(lines)
+    elif fmt == JSONL:
+        yield from _read_jsonl(lines)
+    else:
+        raise ValueError(f"Unknown format: {fmt} (choose from {', '.join(FORMATS)})")
+
+
+def _read_csv(lines: Iterable[str]) -> Iterator[object]:
+    reader = csv.reader(lines)
+    column = 0
+    for number, row in enumerate(reader):
+        if number == 0:
+            header = [cell.strip().lower() for cell in row]
+            names = [name for name in ("plate_number", "plate") if name in header]
+            if names:
+                column = header.index(names[0])
+                continue
+        if not row:
+            continue
+        yield row[column] if column < len(row) else None
+
+
+def _read_jsonl(lines: Iterable[str]) -> Iterator[object]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        if isinstance(record, dict):
+            yield record.get('plate_number', record.get('plate'))
+        else:
+            yield record
+
+
+def write_vehicles(vehicles: Iterable[dict], fmt: str = CSV) -> Iterator[str]:
+    """Yield export lines (with a header for CSV) for vehicle dicts, lazily."""
+    if fmt == CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        rows = ([vehicle[name] for name in EXPORT_FIELDS] for vehicle in vehicles)
+        for row in itertools.chain([EXPORT_FIELDS], rows):
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    elif fmt == JSONL:
+        for vehicle in vehicles:
+            yield json.dumps({name: vehicle[name] for name in EXPORT_FIELDS}) + "\n"
+    else:
+        raise ValueError(f"Unknown format: {fmt} (choose from {', '.join(FORMATS)})")
@@ -0,0 +1,157 @@
+"""Connection Pool - Reusable SQLite connections shared safely between threads."""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+# PRAGMA settings applied to every new connection, by profile name:
+# - legacy: SQLite defaults (rollback journal, synchronous=FULL); the original behaviour
+# - durable: WAL so readers never block on the writer, still fsync on every commit
+# - balanced: WAL + synchronous=NORMAL (fsync at checkpoints only; a power cut can lose the
+#   last commits but never corrupts the file), larger page cache, in-memory temp tables, mmap reads
+# - fast: as balanced with synchronous=OFF and bigger caches; for scratch or replayable data
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    "legacy": {},
+    "durable": {"journal_mode": "WAL", "synchronous": "FULL"},
+    "balanced": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -8000,
+        "temp_store": "MEMORY", "mmap_size": 64 * 1024 * 1024,
+    },
+    "fast": {
+        "journal_mode": "WAL", "synchronous": "OFF", "cache_size": -32000,
+        "temp_store": "MEMORY", "mmap_size": 256 * 1024 * 1024,
+    },
+}
+
+
+def get_pragma_profile(profile: str) -> Dict[str, Any]:
+    """Return the PRAGMA settings for a profile name."""
+    try:
+        return dict(PRAGMA_PROFILES[profile])
+    except KeyError:
+        raise ValueError(
+            f"Unknown PRAGMA profile: {profile} (choose from {', '.join(PRAGMA_PROFILES)})"
+        ) from None
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections.
+
+    `connection()` is a context manager: a thread gets an idle connection (or a
+    new one while fewer than `size` exist, else waits up to `timeout` seconds)
+    and returns it on exit, committing on success and rolling back on error.
+    Nested `connection()` calls in the same thread reuse the connection they
+    already hold, so helpers can call each other inside one transaction.
+
+    Connections are created with check_same_thread=False because they move
+    between threads, but only one thread uses a connection at a time.
+    A ":memory:" database gets a single connection, since each connection
+    would otherwise see its own empty database.
+
+    `pragmas` (e.g. from PRAGMA_PROFILES) are set on every new connection;
+    `cached_statements` and `factory` are passed to sqlite3.connect.
+    """
+
+    def __init__(
+        self, db_path: str, size: int = 4, timeout: float = 5.0, pragmas: Optional[Dict[str, Any]] = None,
+        cached_statements: int = 128, factory: Type[sqlite3.Connection] = sqlite3.Connection,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        self.size = 1 if db_path == ":memory:" else size
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+        self.cached_statements = cached_statements
+        self.factory = factory
+        self.created = 0
+        self.reused = 0
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with the pool's PRAGMAs applied."""
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.timeout, check_same_thread=False,
+            cached_statements=self.cached_statements, factory=self.factory,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        try:
+            conn = self._idle.get_nowait()
+            self.reused += 1
+            return conn
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                self.created += 1
+                return conn
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No database connection free after {self.timeout}s (pool size {self.size})"
+            ) from None
+        self.reused += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the with-block (reentrant per thread)."""
+        held: Optional[sqlite3.Connection] = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+        conn = self._acquire()
+        self._local.conn, self._local.depth = conn, 1
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def close(self):
+        """Close idle connections now and in-use ones when they are returned. Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,150 @@
+"""Event Writer - Background, batched inserts of detection events."""
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from src.core.bounded_queue import DEFAULT_OVERFLOW, BoundedQueue
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as 'YYYY-MM-DD HH:MM:SS.mmm' (CURRENT_TIMESTAMP's format plus milliseconds)."""
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y-%m-%d %H:%M:%S.") + f"{now.microsecond // 1000:03d}"
+
+
+class EventWriter:
+    """
+    Queue detection events and write them from a background thread.
+
+    `submit()` never blocks: events go into a bounded queue and, when it is
+    full, are dropped according to `overflow` (counted in `dropped`). The
+    writer thread inserts up to `batch_size` events per transaction with
+    executemany, flushing as soon as a batch is full or `flush_interval_ms`
+    after its first event. Each event keeps the time it was submitted.
+    close() writes whatever is still queued.
+
+    An EventWriter is also a detector listener: `detector.on_vehicle_detected(writer)`.
+    """
+
+    def __init__(
+        self, db, batch_size: int = 64, flush_interval_ms: float = 200,
+        max_queue: int = 10000, overflow: str = DEFAULT_OVERFLOW,
+    ):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.overflow = overflow
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed = 0
+        self._queue = BoundedQueue(max_queue, overflow)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, event: dict):
+        """Detector listener: queue {'type': ..., 'data': {'distance': ...}, 'lane_id': ...}."""
+        self.submit(event['type'], event.get('data', {}).get('distance'), event.get('lane_id'))
+
+    def submit(self, event_type: str, distance: Optional[float] = None, lane_id: Optional[str] = None) -> bool:
+        """Queue an event without waiting. Returns False if it (or, with drop_oldest, an older one) was dropped."""
+        if self._closed:
+            with self._lock:
+                self.dropped += 1
+            return False
+        item = (event_type, distance, utc_timestamp(), lane_id)
+        with self._lock:
+            self.submitted += 1
+        if self._queue.offer(item):
+            return True
+        with self._lock:
+            self.dropped += 1
+        return False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                break
+            batch: List[Tuple[str, Optional[float], str, Optional[str]]] = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+        # Drain anything queued after the stop marker
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        events = [item for item in leftover if item is not _STOP]
+        for start in range(0, len(events), self.batch_size):
+            self._write(events[start:start + self.batch_size])
+        for _ in leftover:
+            self._queue.task_done()
+
+    def _write(self, batch: List[Tuple[str, Optional[float], str, Optional[str]]]):
+        try:
+            self.db.log_detection_events(batch)
+        except Exception:
+            with self._lock:
+                self.failed += len(batch)
+            logger.exception("EventWriter: failed to write %d events", len(batch))
+            return
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event is written (or failed). Returns False on timeout."""
+        return self._queue.wait_empty(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Stop accepting events, write the ones queued and stop the thread. Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # Blocking put: the marker must get in even if the queue is full
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def get_stats(self) -> dict:
+        """Counters: submitted, written, dropped, failed, batches, queued."""
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+                'queued': self._queue.qsize(),
+            }
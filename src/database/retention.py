@@ -0,0 +1,218 @@
+"""Retention - Roll up, archive and prune old detection events in small batches."""
+
+import gzip
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Rollup tables by resolution: (table, bucket prefix length of 'YYYY-MM-DD HH:MM:SS')
+ROLLUP_TABLES = {
+    "minute": ("detection_events_minute", 16),
+    "hour": ("detection_events_hour", 13),
+}
+
+ROLLUP_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        bucket TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        event_count INTEGER NOT NULL,
+        distance_count INTEGER NOT NULL,
+        distance_min REAL,
+        distance_sum REAL NOT NULL,
+        PRIMARY KEY (bucket, event_type)
+    )
+"""
+
+# Merge a partial aggregate into an existing row (NULL min means "no distances yet")
+_UPSERT = """
+    INSERT INTO {table} (bucket, event_type, event_count, distance_count, distance_min, distance_sum)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (bucket, event_type) DO UPDATE SET
+        event_count = event_count + excluded.event_count,
+        distance_count = distance_count + excluded.distance_count,
+        distance_min = CASE
+            WHEN distance_min IS NULL THEN excluded.distance_min
+            WHEN excluded.distance_min IS NULL THEN distance_min
+            ELSE MIN(distance_min, excluded.distance_min) END,
+        distance_sum = distance_sum + excluded.distance_sum
+"""
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    How long each level of detail is kept (None keeps it forever).
+
+    - raw_days: raw detection_events rows; older ones are rolled up per minute
+      (and written to the archive when archive_dir is set)
+    - minute_days: per-minute rollups; older ones are merged into per-hour rollups
+    - hour_days: per-hour rollups; older ones are deleted
+    - archive_dir: where raw events are archived as events-YYYY-MM-DD.jsonl.gz
+    - batch_size: rows moved per transaction, so writers are never blocked for long
+    """
+    raw_days: Optional[float] = 7
+    minute_days: Optional[float] = 30
+    hour_days: Optional[float] = 365
+    archive_dir: Optional[str] = None
+    batch_size: int = 1000
+
+
+@dataclass
+class RetentionReport:
+    """What one retention run did."""
+    raw_rolled_up: int = 0
+    raw_archived: int = 0
+    minutes_rolled_up: int = 0
+    hours_deleted: int = 0
+    batches: int = 0
+    archive_files: List[str] = field(default_factory=list)
+    complete: bool = True
+
+
+def create_rollup_tables(cursor):
+    """Create the rollup tables if they don't exist."""
+    for table, _ in ROLLUP_TABLES.values():
+        cursor.execute(ROLLUP_SCHEMA.format(table=table))
+
+
+def _cutoff(now: datetime, days: float) -> str:
+    """UTC timestamp string `days` before now, comparable with detection_events.timestamp."""
+    return (now - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _aggregate(rows, prefix: int) -> Dict[Tuple[str, str], list]:
+    """Group (timestamp, event_type, distance) rows into [count, n, min, sum] per (bucket, type)."""
+    groups: Dict[Tuple[str, str], list] = {}
+    for timestamp, event_type, distance in rows:
+        agg = groups.setdefault((timestamp[:prefix], event_type), [0, 0, None, 0.0])
+        agg[0] += 1
+        if distance is not None:
+            agg[1] += 1
+            agg[2] = distance if agg[2] is None else min(agg[2], distance)
+            agg[3] += distance
+    return groups
+
+
+class RetentionManager:
+    """
+    Applies a RetentionPolicy to a VehicleDB.
+
+    Each step moves at most `batch_size` rows per transaction and commits
+    before the next batch, so event logging and dashboard reads interleave
+    with a long cleanup. `run(max_batches=...)` bounds the work per call;
+    a run that stops early reports complete=False and the next call resumes.
+    """
+
+    def __init__(self, db, policy: Optional[RetentionPolicy] = None):
+        self.db = db
+        self.policy = policy or RetentionPolicy()
+
+    def run(self, now: Optional[datetime] = None, max_batches: Optional[int] = None) -> RetentionReport:
+        """Roll up, archive and prune everything older than the policy allows."""
+        now = now or datetime.now(timezone.utc)
+        report = RetentionReport()
+        steps = []
+        if self.policy.raw_days is not None:
+            steps.append((self._roll_up_raw, _cutoff(now, self.policy.raw_days)))
+        if self.policy.minute_days is not None:
+            steps.append((self._roll_up_minutes, _cutoff(now, self.policy.minute_days)))
+        if self.policy.hour_days is not None:
+            steps.append((self._prune_hours, _cutoff(now, self.policy.hour_days)))
+        for step, cutoff in steps:
+            while True:
+                if max_batches is not None and report.batches >= max_batches:
+                    report.complete = False
+                    return report
+                moved = step(cutoff, report)
+                if not moved:
+                    break
+                report.batches += 1
+        return report
+
+    def _roll_up_raw(self, cutoff: str, report: RetentionReport) -> int:
+        with self.db._connection() as conn:
+            rows = conn.execute("""
+                SELECT id, event_type, distance, timestamp, lane_id
+                FROM detection_events
+                WHERE timestamp < ?
+                ORDER BY timestamp, id
+                LIMIT ?
+            """, (cutoff, self.policy.batch_size)).fetchall()
+            if not rows:
+                return 0
+            # Archive first: if the transaction below fails, events are archived twice, never lost
+            if self.policy.archive_dir:
+                self._archive(rows, report)
+            minute_prefix = ROLLUP_TABLES["minute"][1]
+            self._upsert(conn, "minute", _aggregate(((r[3], r[1], r[2]) for r in rows), minute_prefix))
+            conn.executemany("DELETE FROM detection_events WHERE id = ?", [(r[0],) for r in rows])
+        report.raw_rolled_up += len(rows)
+        return len(rows)
+
+    def _roll_up_minutes(self, cutoff: str, report: RetentionReport) -> int:
+        minute_table = ROLLUP_TABLES["minute"][0]
+        hour_prefix = ROLLUP_TABLES["hour"][1]
+        with self.db._connection() as conn:
+            rows = conn.execute(f"""
+                SELECT bucket, event_type, event_count, distance_count, distance_min, distance_sum
+                FROM {minute_table}
+                WHERE bucket < ?
+                ORDER BY bucket
+                LIMIT ?
+            """, (cutoff[:ROLLUP_TABLES["minute"][1]], self.policy.batch_size)).fetchall()
+            if not rows:
+                return 0
+            groups: Dict[Tuple[str, str], list] = {}
+            for bucket, event_type, count, n, low, total in rows:
+                agg = groups.setdefault((bucket[:hour_prefix], event_type), [0, 0, None, 0.0])
+                agg[0] += count
+                agg[1] += n
+                if low is not None:
+                    agg[2] = low if agg[2] is None else min(agg[2], low)
+                agg[3] += total
+            self._upsert(conn, "hour", groups)
+            conn.executemany(
+                f"DELETE FROM {minute_table} WHERE bucket = ? AND event_type = ?",
+                [(r[0], r[1]) for r in rows]
+            )
+        report.minutes_rolled_up += len(rows)
+        return len(rows)
+
+    def _prune_hours(self, cutoff: str, report: RetentionReport) -> int:
+        hour_table, prefix = ROLLUP_TABLES["hour"]
+        with self.db._connection() as conn:
+            cursor = conn.execute(f"""
+                DELETE FROM {hour_table}
+                WHERE rowid IN (SELECT rowid FROM {hour_table} WHERE bucket < ? LIMIT ?)
+            """, (cutoff[:prefix], self.policy.batch_size))
+            deleted = cursor.rowcount
+        report.hours_deleted += deleted
+        return deleted
+
+    @staticmethod
+    def _upsert(conn, resolution: str, groups: Dict[Tuple[str, str], list]):
+        table = ROLLUP_TABLES[resolution][0]
+        conn.executemany(
+            _UPSERT.format(table=table),
+            [(bucket, event_type, *agg) for (bucket, event_type), agg in groups.items()]
+        )
+
+    def _archive(self, rows, report: RetentionReport):
+        """Append raw rows to one gzip member per day file (gzip.open reads them back as one stream)."""
+        os.makedirs(self.policy.archive_dir, exist_ok=True)
+        by_day: Dict[str, list] = {}
+        for event_id, event_type, distance, timestamp, lane_id in rows:
+            by_day.setdefault(timestamp[:10], []).append({
+                'id': event_id, 'event_type': event_type, 'distance': distance,
+                'timestamp': timestamp, 'lane_id': lane_id,
+            })
+        for day, events in sorted(by_day.items()):
+            path = os.path.join(self.policy.archive_dir, f"events-{day}.jsonl.gz")
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+            if path not in report.archive_files:
+                report.archive_files.append(path)
+            report.raw_archived += len(events)
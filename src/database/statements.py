@@ -0,0 +1,84 @@
+"""Statements - Named SQL for VehicleDB, run through one reusable cursor per connection.
+
+sqlite3 keeps up to `cached_statements` compiled statements per connection,
+keyed by the exact SQL text. Defining every statement once here keeps that
+text identical across call sites, and CACHED_STATEMENTS leaves room for all
+of them, so after its first use on a connection a query is only bound and
+stepped, never parsed again. Reusing one cursor also skips a cursor
+allocation per call.
+"""
+
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Named statements used on the hot paths of VehicleDB
+STATEMENTS: Dict[str, str] = {
+    "insert_vehicle": "INSERT INTO authorized_vehicles (plate_number) VALUES (?)",
+    "insert_vehicle_or_ignore": "INSERT OR IGNORE INTO authorized_vehicles (plate_number) VALUES (?)",
+    "delete_vehicle": "DELETE FROM authorized_vehicles WHERE plate_number = ?",
+    "all_vehicles": "SELECT id, plate_number, created_at FROM authorized_vehicles ORDER BY plate_number",
+    "vehicles_after": (
+        "SELECT id, plate_number, created_at FROM authorized_vehicles "
+        "WHERE plate_number > ? ORDER BY plate_number LIMIT ?"
+    ),
+    "plates_fingerprint": "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM authorized_vehicles",
+    "insert_event": "INSERT INTO detection_events (event_type, distance, lane_id) VALUES (?, ?, ?)",
+    "insert_event_at": (
+        "INSERT INTO detection_events (event_type, distance, timestamp, lane_id) VALUES (?, ?, ?, ?)"
+    ),
+    "recent_events": (
+        "SELECT id, event_type, distance, timestamp, lane_id FROM detection_events "
+        "ORDER BY timestamp DESC, id DESC LIMIT ?"
+    ),
+    "recent_lane_events": (
+        "SELECT id, event_type, distance, timestamp, lane_id FROM detection_events "
+        "WHERE lane_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?"
+    ),
+    "latest_events": (
+        "SELECT id, event_type, distance, timestamp, lane_id FROM detection_events ORDER BY id DESC LIMIT ?"
+    ),
+    "events_before": (
+        "SELECT id, event_type, distance, timestamp, lane_id FROM detection_events "
+        "WHERE id < ? ORDER BY id DESC LIMIT ?"
+    ),
+    "events_since": (
+        "SELECT id, event_type, distance, timestamp, lane_id FROM detection_events "
+        "WHERE id > ? ORDER BY id LIMIT ?"
+    ),
+}
+
+# Room for the named statements plus ad-hoc ones (schema, PRAGMAs, retention)
+CACHED_STATEMENTS = 64
+
+
+class StatementConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that runs STATEMENTS by name on a cursor it keeps.
+
+    Each helper finishes with the cursor before returning (rows are fetched,
+    rowcount read), so nested calls on the same connection are safe.
+    Rows are plain tuples; callers that need dicts build them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursor: Optional[sqlite3.Cursor] = None
+
+    def _statement_cursor(self) -> sqlite3.Cursor:
+        if self._cursor is None:
+            self._cursor = self.cursor()
+        return self._cursor
+
+    def fetchone(self, name: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return self._statement_cursor().execute(STATEMENTS[name], params).fetchone()
+
+    def fetchall(self, name: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return self._statement_cursor().execute(STATEMENTS[name], params).fetchall()
+
+    def run(self, name: str, params: Sequence[Any] = ()) -> int:
+        """Execute a named write; returns the number of rows changed."""
+        return self._statement_cursor().execute(STATEMENTS[name], params).rowcount
+
+    def run_many(self, name: str, rows: Iterable[Sequence[Any]]) -> int:
+        """executemany a named write; returns the number of rows changed."""
+        return self._statement_cursor().executemany(STATEMENTS[name], rows).rowcount
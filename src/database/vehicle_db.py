@@ -1,26 +1,90 @@
 """Vehicle Database - Manages SQLite database for authorized vehicles."""
 
 import sqlite3
-from typing import Optional, List, Tuple
-from difflib import SequenceMatcher
+import threading
+import time
+from typing import FrozenSet, Iterable, Iterator, NamedTuple, Optional, List, Tuple
+
+from src.matching import DeletionIndex, PlateMatcher, max_edit_distance
+
+from .bulk import CSV, ImportReport, normalize_plate, write_vehicles
+from .connection_pool import ConnectionPool, get_pragma_profile
+from .event_writer import EventWriter
+from .statements import CACHED_STATEMENTS, StatementConnection
+from .retention import ROLLUP_TABLES, RetentionManager, RetentionPolicy, RetentionReport, create_rollup_tables
+
+# Sidecar file holding the persisted deletion index (memory-mapped on load)
+DELETION_INDEX_SUFFIX = ".deletes.idx"
+
+
+class AuthorizedSnapshot(NamedTuple):
+    """Immutable view of authorized_vehicles at one point in time."""
+    plates: FrozenSet[str]
+    vehicles: Tuple[Tuple[int, str, str], ...]  # (id, plate_number, created_at), by plate
+    version: int
+    fingerprint: Tuple[int, int]
 
 
 class VehicleDB:
-    """SQLite database for managing authorized vehicles."""
+    """
+    SQLite database for managing authorized vehicles.
+
+    Connections come from a per-instance ConnectionPool (`pool_size` connections,
+    shared safely by Flask's threaded server); call close() on shutdown.
+    `profile` picks the PRAGMA settings applied when a connection opens (see
+    PRAGMA_PROFILES); the default "balanced" uses WAL so dashboard reads do not
+    wait for event writes. get_storage_stats() reports what is in effect.
+    Queries are the named STATEMENTS, kept compiled on each pooled connection.
+    
+    is_authorized() and get_all_vehicles() read an in-memory AuthorizedSnapshot.
+    Writes through this instance replace it at once; edits by other processes
+    are noticed through PRAGMA data_version, checked at most every
+    `snapshot_interval` seconds (0 checks on every call).
+    """
     
-    def __init__(self, db_path: str = "authorized_vehicles.db"):
+    def __init__(
+        self, db_path: str = "authorized_vehicles.db", deletion_distance: int = 2, pool_size: int = 4,
+        profile: str = "balanced", snapshot_interval: float = 0.5,
+    ):
         self.db_path = db_path
+        self.profile = profile
+        self._pool = ConnectionPool(
+            db_path, size=pool_size, pragmas=get_pragma_profile(profile),
+            cached_statements=CACHED_STATEMENTS, factory=StatementConnection,
+        )
+        self.deletion_distance = deletion_distance
+        self._matcher: Optional[PlateMatcher] = None
+        self._deletion_index: Optional[DeletionIndex] = None
+        self._deletion_index_dirty = False
+        self._deletion_index_saver: Optional[threading.Thread] = None
+        self._event_writer: Optional[EventWriter] = None
+        # Bumped on every write to the authorized list, so derived results can be keyed on it
+        self.version = 0
+        self.snapshot_interval = snapshot_interval
+        self._snapshot: Optional[AuthorizedSnapshot] = None
+        self._snapshot_checked = 0.0
+        self._snapshot_lock = threading.Lock()
+        self._data_version: Optional[int] = None
+        self._watcher: Optional[sqlite3.Connection] = None
         self._create_tables()
     
-    def _get_connection(self):
-        """Get database connection."""
-        return sqlite3.connect(self.db_path)
+    def _connection(self):
+        """Borrow a pooled connection (context manager; commits on success, rolls back on error)."""
+        return self._pool.connection()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
+        with self._connection() as conn:
+            self._create_schema(conn.cursor())
+    
+    @staticmethod
+    def _create_schema(cursor):
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS authorized_vehicles (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -34,106 +98,363 @@ class VehicleDB:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 event_type TEXT NOT NULL,
                 distance REAL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                lane_id TEXT
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Databases created before events carried a lane (NULL for those rows)
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(detection_events)")}
+        if "lane_id" not in columns:
+            cursor.execute("ALTER TABLE detection_events ADD COLUMN lane_id TEXT")
+        
+        # get_recent_events walks this backwards instead of sorting the table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_detection_events_timestamp
+            ON detection_events (timestamp)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_detection_events_lane
+            ON detection_events (lane_id, timestamp)
+        """)
+        
+        create_rollup_tables(cursor)
     
     def add_vehicle(self, plate_number: str) -> bool:
         """Add vehicle to authorized list. Returns True if added, False if exists."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute(
-                "INSERT INTO authorized_vehicles (plate_number) VALUES (?)",
-                (plate_number.upper().strip(),)
-            )
-            conn.commit()
-            return True
+            with self._connection() as conn:
+                conn.run("insert_vehicle", (plate_number.upper().strip(),))
         except sqlite3.IntegrityError:
             return False
-        finally:
-            conn.close()
+        self.version += 1
+        if self._matcher is not None:
+            self._matcher.add(plate_number.upper().strip())
+        if self._deletion_index is not None:
+            self._deletion_index.add(plate_number.upper().strip())
+            self._deletion_index_dirty = True
+        return True
     
     def remove_vehicle(self, plate_number: str) -> bool:
         """Remove vehicle from authorized list. Returns True if removed."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "DELETE FROM authorized_vehicles WHERE plate_number = ?",
-            (plate_number.upper().strip(),)
-        )
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            deleted = conn.run("delete_vehicle", (plate_number.upper().strip(),)) > 0
+        if deleted:
+            self.version += 1
+        if deleted and self._matcher is not None:
+            self._matcher.remove(plate_number.upper().strip())
+        if deleted and self._deletion_index is not None:
+            self._deletion_index.remove(plate_number.upper().strip())
+            self._deletion_index_dirty = True
         return deleted
     
+    def bulk_import(self, plates: Iterable, chunk_size: int = 1000) -> ImportReport:
+        """
+        Authorize many plates at once, reading `plates` lazily (e.g. bulk.read_plates).
+
+        Valid plates are inserted with INSERT OR IGNORE, `chunk_size` per
+        transaction; already-authorized or repeated plates count as duplicates
+        and invalid values (None, empty, bad characters) as rejected.
+        """
+        report = ImportReport()
+        chunk: List[Tuple[str]] = []
+        for row, value in enumerate(plates, 1):
+            plate, reason = normalize_plate(value)
+            if plate is None:
+                report.reject(row, reason)
+                continue
+            chunk.append((plate,))
+            if len(chunk) >= chunk_size:
+                self._insert_plates(chunk, report)
+                chunk = []
+        if chunk:
+            self._insert_plates(chunk, report)
+        if report.inserted:
+            # Rebuilt from the table on next use; cheaper than one add() per plate
+            self.version += 1
+            self._drop_indexes()
+        return report
+    
+    def _insert_plates(self, chunk: List[Tuple[str]], report: ImportReport):
+        with self._connection() as conn:
+            inserted = conn.run_many("insert_vehicle_or_ignore", chunk)
+        report.inserted += inserted
+        report.duplicates += len(chunk) - inserted
+    
+    def iter_vehicles(self, chunk_size: int = 1000) -> Iterator[dict]:
+        """Yield every authorized vehicle by plate, reading `chunk_size` rows per short query."""
+        after = ""
+        while True:
+            with self._connection() as conn:
+                rows = conn.fetchall("vehicles_after", (after, chunk_size))
+            for row in rows:
+                yield {'id': row[0], 'plate_number': row[1], 'created_at': row[2]}
+            if len(rows) < chunk_size:
+                return
+            after = rows[-1][1]
+    
+    def bulk_export(self, fmt: str = CSV, chunk_size: int = 1000) -> Iterator[str]:
+        """Yield the authorized vehicles as CSV or JSONL lines, without loading the table."""
+        return write_vehicles(self.iter_vehicles(chunk_size), fmt)
+    
     def is_authorized(self, plate_number: str) -> bool:
         """Check if vehicle is authorized."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT 1 FROM authorized_vehicles WHERE plate_number = ?",
-            (plate_number.upper().strip(),)
-        )
-        result = cursor.fetchone() is not None
-        conn.close()
-        return result
+        return plate_number.upper().strip() in self.authorized_snapshot().plates
     
     def get_all_vehicles(self) -> List[dict]:
         """Get all authorized vehicles."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, plate_number, created_at FROM authorized_vehicles ORDER BY plate_number"
-        )
-        vehicles = [
+        return [
             {'id': row[0], 'plate_number': row[1], 'created_at': row[2]}
-            for row in cursor.fetchall()
+            for row in self.authorized_snapshot().vehicles
         ]
-        conn.close()
-        return vehicles
-    
-    def log_detection_event(self, event_type: str, distance: Optional[float] = None):
-        """Log detection event to database."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO detection_events (event_type, distance) VALUES (?, ?)",
-            (event_type, distance)
+    
+    def authorized_snapshot(self) -> AuthorizedSnapshot:
+        """
+        Return the current AuthorizedSnapshot, without SQL unless this instance
+        wrote since it was taken or `snapshot_interval` has passed.
+        """
+        snapshot = self._snapshot
+        if (snapshot is not None and snapshot.version == self.version
+                and time.monotonic() - self._snapshot_checked < self.snapshot_interval):
+            return snapshot
+        with self._snapshot_lock:
+            # Read data_version first: a commit landing during the reload is seen next time
+            data_version = self._read_data_version()
+            snapshot = self._snapshot
+            if (snapshot is None or snapshot.version != self.version
+                    or data_version != self._data_version):
+                snapshot = self._refresh_snapshot(snapshot)
+                self._data_version = data_version
+            self._snapshot_checked = time.monotonic()
+            return snapshot
+    
+    def _read_data_version(self) -> Optional[int]:
+        """
+        PRAGMA data_version of a private connection that never writes, so it changes
+        whenever anyone (this instance's pool included) commits. None for ":memory:".
+        """
+        if self.db_path == ":memory:":
+            return None
+        if self._watcher is None:
+            self._watcher = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _refresh_snapshot(self, previous: Optional[AuthorizedSnapshot]) -> AuthorizedSnapshot:
+        """Reload authorized_vehicles if its fingerprint moved; drop indexes another process made stale."""
+        fingerprint = self._plates_fingerprint()
+        if previous is not None and previous.version == self.version and previous.fingerprint == fingerprint:
+            # Only other tables (e.g. detection_events) changed
+            return previous
+        with self._connection() as conn:
+            vehicles = tuple(conn.fetchall("all_vehicles"))
+        plates = frozenset(row[1] for row in vehicles)
+        external = (
+            (self._matcher is not None and frozenset(self._matcher.plates) != plates)
+            or (previous is not None and previous.version == self.version and previous.plates != plates)
         )
-        conn.commit()
-        conn.close()
+        if external:
+            self.version += 1
+            self._drop_indexes()
+        self._snapshot = AuthorizedSnapshot(plates, vehicles, self.version, fingerprint)
+        return self._snapshot
     
-    def get_recent_events(self, limit: int = 50) -> List[dict]:
-        """Get recent detection events."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, event_type, distance, timestamp 
-            FROM detection_events 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, (limit,))
-        events = [
-            {'id': row[0], 'event_type': row[1], 'distance': row[2], 'timestamp': row[3]}
-            for row in cursor.fetchall()
-        ]
-        conn.close()
-        return events
+    def _drop_indexes(self):
+        """Forget in-memory indexes over the plates; they are rebuilt (or reloaded) on next use."""
+        self._wait_for_deletion_index_saver()
+        self._matcher = None
+        self._deletion_index = None
+        self._deletion_index_dirty = False
     
-    def find_similar_plates(self, plate_number: str, threshold: float = 0.85) -> List[Tuple[str, float]]:
-        """Find similar license plates using fuzzy matching."""
-        plate_upper = plate_number.upper().strip()
-        all_vehicles = self.get_all_vehicles()
-        
-        matches = []
-        for vehicle in all_vehicles:
-            similarity = SequenceMatcher(None, plate_upper, vehicle['plate_number']).ratio()
-            if similarity >= threshold:
-                matches.append((vehicle['plate_number'], similarity))
-        
-        matches.sort(key=lambda x: x[1], reverse=True)
-        return matches
+    def log_detection_event(
+        self, event_type: str, distance: Optional[float] = None, timestamp: Optional[str] = None,
+        lane_id: Optional[str] = None,
+    ):
+        """Log detection event to database (timestamp defaults to now, UTC; lane_id None for single-lane sites)."""
+        with self._connection() as conn:
+            if timestamp is None:
+                conn.run("insert_event", (event_type, distance, lane_id))
+            else:
+                conn.run("insert_event_at", (event_type, distance, timestamp, lane_id))
+    
+    def log_detection_events(self, events: Iterable[Tuple]):
+        """Log (event_type, distance, timestamp[, lane_id]) rows in one transaction."""
+        with self._connection() as conn:
+            conn.run_many("insert_event_at", (row if len(row) == 4 else (*row, None) for row in events))
+    
+    def apply_retention(
+        self, policy: Optional[RetentionPolicy] = None, now=None, max_batches: Optional[int] = None
+    ) -> RetentionReport:
+        """
+        Roll old events up per minute/hour, archive and prune them (see RetentionPolicy).
+        Works in short batches; with max_batches it may stop early (report.complete is False).
+        """
+        return RetentionManager(self, policy).run(now=now, max_batches=max_batches)
+    
+    def get_event_rollups(self, resolution: str = "hour", limit: int = 168) -> List[dict]:
+        """Newest per-minute or per-hour aggregates: bucket, event_type, count, min/avg distance."""
+        if resolution not in ROLLUP_TABLES:
+            raise ValueError(f"Unknown rollup resolution: {resolution}")
+        table = ROLLUP_TABLES[resolution][0]
+        with self._connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT bucket, event_type, event_count, distance_count, distance_min, distance_sum
+                FROM {table}
+                ORDER BY bucket DESC, event_type
+                LIMIT ?
+            """, (limit,))
+            return [
+                {
+                    'bucket': row[0], 'event_type': row[1], 'count': row[2],
+                    'distance_min': row[4],
+                    'distance_avg': row[5] / row[3] if row[3] else None,
+                }
+                for row in cursor.fetchall()
+            ]
+    
+    def get_event_writer(self, **options) -> EventWriter:
+        """
+        Return this database's background EventWriter, starting it on first use
+        (options are passed to EventWriter). close() flushes and stops it.
+        """
+        if self._event_writer is None:
+            self._event_writer = EventWriter(self, **options)
+        return self._event_writer
+    
+    def get_recent_events(self, limit: int = 50, as_tuples: bool = False, lane_id: Optional[str] = None) -> List:
+        """
+        Get recent detection events, optionally of one lane. With as_tuples, rows are
+        (id, event_type, distance, timestamp, lane_id) tuples straight from sqlite3
+        instead of dicts (same for the other event queries).
+        """
+        if lane_id is not None:
+            return self._events("recent_lane_events", (lane_id, limit), as_tuples)
+        return self._events("recent_events", (limit,), as_tuples)
+    
+    def _events(self, name: str, params: tuple, as_tuples: bool) -> List:
+        with self._connection() as conn:
+            rows = conn.fetchall(name, params)
+        if as_tuples:
+            return rows
+        return [self._event_row(row) for row in rows]
+    
+    @staticmethod
+    def _event_row(row) -> dict:
+        return {'id': row[0], 'event_type': row[1], 'distance': row[2], 'timestamp': row[3], 'lane_id': row[4]}
+    
+    def get_events_before(
+        self, before_id: Optional[int] = None, limit: int = 50, as_tuples: bool = False
+    ) -> List:
+        """
+        Page backwards through history: up to `limit` events with id < before_id, newest first.
+        Pass the last id of one page to get the next; None starts from the newest event.
+        """
+        if before_id is None:
+            return self._events("latest_events", (limit,), as_tuples)
+        return self._events("events_before", (before_id, limit), as_tuples)
+    
+    def get_events_since(self, after_id: int = 0, limit: int = 1000, as_tuples: bool = False) -> List:
+        """Events with id > after_id, oldest first (poll with the largest id seen so far)."""
+        return self._events("events_since", (after_id, limit), as_tuples)
+    
+    def get_storage_stats(self) -> dict:
+        """PRAGMA settings in effect, file size and connection pool counters."""
+        with self._connection() as conn:
+            stats = {
+                name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ('journal_mode', 'synchronous', 'cache_size', 'temp_store', 'mmap_size',
+                             'page_size', 'page_count', 'freelist_count')
+            }
+        stats.update({
+            'profile': self.profile,
+            'pool_size': self._pool.size,
+            'connections_created': self._pool.created,
+            'connections_reused': self._pool.reused,
+        })
+        return stats
+    
+    def get_matcher(self) -> PlateMatcher:
+        """Return the compiled matcher over authorized plates (built on first use, kept in sync by add/remove)."""
+        snapshot = self.authorized_snapshot()
+        if self._matcher is None:
+            self._matcher = PlateMatcher(row[1] for row in snapshot.vehicles)
+        return self._matcher
+    
+    @property
+    def deletion_index_path(self) -> Optional[str]:
+        """Where the deletion index is persisted (None for in-memory databases)."""
+        if self.db_path == ":memory:":
+            return None
+        return self.db_path + DELETION_INDEX_SUFFIX
+    
+    def _plates_fingerprint(self) -> Tuple[int, int]:
+        """(row count, max id) of authorized_vehicles; ids are AUTOINCREMENT, so any change alters it."""
+        with self._connection() as conn:
+            return tuple(conn.fetchone("plates_fingerprint"))
+    
+    def get_deletion_index(self) -> Optional[DeletionIndex]:
+        """
+        Return the deletion index (memory-mapped from disk if current, else rebuilt and
+        saved by a background thread). None if disabled.
+        """
+        if self.deletion_distance <= 0:
+            return None
+        if self._deletion_index is None:
+            path = self.deletion_index_path
+            fingerprint = self._plates_fingerprint()
+            index = None
+            if path is not None:
+                index = DeletionIndex.load(path, fingerprint, self.deletion_distance)
+            if index is None:
+                index = DeletionIndex(
+                    (v['plate_number'] for v in self.get_all_vehicles()), self.deletion_distance
+                )
+                if path is not None:
+                    # The lookup that triggered the rebuild does not wait for the file
+                    self._wait_for_deletion_index_saver()
+                    self._deletion_index_saver = threading.Thread(
+                        target=index.save, args=(path, fingerprint), name="deletion-index-save", daemon=True
+                    )
+                    self._deletion_index_saver.start()
+            self._deletion_index = index
+            self._deletion_index_dirty = False
+        return self._deletion_index
+    
+    def _wait_for_deletion_index_saver(self):
+        """Join the background save started by get_deletion_index(), if one is running."""
+        if self._deletion_index_saver is not None:
+            self._deletion_index_saver.join()
+            self._deletion_index_saver = None
+    
+    def save_deletion_index(self):
+        """Persist the deletion index if it changed since it was loaded or last saved."""
+        self._wait_for_deletion_index_saver()
+        path = self.deletion_index_path
+        if self._deletion_index is None or not self._deletion_index_dirty or path is None:
+            return
+        self._deletion_index.save(path, self._plates_fingerprint())
+        self._deletion_index_dirty = False
+    
+    def close(self):
+        """Write queued events, flush in-memory indexes to disk and close pooled connections."""
+        if self._pool.closed:
+            return
+        if self._event_writer is not None:
+            self._event_writer.close()
+        self.save_deletion_index()
+        self._pool.close()
+        if self._watcher is not None:
+            self._watcher.close()
+    
+    def find_similar_plates(
+        self, plate_number: str, threshold: float = 0.85, limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """Find similar license plates using fuzzy matching; only the `limit` best if given."""
+        matcher = self.get_matcher()
+        candidates = None
+        radius = max_edit_distance(len(plate_number.strip()), threshold)
+        if self.deletion_distance > 0 and radius is not None and 0 <= radius <= self.deletion_distance:
+            # Every plate that can reach the threshold is within `radius` edits: ask the index
+            candidates = self.get_deletion_index().candidates(plate_number.upper().strip(), radius)
+        if limit is not None:
+            return matcher.top_k(plate_number, limit, threshold=threshold, candidates=candidates)
+        return matcher.all_above(plate_number, threshold, candidates=candidates)
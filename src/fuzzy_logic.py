@@ -1,50 +1,68 @@
-import difflib
-from typing import List, Tuple, Optional
+from typing import List, Sequence, Tuple, Optional, Union
+
+from src.matching import OPTICAL_MAP, OPTICAL, DecisionCache, PlateMatcher, get_plate_matcher
 
 # Task 3: Confidence & Decision Logic - Fuzzy matching fallback (≥85%) (Jenish)
+# OPTICAL_MAP (the approved optical typos) lives in src.matching.optical.
 
-OPTICAL_MAP = {
-    '1': ['I', 'L', 'l'], '2': ['Z', 'z'], '3': ['B'],
-    '4': ['A'], '5': ['S', 's'], '6': ['b'],
-    '7': ['T'], '8': ['B'], '9': ['g', 'q'], '0': ['O', 'o']
-}
+# Results per (input text, threshold, authorized-list state); see decision_cache.info()
+decision_cache = DecisionCache(maxsize=1024)
 
 
 def check_plate_authorization(
     input_plate: str,
-    authorized_plates: Optional[List[str]] = None,
-    threshold: float = 0.85
+    authorized_plates: Optional[Union[List[str], PlateMatcher]] = None,
+    threshold: float = 0.85,
+    use_cache: bool = True
 ) -> Tuple[bool, str, float]:
     """
     Check if a plate is authorized using fuzzy matching and optical typo rules.
+    authorized_plates may be a list or a prebuilt PlateMatcher (e.g. VehicleDB.get_matcher()).
+    Repeated checks against an unchanged list are served from decision_cache unless use_cache is False.
     Returns (authorized, best_matched_plate, score).
     """
     if authorized_plates is None:
         authorized_plates = ["ABC123", "XYZ789", "DEF456"]
-    best_match = ""
-    highest_score = 0.0
-    for auth_plate in authorized_plates:
-        ratio_score = difflib.SequenceMatcher(None, input_plate.upper(), auth_plate.upper()).ratio()
-        validation_points = 0
-        for i in range(min(len(input_plate), len(auth_plate))):
-            char_in = input_plate[i]
-            char_auth = auth_plate[i]
-            if i < 3:
-                if char_in.upper() == char_auth.upper():
-                    validation_points += 1
-            else:
-                if char_in == char_auth:
-                    validation_points += 1
-                elif char_auth in OPTICAL_MAP and char_in in OPTICAL_MAP[char_auth]:
-                    validation_points += 0.95
-                else:
-                    validation_points += 0
-        position_score = validation_points / len(auth_plate)
-        final_score = (ratio_score + position_score) / 2
-        if final_score > highest_score:
-            highest_score = final_score
-            best_match = auth_plate
-    return (highest_score >= threshold, best_match, highest_score)
+    matcher = get_plate_matcher(authorized_plates)
+
+    def compute():
+        # An exact read of a plate decides immediately, without scoring the rest of the list
+        best_match, highest_score = matcher.best_match(input_plate, scorer=OPTICAL, stop_on_exact=True)
+        return (highest_score >= threshold, best_match or "", highest_score)
+
+    if not use_cache:
+        return compute()
+    # OPTICAL scoring is case-sensitive past the prefix, so the text is keyed as given
+    return decision_cache.get_or_compute(
+        ('single', input_plate, threshold, matcher.uid, matcher.version), compute
+    )
+
+
+def check_plate_candidates(
+    candidates: Sequence[str],
+    authorized_plates: Optional[Union[List[str], PlateMatcher]] = None,
+    threshold: float = 0.85,
+    use_cache: bool = True
+) -> Tuple[bool, str, str, float]:
+    """
+    Check several OCR readings of one plate (e.g. every candidate from a frame) in one pass.
+    Candidates earlier in the sequence win ties, so pass them in order of OCR preference.
+    Returns (authorized, best_candidate, best_matched_plate, score).
+    """
+    if authorized_plates is None:
+        authorized_plates = ["ABC123", "XYZ789", "DEF456"]
+    matcher = get_plate_matcher(authorized_plates)
+    candidates = tuple(candidates)
+
+    def compute():
+        candidate, best_match, highest_score = matcher.best_of(candidates, scorer=OPTICAL, stop_on_exact=True)
+        return (highest_score >= threshold, candidate or "", best_match or "", highest_score)
+
+    if not use_cache:
+        return compute()
+    return decision_cache.get_or_compute(
+        ('batch', candidates, threshold, matcher.uid, matcher.version), compute
+    )
 
 
 def check_authorization():
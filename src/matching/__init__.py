@@ -0,0 +1,14 @@
+"""Plate matching - Indexes and scoring helpers for fuzzy plate lookup."""
+
+from .bktree import BKTree, max_edit_distance
+from .optical import OPTICAL_MAP, position_score
+from .similarity import SIMILARITY_BACKENDS, levenshtein, lcs_length, sequence_ratio, indel_ratio
+from .plate_matcher import PlateMatcher, MatchStats, get_plate_matcher, RATIO, OPTICAL
+from .deletion_index import DeletionIndex
+from .decision_cache import DecisionCache
+from .bloom import PlateFilter
+
+__all__ = ['BKTree', 'max_edit_distance', 'OPTICAL_MAP', 'position_score',
+           'SIMILARITY_BACKENDS', 'levenshtein', 'lcs_length', 'sequence_ratio', 'indel_ratio',
+           'PlateMatcher', 'MatchStats', 'get_plate_matcher', 'RATIO', 'OPTICAL', 'DeletionIndex',
+           'DecisionCache', 'PlateFilter']
@@ -0,0 +1,128 @@
+"""BK-tree - Metric-space index over edit distance for fuzzy plate lookup."""
+
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .similarity import levenshtein
+
+
+def max_edit_distance(length: int, threshold: float) -> Optional[int]:
+    """
+    Largest edit distance a plate can have from a query of `length` characters
+    while still reaching a SequenceMatcher ratio of `threshold`.
+
+    ratio = 2*M/T with M <= LCS, and Levenshtein <= T - 2*LCS, so
+    ratio >= t implies distance <= 2*length*(1 - t)/t.
+    Returns None when the threshold does not bound the distance (t <= 0).
+    """
+    if threshold <= 0:
+        return None
+    if threshold > 1:
+        return -1
+    return int(2 * length * (1 - threshold) / threshold + 1e-9)
+
+
+class _Node:
+    """Tree node: one plate plus children keyed by distance to it."""
+
+    __slots__ = ('item', 'children', 'alive')
+
+    def __init__(self, item: str):
+        self.item = item
+        self.children = {}
+        self.alive = True
+
+
+class BKTree:
+    """Burkhard-Keller tree; range queries only visit subtrees the triangle inequality allows."""
+
+    def __init__(self, items: Iterable[str] = (), distance: Callable[[str, str], int] = levenshtein):
+        self.distance = distance
+        self._root: Optional[_Node] = None
+        self._size = 0
+        self._dead = 0
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item: str) -> bool:
+        node = self._find(item)
+        return node is not None and node.alive
+
+    def __iter__(self) -> Iterator[str]:
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if node.alive:
+                yield node.item
+            stack.extend(node.children.values())
+
+    def _find(self, item: str) -> Optional[_Node]:
+        node = self._root
+        while node is not None:
+            d = self.distance(item, node.item)
+            if d == 0:
+                return node
+            node = node.children.get(d)
+        return None
+
+    def add(self, item: str) -> bool:
+        """Insert item. Returns True if added, False if already present."""
+        if self._root is None:
+            self._root = _Node(item)
+            self._size = 1
+            return True
+        node = self._root
+        while True:
+            d = self.distance(item, node.item)
+            if d == 0:
+                if node.alive:
+                    return False
+                node.alive = True
+                self._dead -= 1
+                self._size += 1
+                return True
+            child = node.children.get(d)
+            if child is None:
+                node.children[d] = _Node(item)
+                self._size += 1
+                return True
+            node = child
+
+    def remove(self, item: str) -> bool:
+        """Remove item (tombstoned; the tree is rebuilt once most nodes are dead)."""
+        node = self._find(item)
+        if node is None or not node.alive:
+            return False
+        node.alive = False
+        self._size -= 1
+        self._dead += 1
+        if self._dead > self._size:
+            self._rebuild()
+        return True
+
+    def _rebuild(self):
+        items = list(self)
+        self._root = None
+        self._size = 0
+        self._dead = 0
+        for item in items:
+            self.add(item)
+
+    def search(self, query: str, radius: int) -> List[Tuple[str, int]]:
+        """Return (item, distance) for every live item within `radius` of query."""
+        results = []
+        if self._root is None or radius < 0:
+            return results
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            d = self.distance(query, node.item)
+            if d <= radius and node.alive:
+                results.append((node.item, d))
+            low, high = d - radius, d + radius
+            for edge, child in node.children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return results
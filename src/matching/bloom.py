@@ -0,0 +1,158 @@
+"""Plate Filter - Counting Bloom filter answering "definitely not authorized" in a few byte reads.
+
+Each plate sets k counters chosen by double hashing. A plate whose counters
+are not all non-zero was never added, so negatives are exact; positives are
+wrong with probability about `false_positive_rate` while the filter holds at
+most `capacity` plates. Counters (one byte each) make remove() possible; a
+counter that reaches 255 stays there so it can never drop to zero wrongly.
+
+save() writes a small header plus the raw counters, so load() can
+memory-map the file: other processes share the pages and only touch the
+few bytes each lookup reads.
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence
+
+_MAGIC = b"PLBF"
+_FORMAT = 1
+_HEADER = struct.Struct("<4sIQIQdI")  # magic, format, size, hashes, count, fpr, fingerprint length
+_SATURATED = 255
+
+
+def filter_size(capacity: int, false_positive_rate: float):
+    """(counters, hash functions) for `capacity` plates at the given false-positive rate."""
+    if not 0 < false_positive_rate < 1:
+        raise ValueError("false_positive_rate must be between 0 and 1")
+    capacity = max(1, capacity)
+    size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+    hashes = max(1, round(size / capacity * math.log(2)))
+    return size, hashes
+
+
+class PlateFilter:
+    """Counting Bloom filter over normalized (strip + upper) plates."""
+
+    def __init__(
+        self, plates: Iterable[str] = (), capacity: int = 1000, false_positive_rate: float = 0.01,
+    ):
+        self.false_positive_rate = false_positive_rate
+        self.size, self.hashes = filter_size(capacity, false_positive_rate)
+        self.count = 0
+        self.build_seconds = 0.0
+        self._counters = bytearray(self.size)
+        self._lock = threading.Lock()
+        start = time.perf_counter()
+        for plate in plates:
+            self.add(plate)
+        self.build_seconds = time.perf_counter() - start
+
+    @classmethod
+    def for_plates(cls, plates: Sequence[str], false_positive_rate: float = 0.01, headroom: float = 2.0):
+        """Build a filter sized for `plates` with room to grow by `headroom` before the rate degrades."""
+        return cls(plates, capacity=int(len(plates) * headroom) + 1, false_positive_rate=false_positive_rate)
+
+    @property
+    def capacity(self) -> int:
+        """Plates the filter holds at its configured false-positive rate."""
+        return max(1, int(-self.size * math.log(2) ** 2 / math.log(self.false_positive_rate)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _positions(self, plate: str) -> List[int]:
+        digest = hashlib.blake2b(plate.strip().upper().encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, plate: str) -> bool:
+        counters = self._counters
+        return all(counters[i] for i in self._positions(plate))
+
+    def add(self, plate: str):
+        """Add a plate (callers keep plates unique, as the authorized table does)."""
+        positions = self._positions(plate)
+        with self._lock:
+            for i in positions:
+                if self._counters[i] < _SATURATED:
+                    self._counters[i] += 1
+            self.count += 1
+
+    def remove(self, plate: str) -> bool:
+        """Remove a plate that was added. Returns False if it is definitely not in the filter."""
+        positions = self._positions(plate)
+        with self._lock:
+            if not all(self._counters[i] for i in positions):
+                return False
+            for i in positions:
+                if self._counters[i] < _SATURATED:
+                    self._counters[i] -= 1
+            self.count -= 1
+        return True
+
+    def estimated_false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill: (1 - e^(-k n / m))^k."""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def get_stats(self) -> dict:
+        return {
+            'plates': self.count,
+            'capacity': self.capacity,
+            'size_bytes': self.size,
+            'hashes': self.hashes,
+            'false_positive_rate': self.false_positive_rate,
+            'estimated_false_positive_rate': self.estimated_false_positive_rate(),
+            'build_ms': self.build_seconds * 1000,
+        }
+
+    def save(self, path: str, fingerprint: Sequence = ()):
+        """Write the filter to path (atomically) tagged with a fingerprint of its source data."""
+        tag = json.dumps(list(fingerprint)).encode('utf-8')
+        with self._lock:
+            header = _HEADER.pack(
+                _MAGIC, _FORMAT, self.size, self.hashes, self.count, self.false_positive_rate, len(tag)
+            )
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(tag)
+                f.write(self._counters)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Sequence = (), false_positive_rate: Optional[float] = None):
+        """
+        Memory-map a filter saved by save() (copy-on-write: add/remove never touch the file).
+        None if missing, unreadable, built from other data or with another false-positive rate.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, fmt, size, hashes, count, fpr, tag_length = _HEADER.unpack_from(data)
+            start = _HEADER.size + tag_length
+            tag = json.loads(bytes(data[_HEADER.size:start]).decode('utf-8'))
+        except (struct.error, ValueError):
+            data.close()
+            return None
+        if (magic != _MAGIC or fmt != _FORMAT or tag != list(fingerprint) or len(data) != start + size
+                or (false_positive_rate is not None and fpr != false_positive_rate)):
+            data.close()
+            return None
+        plate_filter = cls.__new__(cls)
+        plate_filter.false_positive_rate = fpr
+        plate_filter.size, plate_filter.hashes, plate_filter.count = size, hashes, count
+        plate_filter.build_seconds = 0.0
+        plate_filter._counters = memoryview(data)[start:]
+        plate_filter._lock = threading.Lock()
+        return plate_filter
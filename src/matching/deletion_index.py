@@ -0,0 +1,223 @@
+"""Deletion Index - SymSpell-style lookup of plates within a small edit distance.
+
+Every plate is stored under each string obtained by deleting up to
+`max_distance` of its characters. Two strings within Levenshtein distance k
+share such a deletion variant (k deletions or fewer on each side), so a query
+only needs to generate its own variants and look them up.
+
+save() writes the plates plus one sorted 8-byte key per (variant, plate):
+the variant's CRC-32 in the high half and the plate's number in the low
+half. load() memory-maps the file and binary-searches those keys, so
+opening a saved index costs a header read instead of rebuilding or parsing
+the variant map. Changes after load() live in a small in-memory overlay.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .similarity import levenshtein
+from .vectorized import np
+
+_MAGIC = b"PLDI"
+_FORMAT = 2
+# magic, format, little-endian flag, max distance, plates, keys, plate bytes, fingerprint length
+_HEADER = struct.Struct("<4sIBIQQQI")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+_SEPARATOR = "\0"
+
+
+def _variant_hash(variant: str) -> int:
+    return zlib.crc32(variant.encode('utf-8'))
+
+
+def deletion_variants(text: str, max_distance: int) -> Set[str]:
+    """Return text and every string made by deleting up to max_distance characters from it."""
+    variants = {text}
+    for removed in range(1, min(max_distance, len(text)) + 1):
+        for positions in combinations(range(len(text)), removed):
+            skip = set(positions)
+            variants.add("".join(c for i, c in enumerate(text) if i not in skip))
+    return variants
+
+
+class DeletionIndex:
+    """Deletion-neighborhood index over plates; lookups cost a few hash probes regardless of size."""
+
+    def __init__(self, plates: Iterable[str] = (), max_distance: int = 2):
+        self.max_distance = max_distance
+        # Buckets are tuples, replaced rather than mutated, so save() can walk a snapshot
+        self._deletes: Dict[str, Tuple[str, ...]] = {}
+        self._plates: Set[str] = set()
+        # Loaded by load(): plates by number, their sorted variant keys, and base plates since removed
+        self._base_plates: List[str] = []
+        self._base_keys: Sequence[int] = ()
+        self._base_set: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._lock = threading.Lock()
+        for plate in plates:
+            self.add(plate)
+
+    def __len__(self) -> int:
+        return len(self._plates)
+
+    def __contains__(self, plate: str) -> bool:
+        return plate in self._plates
+
+    def add(self, plate: str) -> bool:
+        """Index a plate. Returns False if already present."""
+        with self._lock:
+            if plate in self._plates:
+                return False
+            self._plates.add(plate)
+            if plate in self._removed:
+                # Still in the loaded keys: just stop hiding it
+                self._removed.discard(plate)
+                return True
+            deletes = self._deletes
+            for variant in deletion_variants(plate, self.max_distance):
+                deletes[variant] = deletes.get(variant, ()) + (plate,)
+        return True
+
+    def remove(self, plate: str) -> bool:
+        """Drop a plate from the index. Returns False if it was not indexed."""
+        with self._lock:
+            if plate not in self._plates:
+                return False
+            self._plates.discard(plate)
+            if plate in self._base_set:
+                self._removed.add(plate)
+                return True
+            for variant in deletion_variants(plate, self.max_distance):
+                rest = tuple(p for p in self._deletes.get(variant, ()) if p != plate)
+                if rest:
+                    self._deletes[variant] = rest
+                else:
+                    self._deletes.pop(variant, None)
+        return True
+
+    def candidates(self, query: str, max_distance: Optional[int] = None) -> Set[str]:
+        """
+        Plates that may lie within max_distance (default: the index's) of query.
+        Includes every plate that does; may include a few that do not.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"Index supports distances up to {self.max_distance}, got {max_distance}")
+        found: Set[str] = set()
+        with self._lock:
+            keys = self._base_keys
+            for variant in deletion_variants(query, max_distance):
+                found.update(self._deletes.get(variant, ()))
+                if keys:
+                    high = _variant_hash(variant)
+                    i = bisect.bisect_left(keys, high << 32)
+                    while i < len(keys) and keys[i] >> 32 == high:
+                        found.add(self._base_plates[keys[i] & 0xFFFFFFFF])
+                        i += 1
+            found -= self._removed
+        return found
+
+    def lookup(self, query: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Return (plate, distance) for plates within max_distance of query, closest first."""
+        if max_distance is None:
+            max_distance = self.max_distance
+        results = []
+        for plate in self.candidates(query, max_distance):
+            distance = levenshtein(query, plate)
+            if distance <= max_distance:
+                results.append((plate, distance))
+        results.sort(key=lambda x: (x[1], x[0]))
+        return results
+
+    def save(self, path: str, fingerprint: Sequence = ()):
+        """
+        Write the index to path (atomically) tagged with a fingerprint of its source data.
+        The lock is held only to snapshot the maps, so lookups carry on while a large
+        index is written.
+        """
+        with self._lock:
+            plates = sorted(self._plates)
+            items = list(self._deletes.items())
+            base_keys, base_plates, removed = self._base_keys, self._base_plates, set(self._removed)
+        number = {plate: i for i, plate in enumerate(plates)}
+        keys = []
+        for variant, bucket in items:
+            high = _variant_hash(variant) << 32
+            keys.extend(high | number[plate] for plate in bucket)
+        if base_keys:
+            renumbered = [None if plate in removed else number[plate] for plate in base_plates]
+            for key in base_keys:
+                n = renumbered[key & 0xFFFFFFFF]
+                if n is not None:
+                    keys.append(key >> 32 << 32 | n)
+        if np is not None:
+            keys = np.array(keys, dtype=np.uint64)
+            keys.sort()
+        else:
+            keys = array('Q', sorted(keys))
+        tag = json.dumps(list(fingerprint)).encode('utf-8')
+        blob = _SEPARATOR.join(plates).encode('utf-8')
+        header = _HEADER.pack(
+            _MAGIC, _FORMAT, _LITTLE_ENDIAN, self.max_distance, len(plates), len(keys), len(blob), len(tag)
+        )
+        padding = -(len(header) + len(tag) + len(blob)) % keys.itemsize
+        # A temporary file of its own, so concurrent saves to one path never share it
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path) or None
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                f.write(tag)
+                f.write(blob)
+                f.write(b"\0" * padding)
+                f.write(keys.tobytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Sequence = (), max_distance: int = 2) -> Optional['DeletionIndex']:
+        """
+        Memory-map an index saved by save(); None if missing, unreadable, built from
+        other data or with another max_distance.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, fmt, little, distance, plate_count, key_count, blob_length, tag_length = \
+                _HEADER.unpack_from(data)
+            start = _HEADER.size + tag_length
+            tag = json.loads(bytes(data[_HEADER.size:start]).decode('utf-8'))
+            blob = bytes(data[start:start + blob_length]).decode('utf-8')
+        except (struct.error, ValueError):
+            data.close()
+            return None
+        keys_start = start + blob_length
+        keys_start += -keys_start % 8
+        if (magic != _MAGIC or fmt != _FORMAT or bool(little) != _LITTLE_ENDIAN
+                or distance != max_distance or tag != list(fingerprint)
+                or len(data) != keys_start + key_count * 8):
+            data.close()
+            return None
+        index = cls(max_distance=max_distance)
+        index._base_plates = blob.split(_SEPARATOR) if plate_count else []
+        index._base_keys = memoryview(data)[keys_start:].cast('Q')
+        index._base_set = set(index._base_plates)
+        index._plates = set(index._base_set)
+        return index
@@ -0,0 +1,68 @@
+"""Optical typo rules - Characters OCR commonly confuses on license plates."""
+
+OPTICAL_MAP = {
+    '1': ['I', 'L', 'l'], '2': ['Z', 'z'], '3': ['B'],
+    '4': ['A'], '5': ['S', 's'], '6': ['b'],
+    '7': ['T'], '8': ['B'], '9': ['g', 'q'], '0': ['O', 'o']
+}
+
+# Authorized character -> OCR characters accepted in its place (set form for lookups)
+OPTICAL_SETS = {char: frozenset(typos) for char, typos in OPTICAL_MAP.items()}
+
+# Positions below this index compare case-insensitively and get no typo credit
+PREFIX_LENGTH = 3
+TYPO_CREDIT = 0.95
+
+
+def position_score(input_plate: str, auth_plate: str) -> float:
+    """
+    Per-position agreement of input_plate with auth_plate, normalized by len(auth_plate).
+
+    The first PREFIX_LENGTH characters score 1 on a case-insensitive match; later
+    characters score 1 on an exact match and TYPO_CREDIT on a known optical typo.
+    """
+    validation_points = 0
+    for i in range(min(len(input_plate), len(auth_plate))):
+        char_in = input_plate[i]
+        char_auth = auth_plate[i]
+        if i < PREFIX_LENGTH:
+            if char_in.upper() == char_auth.upper():
+                validation_points += 1
+        else:
+            if char_in == char_auth:
+                validation_points += 1
+            elif char_auth in OPTICAL_MAP and char_in in OPTICAL_MAP[char_auth]:
+                validation_points += TYPO_CREDIT
+    return validation_points / len(auth_plate)
+
+
+def _confusion_classes():
+    """Group characters (case-insensitively) that OPTICAL_MAP links, directly or transitively."""
+    parent = {}
+
+    def find(char):
+        parent.setdefault(char, char)
+        while parent[char] != char:
+            parent[char] = parent[parent[char]]
+            char = parent[char]
+        return char
+
+    for char_auth, typos in OPTICAL_MAP.items():
+        for char_in in typos:
+            a, b = find(char_auth.upper()), find(char_in.upper())
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+    return {char: find(char) for char in parent}
+
+
+# Character -> representative of its confusion class (digits sort first, so O -> 0, I/L -> 1, S -> 5)
+CONFUSION_CLASSES = _confusion_classes()
+_CANONICAL_TABLE = str.maketrans(CONFUSION_CLASSES)
+
+
+def canonical_form(plate: str) -> str:
+    """
+    Plate with every character replaced by its confusion-class representative
+    (after strip/upper). Plates that differ only by optical typos share a form.
+    """
+    return plate.strip().upper().translate(_CANONICAL_TABLE)
@@ -0,0 +1,569 @@
+"""Plate Matcher - Compiled authorized-plate list shared by all fuzzy matching call sites."""
+
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .bktree import BKTree, max_edit_distance
+from .optical import OPTICAL_SETS, PREFIX_LENGTH, TYPO_CREDIT, canonical_form, position_score
+from .similarity import get_similarity, index_positions, sequence_ratio
+from .vectorized import NUMPY_AVAILABLE, CharCountBatch, PositionScoreBatch, np
+
+# Scorers:
+# - RATIO: similarity ratio of stripped, uppercased plates (gate logic, VehicleDB)
+# - OPTICAL: mean of the uppercased ratio and the optical-typo position score (fuzzy_logic)
+# The ratio itself comes from a similarity backend (src.matching.similarity); the default
+# "compat" backend reproduces SequenceMatcher exactly.
+RATIO = "ratio"
+OPTICAL = "optical"
+
+_NO_TYPOS = frozenset()
+# Slack added to upper bounds so float rounding can never prune a real match
+_BOUND_EPS = 1e-12
+# Highest score either scorer can give; a plate scoring it cannot be beaten
+_PERFECT = 1.0
+# Process-unique matcher ids (id() can be reused once a matcher is collected)
+_UIDS = itertools.count(1)
+
+
+def _char_counts(text: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for char in text:
+        counts[char] = counts.get(char, 0) + 1
+    return counts
+
+
+@dataclass
+class MatchStats:
+    """
+    Pruning counters. Pass one to a query method to see what that query skipped;
+    PlateMatcher.stats accumulates them over all queries.
+
+    - candidates: plates the query could have scored
+    - pruned_length: skipped because the length bound could not reach the floor
+    - pruned_overlap: skipped by the character-multiset bound (length bound passed)
+    - scored: plates that ran the full scorer
+    - canonical: plates scored up front via the confusion-class index (best_match)
+    - accepted: best_match queries answered from the confusion-class index alone (perfect score)
+    """
+    queries: int = 0
+    candidates: int = 0
+    pruned_length: int = 0
+    pruned_overlap: int = 0
+    scored: int = 0
+    canonical: int = 0
+    accepted: int = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.pruned_length + self.pruned_overlap
+
+    def merge(self, other: 'MatchStats'):
+        """Add other's counters to this one."""
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+class _Entry:
+    """One authorized plate with its precomputed forms."""
+
+    __slots__ = ('raw', 'seq', 'upper', 'norm', 'canonical', 'length', 'prefix', 'optical',
+                 'upper_b2j', 'norm_b2j', 'upper_counts', 'norm_counts')
+
+    def __init__(self, raw: str, seq: int):
+        self.raw = raw
+        self.seq = seq
+        self.upper = raw.upper()
+        self.norm = raw.strip().upper()
+        self.canonical = canonical_form(raw)
+        self.length = len(raw)
+        self.prefix = tuple(c.upper() for c in raw[:PREFIX_LENGTH])
+        self.optical = tuple(OPTICAL_SETS.get(c, _NO_TYPOS) for c in raw)
+        self.upper_b2j = index_positions(self.upper)
+        self.upper_counts = _char_counts(self.upper)
+        if self.norm == self.upper:
+            self.norm_b2j, self.norm_counts = self.upper_b2j, self.upper_counts
+        else:
+            self.norm_b2j, self.norm_counts = index_positions(self.norm), _char_counts(self.norm)
+
+
+class _Worst:
+    """Heap key that orders results worst first: lower score, then later plate."""
+
+    __slots__ = ('score', 'plate')
+
+    def __init__(self, score: float, plate: str):
+        self.score = score
+        self.plate = plate
+
+    def __lt__(self, other: '_Worst') -> bool:
+        if self.score != other.score:
+            return self.score < other.score
+        return self.plate > other.plate
+
+
+class _Query:
+    """A query prepared for one scorer: ratio text, raw text, prefix and character counts."""
+
+    __slots__ = ('text', 'raw', 'prefix', 'counts')
+
+    def __init__(self, query: str, scorer: str):
+        if scorer == RATIO:
+            self.text = self.raw = query.strip().upper()
+            self.prefix = ()
+        else:
+            self.text, self.raw = query.upper(), query
+            self.prefix = tuple(c.upper() for c in query[:PREFIX_LENGTH])
+        self.counts = _char_counts(self.text)
+
+
+class _Compiled:
+    """Per-version arrays over one scorer's candidates (NumPy only)."""
+
+    __slots__ = ('version', 'entries', 'counts', 'positions')
+
+    def __init__(self, version: int, entries: List[_Entry], scorer: str):
+        self.version = version
+        self.entries = entries
+        targets = [e.norm if scorer == RATIO else e.upper for e in entries]
+        self.counts = CharCountBatch(targets)
+        self.positions = PositionScoreBatch([e.raw for e in entries]) if scorer == OPTICAL else None
+
+
+class PlateMatcher:
+    """
+    Authorized plates compiled once for repeated fuzzy lookups.
+
+    Normalized forms, lengths and optical-typo tables are computed when a plate
+    is added, so queries only pay for scoring. `version` increments on every
+    change so callers can tell when derived results are stale; (`uid`, `version`)
+    identifies the plate list's exact state, e.g. as part of a cache key.
+
+    Before running the scorer, each candidate gets an upper bound from its
+    length (2*min(len)/(len_a+len_b)) and its character-multiset overlap with
+    the query; candidates whose bound cannot reach the threshold (all_above) or
+    beat the current best (best_match) are skipped. With NumPy installed (and
+    `vectorize` left on) the bounds and OPTICAL position scores are computed for
+    all plates at once and best_match visits candidates in bound order, stopping
+    as soon as no remaining bound can win; without NumPy, RATIO threshold
+    queries first narrow candidates with the BK-tree. Counters are kept in `stats`.
+
+    Plates are also indexed by their confusion-class form (canonical_form), so
+    an optical misread finds its plate with one dict lookup. best_match scores
+    those plates first, which lets the scan prune almost everything else.
+
+    `backend` selects the similarity ratio (see SIMILARITY_BACKENDS). "compat"
+    gives the same scores as difflib; it reuses each plate's character index
+    instead of building a SequenceMatcher per pair.
+    """
+
+    def __init__(self, plates: Iterable[str] = (), vectorize: bool = True, backend: str = "compat"):
+        self.vectorize = vectorize and NUMPY_AVAILABLE
+        self.backend = backend
+        self._similarity = get_similarity(backend)
+        self._compiled_cache: Dict[str, _Compiled] = {}
+        self._entries: List[_Entry] = []
+        self._by_norm: Dict[str, List[_Entry]] = {}
+        self._by_canonical: Dict[str, List[_Entry]] = {}
+        self._seq = 0
+        # Only non-vectorized threshold queries use the BK-tree; built on first use
+        self._norm_index: Optional[BKTree] = None
+        self._lock = threading.RLock()
+        self.uid = next(_UIDS)
+        self.version = 0
+        self.stats = MatchStats()
+        for plate in plates:
+            self.add(plate)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, plate: str) -> bool:
+        return plate.strip().upper() in self._by_norm
+
+    @property
+    def plates(self) -> Tuple[str, ...]:
+        """Authorized plates in insertion order, as given."""
+        return tuple(entry.raw for entry in self._entries)
+
+    def add(self, plate: str) -> bool:
+        """Add a plate. Returns False for empty plates."""
+        if not plate:
+            return False
+        with self._lock:
+            entry = _Entry(plate, self._seq)
+            self._seq += 1
+            self._entries.append(entry)
+            self._by_canonical.setdefault(entry.canonical, []).append(entry)
+            if entry.norm:
+                if entry.norm not in self._by_norm:
+                    self._by_norm[entry.norm] = []
+                    if self._norm_index is not None:
+                        self._norm_index.add(entry.norm)
+                self._by_norm[entry.norm].append(entry)
+            self.version += 1
+        return True
+
+    def remove(self, plate: str) -> bool:
+        """Remove every entry whose normalized form equals the plate's. Returns True if any removed."""
+        norm = plate.strip().upper()
+        with self._lock:
+            if self._by_norm.pop(norm, None) is None:
+                return False
+            self._entries = [entry for entry in self._entries if entry.norm != norm]
+            canonical = canonical_form(norm)
+            remaining = [e for e in self._by_canonical[canonical] if e.norm != norm]
+            if remaining:
+                self._by_canonical[canonical] = remaining
+            else:
+                del self._by_canonical[canonical]
+            if self._norm_index is not None:
+                self._norm_index.remove(norm)
+            self.version += 1
+        return True
+
+    def reset_stats(self):
+        """Zero the cumulative pruning counters."""
+        with self._lock:
+            self.stats = MatchStats()
+
+    # --- scoring -------------------------------------------------------
+
+    def _candidates(self, scorer: str) -> List[_Entry]:
+        if scorer == RATIO:
+            # One entry per distinct normalized plate, first-added wins
+            with self._lock:
+                return [entries[0] for entries in self._by_norm.values()]
+        if scorer == OPTICAL:
+            return self._entries
+        raise ValueError(f"Unknown scorer: {scorer}")
+
+    def _canonical_candidates(self, query: str, scorer: str) -> List[_Entry]:
+        """Candidates sharing the query's confusion-class form, in insertion order."""
+        if scorer not in (RATIO, OPTICAL):
+            raise ValueError(f"Unknown scorer: {scorer}")
+        with self._lock:
+            entries = self._by_canonical.get(canonical_form(query), ())
+            if scorer == RATIO:
+                # Whitespace-only plates have no normalized form and are never RATIO candidates
+                return [e for e in entries if e.norm and self._by_norm[e.norm][0] is e]
+            return list(entries)
+
+    def _compiled(self, scorer: str) -> _Compiled:
+        """Return NumPy arrays for the current version, rebuilding if stale."""
+        with self._lock:
+            compiled = self._compiled_cache.get(scorer)
+            if compiled is None or compiled.version != self.version:
+                compiled = _Compiled(self.version, list(self._candidates(scorer)), scorer)
+                self._compiled_cache[scorer] = compiled
+        return compiled
+
+    def _ratio(self, query: str, entry: _Entry, scorer: str) -> float:
+        """Similarity of an already normalized query to the entry's form for this scorer."""
+        if scorer == RATIO:
+            target, b2j = entry.norm, entry.norm_b2j
+        else:
+            target, b2j = entry.upper, entry.upper_b2j
+        if self.backend == "compat":
+            return sequence_ratio(query, target, b2j)
+        return self._similarity(query, target)
+
+    @staticmethod
+    def _position(q: _Query, entry: _Entry) -> float:
+        validation_points = 0
+        for i in range(min(len(q.raw), entry.length)):
+            if i < PREFIX_LENGTH:
+                if q.prefix[i] == entry.prefix[i]:
+                    validation_points += 1
+            elif q.raw[i] == entry.raw[i]:
+                validation_points += 1
+            elif q.raw[i] in entry.optical[i]:
+                validation_points += TYPO_CREDIT
+        return validation_points / entry.length
+
+    def _score(self, q: _Query, entry: _Entry, scorer: str, position: Optional[float]) -> float:
+        if scorer == RATIO:
+            return self._ratio(q.text, entry, RATIO)
+        return (self._ratio(q.text, entry, OPTICAL) + position) / 2
+
+    def _ratio_bounds(self, query_length, lengths, overlaps, vector: bool):
+        """(length bound, overlap bound) on the ratio, for ints or NumPy arrays."""
+        low, high = (np.minimum, np.maximum) if vector else (min, max)
+        if self.backend == "levenshtein":
+            longest = high(lengths, query_length)
+            return low(lengths, query_length) / longest, overlaps / longest
+        total = lengths + query_length
+        return 2.0 * low(lengths, query_length) / total, 2.0 * overlaps / total
+
+    def _bounds(self, q: _Query, scorer: str, entries: Optional[List[_Entry]] = None):
+        """
+        Return (entries, length_bounds, bounds, positions) for the candidates.
+        Arrays when vectorized over all candidates, lists otherwise; positions is None for RATIO.
+        """
+        if entries is None and self.vectorize:
+            compiled = self._compiled(scorer)
+            positions = None
+            if scorer == OPTICAL:
+                positions = compiled.positions.scores(q.raw)
+            if scorer == RATIO or positions is not None:
+                length_ub, ub = self._ratio_bounds(
+                    len(q.text), compiled.counts.lengths, compiled.counts.overlap(q.text), vector=True)
+                if positions is not None:
+                    length_ub, ub = (length_ub + positions) / 2, (ub + positions) / 2
+                return compiled.entries, length_ub + _BOUND_EPS, ub + _BOUND_EPS, positions
+        if entries is None:
+            entries = self._candidates(scorer)
+        length_bounds, bounds = [], []
+        positions = [] if scorer == OPTICAL else None
+        for entry in entries:
+            counts = entry.norm_counts if scorer == RATIO else entry.upper_counts
+            overlap = 0
+            for char, count in q.counts.items():
+                overlap += min(count, counts.get(char, 0))
+            length = len(entry.norm) if scorer == RATIO else len(entry.upper)
+            length_ub, ub = self._ratio_bounds(len(q.text), length, overlap, vector=False)
+            if positions is not None:
+                position = self._position(q, entry)
+                positions.append(position)
+                length_ub, ub = (length_ub + position) / 2, (ub + position) / 2
+            length_bounds.append(length_ub + _BOUND_EPS)
+            bounds.append(ub + _BOUND_EPS)
+        return entries, length_bounds, bounds, positions
+
+    def _record(self, query_stats: MatchStats, stats: Optional[MatchStats], queries: int = 1):
+        query_stats.queries = queries
+        with self._lock:
+            self.stats.merge(query_stats)
+        if stats is not None:
+            stats.merge(query_stats)
+
+    @staticmethod
+    def _result(entry: _Entry, scorer: str) -> str:
+        return entry.norm if scorer == RATIO else entry.raw
+
+    # --- queries -------------------------------------------------------
+
+    def position_scores(self, query: str) -> List[Tuple[str, float]]:
+        """Return (plate, optical-typo position score) for every plate, in insertion order."""
+        if self.vectorize:
+            compiled = self._compiled(OPTICAL)
+            scores = compiled.positions.scores(query)
+            if scores is not None:
+                return list(zip((e.raw for e in compiled.entries), scores.tolist()))
+        return [(entry.raw, position_score(query, entry.raw)) for entry in self._entries]
+
+    def best_match(
+        self, query: str, scorer: str = RATIO, stats: Optional[MatchStats] = None,
+        stop_on_exact: bool = False,
+    ) -> Tuple[Optional[str], float]:
+        """
+        Return (plate, score) of the highest-scoring plate, or (None, 0.0) if none scores above 0.
+        Ties go to the plate added first. RATIO returns normalized plates, OPTICAL the plates as given.
+
+        With `stop_on_exact`, a plate sharing the query's confusion-class form that scores
+        a perfect 1.0 is returned without scanning the rest. The result is always the one
+        the full scan gives.
+        """
+        query_stats = MatchStats()
+        plate, score = self._search(query, scorer, query_stats, stop_on_exact, 0.0)
+        self._record(query_stats, stats)
+        if plate is None:
+            return None, 0.0
+        return plate, score
+
+    def best_of(
+        self, queries: Iterable[str], scorer: str = RATIO, stats: Optional[MatchStats] = None,
+        stop_on_exact: bool = False,
+    ) -> Tuple[Optional[str], Optional[str], float]:
+        """
+        Score several readings of one plate (e.g. every OCR candidate from a frame or a
+        burst) and return (query, plate, score) for the best pair, or (None, None, 0.0).
+
+        Queries share one pruning floor, so once a reading scores well the others
+        only visit plates that could beat it. Ties go to the earlier query, then to
+        the plate added first; repeated queries are scored once. With `stop_on_exact`,
+        stops at the first reading whose best plate scores a perfect 1.0.
+        """
+        query_stats = MatchStats()
+        best: Tuple[Optional[str], Optional[str], float] = (None, None, 0.0)
+        searched = 0
+        for query in dict.fromkeys(queries):
+            searched += 1
+            plate, score = self._search(query, scorer, query_stats, stop_on_exact, best[2])
+            if plate is not None:
+                best = (query, plate, score)
+            if stop_on_exact and best[1] is not None and best[2] >= _PERFECT:
+                break
+        self._record(query_stats, stats, queries=searched)
+        return best
+
+    def _search(
+        self, query: str, scorer: str, query_stats: MatchStats, stop_on_exact: bool, floor: float
+    ) -> Tuple[Optional[str], float]:
+        """best_match core: the best (plate, score) scoring above floor, or (None, floor)."""
+        q = _Query(query, scorer)
+        best_plate: Optional[str] = None
+        best_score = floor
+        best_seq = -1
+        seeded = self._canonical_candidates(query, scorer)
+        for entry in seeded:
+            position = self._position(q, entry) if scorer == OPTICAL else None
+            score = self._score(q, entry, scorer, position)
+            if score > best_score or (score == best_score and best_plate is not None and entry.seq < best_seq):
+                best_plate, best_score, best_seq = self._result(entry, scorer), score, entry.seq
+        query_stats.canonical += len(seeded)
+        # Only a perfect score is final: ties were settled among the seeded plates (equal
+        # plates share a confusion class), so skipping the scan cannot change the answer
+        if stop_on_exact and best_plate is not None and best_score >= _PERFECT:
+            query_stats.candidates += len(seeded)
+            query_stats.scored += len(seeded)
+            query_stats.accepted += 1
+            return best_plate, best_score
+        # The seeded best prunes the scan; seeded plates that survive are simply rescored
+        entries, length_ub, ub, positions = self._bounds(q, scorer)
+        query_stats.candidates += len(entries)
+        in_bound_order = not isinstance(ub, list)
+        if in_bound_order:
+            order, bounds = np.argsort(-ub, kind='stable').tolist(), ub.tolist()
+        else:
+            order, bounds = range(len(entries)), ub
+        for rank, i in enumerate(order):
+            if bounds[i] < best_score:
+                if in_bound_order:
+                    # Nothing left can reach the best score
+                    rest = np.asarray(order[rank:], dtype=np.intp)
+                    pruned_length = int(np.count_nonzero(length_ub[rest] < best_score))
+                    query_stats.pruned_length += pruned_length
+                    query_stats.pruned_overlap += len(rest) - pruned_length
+                    break
+                if length_ub[i] < best_score:
+                    query_stats.pruned_length += 1
+                else:
+                    query_stats.pruned_overlap += 1
+                continue
+            entry = entries[i]
+            position = None if positions is None else float(positions[i])
+            score = self._score(q, entry, scorer, position)
+            query_stats.scored += 1
+            if score > best_score or (score == best_score and best_plate is not None and entry.seq < best_seq):
+                best_plate, best_score, best_seq = self._result(entry, scorer), score, entry.seq
+        return best_plate, best_score
+
+    def top_k(
+        self, query: str, k: int, scorer: str = RATIO, threshold: float = float('-inf'),
+        stats: Optional[MatchStats] = None, candidates: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Return the k best (plate, score) pairs with score >= threshold, best first (ties by plate):
+        the first k of all_above(), without scoring or sorting the rest.
+
+        A k-entry heap holds the best so far; once full, plates whose bound is below
+        its worst score are skipped, and with NumPy the scan stops at the first such bound.
+        """
+        if k <= 0:
+            return []
+        q = _Query(query, scorer)
+        entries = self._narrow(q, scorer, threshold, candidates)
+        entries, length_ub, ub, positions = self._bounds(q, scorer, entries)
+        query_stats = MatchStats(candidates=len(entries))
+        in_bound_order = not isinstance(ub, list)
+        if in_bound_order:
+            order, bounds = np.argsort(-ub, kind='stable').tolist(), ub.tolist()
+        else:
+            order, bounds = range(len(entries)), ub
+        heap: List[_Worst] = []
+        floor = threshold
+        for rank, i in enumerate(order):
+            if bounds[i] < floor:
+                if in_bound_order:
+                    rest = np.asarray(order[rank:], dtype=np.intp)
+                    query_stats.pruned_length = int(np.count_nonzero(length_ub[rest] < floor))
+                    query_stats.pruned_overlap = len(rest) - query_stats.pruned_length
+                    break
+                if length_ub[i] < floor:
+                    query_stats.pruned_length += 1
+                else:
+                    query_stats.pruned_overlap += 1
+                continue
+            position = None if positions is None else float(positions[i])
+            score = self._score(q, entries[i], scorer, position)
+            query_stats.scored += 1
+            if score < threshold:
+                continue
+            item = _Worst(score, self._result(entries[i], scorer))
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif heap[0] < item:
+                heapq.heapreplace(heap, item)
+            if len(heap) == k:
+                floor = max(threshold, heap[0].score)
+        self._record(query_stats, stats)
+        return [(item.plate, item.score) for item in sorted(heap, reverse=True)]
+
+    def _narrow(
+        self, q: _Query, scorer: str, threshold: float, candidates: Optional[Iterable[str]]
+    ) -> Optional[List[_Entry]]:
+        """Entries to consider for a threshold query, or None for all of them."""
+        if candidates is not None:
+            wanted = set(candidates)
+            with self._lock:
+                if scorer == RATIO:
+                    return [self._by_norm[plate][0] for plate in wanted if plate in self._by_norm]
+                return [entry for entry in self._candidates(scorer) if entry.norm in wanted]
+        if scorer == RATIO and not self.vectorize:
+            # Without NumPy the BK-tree narrows candidates; with it, vectorized bounds are cheaper
+            radius = max_edit_distance(len(q.text), threshold)
+            if radius is not None:
+                with self._lock:
+                    if self._norm_index is None:
+                        self._norm_index = BKTree(self._by_norm)
+                    return [self._by_norm[plate][0] for plate, _ in self._norm_index.search(q.text, radius)]
+        return None
+
+    def all_above(
+        self, query: str, threshold: float, scorer: str = RATIO, stats: Optional[MatchStats] = None,
+        candidates: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Return every (plate, score) with score >= threshold, best first (ties by plate).
+        `candidates` (normalized plates, e.g. from an index) restricts the search to those plates.
+        """
+        q = _Query(query, scorer)
+        entries = self._narrow(q, scorer, threshold, candidates)
+        entries, length_ub, ub, positions = self._bounds(q, scorer, entries)
+        query_stats = MatchStats(candidates=len(entries))
+        if isinstance(ub, list):
+            keep = [i for i in range(len(entries)) if ub[i] >= threshold]
+            query_stats.pruned_length = sum(1 for bound in length_ub if bound < threshold)
+        else:
+            keep = np.flatnonzero(ub >= threshold).tolist()
+            query_stats.pruned_length = int(np.count_nonzero(length_ub < threshold))
+        query_stats.pruned_overlap = len(entries) - len(keep) - query_stats.pruned_length
+        query_stats.scored = len(keep)
+        matches = []
+        for i in keep:
+            position = None if positions is None else float(positions[i])
+            score = self._score(q, entries[i], scorer, position)
+            if score >= threshold:
+                matches.append((self._result(entries[i], scorer), score))
+        matches.sort(key=lambda x: (-x[1], x[0]))
+        self._record(query_stats, stats)
+        return matches
+
+
+@lru_cache(maxsize=8)
+def _compile(plates: Tuple[str, ...]) -> PlateMatcher:
+    return PlateMatcher(plates)
+
+
+def get_plate_matcher(plates: Union[PlateMatcher, Iterable[str]]) -> PlateMatcher:
+    """
+    Return a compiled matcher for plates. A PlateMatcher is returned as is; a list is
+    compiled once and reused until a call passes a different list. Do not mutate the result.
+    """
+    if isinstance(plates, PlateMatcher):
+        return plates
+    return _compile(tuple(plates))
@@ -0,0 +1,151 @@
+"""Similarity kernels - Fast replacements for difflib.SequenceMatcher on short plates.
+
+Backends (see SIMILARITY_BACKENDS):
+- "difflib": SequenceMatcher(None, a, b).ratio(), the original scorer
+- "compat":  same algorithm without the per-pair matcher object; identical ratios
+- "indel":   2*LCS/(len(a)+len(b)) with a bit-parallel LCS (an upper bound of "compat")
+- "levenshtein": 1 - distance/max(len) with the Myers/Hyyrö bit-parallel edit distance
+"""
+
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional
+
+# SequenceMatcher's autojunk heuristic only applies to sequences this long
+_AUTOJUNK_MIN = 200
+
+
+def index_positions(b: str) -> Dict[str, List[int]]:
+    """Map each character of b to its positions (SequenceMatcher's b2j without junk)."""
+    b2j: Dict[str, List[int]] = {}
+    for j, char in enumerate(b):
+        b2j.setdefault(char, []).append(j)
+    return b2j
+
+
+def matched_chars(a: str, b: str, b2j: Optional[Dict[str, List[int]]] = None) -> int:
+    """
+    Number of characters in SequenceMatcher(None, a, b)'s matching blocks.
+
+    Same recursive longest-common-substring search and tie-breaking as
+    difflib (no junk), without building a matcher object. Pass b2j from
+    index_positions(b) to reuse it across queries against the same b.
+    """
+    if b2j is None:
+        b2j = index_positions(b)
+    total = 0
+    queue = [(0, len(a), 0, len(b))]
+    while queue:
+        alo, ahi, blo, bhi = queue.pop()
+        besti, bestj, bestsize = alo, blo, 0
+        j2len: Dict[int, int] = {}
+        for i in range(alo, ahi):
+            new_j2len = {}
+            for j in b2j.get(a[i], ()):
+                if j < blo:
+                    continue
+                if j >= bhi:
+                    break
+                k = new_j2len[j] = j2len.get(j - 1, 0) + 1
+                if k > bestsize:
+                    besti, bestj, bestsize = i - k + 1, j - k + 1, k
+            j2len = new_j2len
+        if bestsize:
+            total += bestsize
+            if alo < besti and blo < bestj:
+                queue.append((alo, besti, blo, bestj))
+            if besti + bestsize < ahi and bestj + bestsize < bhi:
+                queue.append((besti + bestsize, ahi, bestj + bestsize, bhi))
+    return total
+
+
+def sequence_ratio(a: str, b: str, b2j: Optional[Dict[str, List[int]]] = None) -> float:
+    """Exactly SequenceMatcher(None, a, b).ratio(), computed without the matcher object."""
+    length = len(a) + len(b)
+    if len(b) >= _AUTOJUNK_MIN:
+        return SequenceMatcher(None, a, b).ratio()
+    if not length:
+        return 1.0
+    return 2.0 * matched_chars(a, b, b2j) / length
+
+
+def lcs_length(a: str, b: str) -> int:
+    """Longest common subsequence length (bit-parallel, one word operation per character of b)."""
+    if not a or not b:
+        return 0
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    s = mask
+    for char in b:
+        u = s & peq.get(char, 0)
+        s = ((s + u) | (s - u)) & mask
+    return len(a) - bin(s).count('1')
+
+
+def indel_ratio(a: str, b: str) -> float:
+    """2*LCS/(len(a)+len(b)); never below sequence_ratio, equal on most plate pairs."""
+    length = len(a) + len(b)
+    if not length:
+        return 1.0
+    return 2.0 * lcs_length(a, b) / length
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Levenshtein distance via the Myers/Hyyrö bit-parallel algorithm."""
+    if a == b:
+        return 0
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh = mh << 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+def levenshtein_ratio(a: str, b: str) -> float:
+    """1 - levenshtein/max(len(a), len(b)); 1.0 for two empty strings."""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    return 1.0 - levenshtein(a, b) / longest
+
+
+def difflib_ratio(a: str, b: str) -> float:
+    """The original scorer: SequenceMatcher(None, a, b).ratio()."""
+    return SequenceMatcher(None, a, b).ratio()
+
+
+SIMILARITY_BACKENDS: Dict[str, Callable[[str, str], float]] = {
+    "difflib": difflib_ratio,
+    "compat": sequence_ratio,
+    "indel": indel_ratio,
+    "levenshtein": levenshtein_ratio,
+}
+
+
+def get_similarity(backend: str) -> Callable[[str, str], float]:
+    """Return the ratio function for a backend name."""
+    try:
+        return SIMILARITY_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown similarity backend: {backend}") from None
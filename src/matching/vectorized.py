@@ -0,0 +1,124 @@
+"""Vectorized scoring - NumPy batch form of the optical-typo position score.
+
+NumPy is optional: when it is missing (or a plate is not ASCII) callers fall
+back to the scalar `position_score`.
+"""
+
+from typing import Dict, List, Sequence
+
+from .optical import OPTICAL_MAP, PREFIX_LENGTH, TYPO_CREDIT, position_score
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+
+def _build_tables():
+    upper = np.arange(256, dtype=np.uint8)
+    upper[ord('a'):ord('z') + 1] -= 32
+    optical = np.zeros((256, 256), dtype=bool)
+    for char_auth, typos in OPTICAL_MAP.items():
+        for char_in in typos:
+            optical[ord(char_auth), ord(char_in)] = True
+    return upper, optical
+
+
+_UPPER, _OPTICAL = _build_tables() if NUMPY_AVAILABLE else (None, None)
+
+
+def _encode(text: str):
+    """Return text as a uint8 array, or None if it is not ASCII."""
+    if not text.isascii():
+        return None
+    return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+
+
+class PositionScoreBatch:
+    """
+    Authorized plates packed into one uint8 matrix per plate length.
+
+    `scores(query)` returns position_score(query, plate) for every plate (in
+    the order given) using a few array operations per length bucket. Credits
+    are summed left to right, so results equal the scalar function bit for bit.
+    """
+
+    def __init__(self, plates: Sequence[str]):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for PositionScoreBatch (pip install numpy)")
+        self.size = len(plates)
+        by_length: Dict[int, List[int]] = {}
+        self._scalar: List[int] = []
+        self._plates = plates
+        for i, plate in enumerate(plates):
+            if plate and plate.isascii():
+                by_length.setdefault(len(plate), []).append(i)
+            else:
+                self._scalar.append(i)
+        self._buckets = []
+        for length, indices in sorted(by_length.items()):
+            codes = np.frombuffer(
+                "".join(plates[i] for i in indices).encode('ascii'), dtype=np.uint8
+            ).reshape(len(indices), length)
+            self._buckets.append((length, np.asarray(indices, dtype=np.intp), codes, _UPPER[codes]))
+
+    def scores(self, query: str):
+        """Return a float64 array of position scores, or None if the query is not ASCII."""
+        q = _encode(query)
+        if q is None:
+            return None
+        out = np.zeros(self.size, dtype=np.float64)
+        q_upper = _UPPER[q]
+        for length, indices, codes, codes_upper in self._buckets:
+            m = min(len(q), length)
+            if m == 0:
+                continue
+            p = min(m, PREFIX_LENGTH)
+            credits = np.zeros((len(indices), m), dtype=np.float64)
+            credits[:, :p] = codes_upper[:, :p] == q_upper[:p]
+            if m > p:
+                tail = codes[:, p:m]
+                exact = tail == q[p:m]
+                typo = _OPTICAL[tail, q[p:m]] & ~exact
+                credits[:, p:m] = exact
+                credits[:, p:m][typo] = TYPO_CREDIT
+            # cumsum adds strictly left to right, like the scalar loop
+            out[indices] = np.cumsum(credits, axis=1)[:, -1] / length
+        for i in self._scalar:
+            if self._plates[i]:
+                out[i] = position_score(query, self._plates[i])
+        return out
+
+
+class CharCountBatch:
+    """
+    Character counts of many strings, for multiset-overlap upper bounds.
+
+    `overlap(query)` returns sum over characters of min(count in query, count in
+    string) for every string; `lengths` holds the string lengths.
+    """
+
+    def __init__(self, strings: Sequence[str]):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for CharCountBatch (pip install numpy)")
+        self.lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+        codes = np.frombuffer("".join(strings).encode('utf-32-le'), dtype=np.uint32)
+        alphabet, columns = np.unique(codes, return_inverse=True)
+        self._column = {chr(code): i for i, code in enumerate(alphabet.tolist())}
+        self._counts = np.zeros((len(strings), len(alphabet)), dtype=np.int16)
+        rows = np.repeat(np.arange(len(strings)), self.lengths)
+        np.add.at(self._counts, (rows, columns), 1)
+
+    def overlap(self, query: str):
+        """Return an int64 array of multiset overlaps between query and every string."""
+        out = np.zeros(len(self.lengths), dtype=np.int64)
+        wanted: Dict[int, int] = {}
+        for char in query:
+            column = self._column.get(char)
+            if column is not None:
+                wanted[column] = wanted.get(column, 0) + 1
+        for column, count in wanted.items():
+            out += np.minimum(self._counts[:, column], count)
+        return out
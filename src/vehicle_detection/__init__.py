@@ -2,5 +2,12 @@
 
 from .detector import VehicleDetector
 from .sensor_mock import MockSensor
+from .scheduling import LoopStats
+from src.core.bounded_queue import DROP_NEWEST, DROP_OLDEST
+from .dispatch import EventDispatcher, INLINE, THREAD, PROCESS
+from .lanes import LaneManager
 
-__all__ = ['VehicleDetector', 'MockSensor']
+__all__ = [
+    'VehicleDetector', 'MockSensor', 'LoopStats', 'LaneManager',
+    'EventDispatcher', 'INLINE', 'THREAD', 'PROCESS', 'DROP_NEWEST', 'DROP_OLDEST',
+]
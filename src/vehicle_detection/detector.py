@@ -1,75 +1,277 @@
 """Vehicle Detector - Detects vehicles based on distance threshold and emits events."""
 
 import time
-from typing import Callable, Optional
+from collections.abc import Sequence as SequenceABC
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional, Sequence, Tuple
 from datetime import datetime
+from .dispatch import INLINE, EventDispatcher
+from .filters import RollingMedian
+from .scheduling import LoopStats, run_every, run_every_async
 from .sensor_mock import MockSensor
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
 VEHICLE_DETECTED = "VEHICLE_DETECTED"
 NO_VEHICLE = "NO_VEHICLE"
 
 
+class _CallbackList(SequenceABC):
+    """
+    Live view of the callbacks registered for one event type, kept so code written
+    against the old list (`event_listeners[t].append(cb)`) still works: append()
+    subscribes inline and remove() unsubscribes. Other list mutations raise.
+    """
+
+    def __init__(self, dispatcher: EventDispatcher, event_type: str):
+        self._dispatcher = dispatcher
+        self._event_type = event_type
+
+    def _callbacks(self) -> List[Callable]:
+        return [listener.callback for listener in self._dispatcher.listeners(self._event_type)]
+
+    def __getitem__(self, index):
+        return self._callbacks()[index]
+
+    def __len__(self) -> int:
+        return len(self._dispatcher.listeners(self._event_type))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SequenceABC):
+            return NotImplemented
+        return self._callbacks() == list(other)
+
+    def __repr__(self) -> str:
+        return repr(self._callbacks())
+
+    def append(self, callback: Callable):
+        self._dispatcher.subscribe(self._event_type, callback)
+
+    def remove(self, callback: Callable):
+        if not self._dispatcher.unsubscribe(self._event_type, callback):
+            raise ValueError(f"{callback!r} is not registered for {self._event_type}")
+
+
 class VehicleDetector:
-    """Detects vehicles using distance threshold logic."""
+    """
+    Detects vehicles using distance threshold logic.
+    
+    The defaults flip state on every single reading that crosses threshold_cm.
+    To stop noisy readings near the threshold from producing event storms:
+    - exit_threshold_cm: once detected, the vehicle is only gone when a reading
+      reaches this (>= threshold_cm) distance, giving a hysteresis band
+    - min_dwell_s: a new state must hold for this long (by `clock`) before its
+      event fires; readings that fall back cancel the pending change
+    - median_window: decide on the rolling median of the last N readings
     
-    def __init__(self, sensor: MockSensor, threshold_cm: float = 10.0):
+    Listeners run inline by default. Register slow ones (DB writes, HTTP
+    pushes, OCR) with policy THREAD or PROCESS so they are queued instead and
+    never delay the next reading; see dispatch.EventDispatcher.
+    
+    `lane_id` tags every event (None on single-lane sites). Detectors given
+    the same `dispatcher` share its listeners, queues and workers.
+    """
+    
+    def __init__(
+        self, sensor: MockSensor, threshold_cm: float = 10.0, exit_threshold_cm: Optional[float] = None,
+        min_dwell_s: float = 0.0, median_window: int = 1, clock: Callable[[], float] = time.monotonic,
+        lane_id: Optional[str] = None, dispatcher: Optional[EventDispatcher] = None,
+    ):
+        if exit_threshold_cm is not None and exit_threshold_cm < threshold_cm:
+            raise ValueError("exit_threshold_cm must be at least threshold_cm")
         self.sensor = sensor
         self.threshold_cm = threshold_cm
+        self._exit_threshold_cm = exit_threshold_cm
+        self.min_dwell_s = min_dwell_s
+        self.clock = clock
+        self._median = RollingMedian(median_window) if median_window > 1 else None
+        self._pending_since: Optional[float] = None
         self.current_state = NO_VEHICLE
-        self.event_listeners = {
-            VEHICLE_DETECTED: [],
-            NO_VEHICLE: []
-        }
+        self.lane_id = lane_id
+        self.dispatcher = dispatcher if dispatcher is not None else EventDispatcher()
     
-    def set_threshold(self, threshold_cm: float):
-        """Update detection threshold."""
+    @property
+    def exit_threshold_cm(self) -> float:
+        """Distance at or beyond which a detected vehicle counts as gone."""
+        if self._exit_threshold_cm is None:
+            return self.threshold_cm
+        return self._exit_threshold_cm
+    
+    def set_threshold(self, threshold_cm: float, exit_threshold_cm: Optional[float] = None):
+        """Update detection threshold (and the exit threshold; None keeps it equal to the threshold)."""
+        if exit_threshold_cm is not None and exit_threshold_cm < threshold_cm:
+            raise ValueError("exit_threshold_cm must be at least threshold_cm")
         self.threshold_cm = threshold_cm
+        self._exit_threshold_cm = exit_threshold_cm
+    
+    @property
+    def event_listeners(self) -> Mapping[str, _CallbackList]:
+        """Registered callbacks by event type (append/remove register or drop inline listeners)."""
+        return MappingProxyType({
+            event_type: _CallbackList(self.dispatcher, event_type)
+            for event_type in (VEHICLE_DETECTED, NO_VEHICLE)
+        })
+    
+    def on_vehicle_detected(self, callback: Callable, policy: str = INLINE, **options):
+        """Register callback for VEHICLE_DETECTED event (options: max_queue, overflow, workers)."""
+        self.dispatcher.subscribe(VEHICLE_DETECTED, callback, policy, **options)
+    
+    def on_no_vehicle(self, callback: Callable, policy: str = INLINE, **options):
+        """Register callback for NO_VEHICLE event (options: max_queue, overflow, workers)."""
+        self.dispatcher.subscribe(NO_VEHICLE, callback, policy, **options)
     
-    def on_vehicle_detected(self, callback: Callable):
-        """Register callback for VEHICLE_DETECTED event."""
-        self.event_listeners[VEHICLE_DETECTED].append(callback)
+    def get_listener_stats(self) -> List[dict]:
+        """Delivered/dropped/failed counts and latency histogram per listener."""
+        return self.dispatcher.get_stats()
     
-    def on_no_vehicle(self, callback: Callable):
-        """Register callback for NO_VEHICLE event."""
-        self.event_listeners[NO_VEHICLE].append(callback)
+    def close(self, timeout: Optional[float] = 5.0):
+        """Deliver queued events and stop the listener workers."""
+        self.dispatcher.close(timeout)
     
-    def _emit_event(self, event_type: str, data: dict):
-        """Emit event to all registered listeners."""
+    def _emit_event(self, event_type: str, data: dict, timestamp: Optional[str] = None):
+        """Emit event to all registered listeners (timestamp defaults to now)."""
         event = {
             'type': event_type,
-            'timestamp': datetime.now().isoformat(),
-            'data': data
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'data': data,
+            'lane_id': self.lane_id
         }
-        for callback in self.event_listeners[event_type]:
-            callback(event)
+        self.dispatcher.dispatch(event_type, event)
     
     def check(self) -> Optional[str]:
         """Check current sensor reading and emit events if state changed."""
-        distance = self.sensor.get_distance()
-        
-        if distance < self.threshold_cm:
-            if self.current_state != VEHICLE_DETECTED:
-                self.current_state = VEHICLE_DETECTED
-                self._emit_event(VEHICLE_DETECTED, {
-                    'distance': distance,
-                    'threshold': self.threshold_cm
-                })
-                return VEHICLE_DETECTED
+        return self.process_reading(self.sensor.get_distance())
+    
+    def process_reading(
+        self, distance: float, now: Optional[float] = None, timestamp: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Apply one reading taken at `now` (by `clock`, default: now); emit and return the
+        event type if the state changes. `timestamp` stamps the event instead of the wall clock.
+        """
+        if now is None:
+            now = self.clock()
+        value = distance if self._median is None else self._median.push(distance)
+        if self.current_state == VEHICLE_DETECTED:
+            target = None if value < self.exit_threshold_cm else NO_VEHICLE
         else:
-            if self.current_state != NO_VEHICLE:
-                self.current_state = NO_VEHICLE
-                self._emit_event(NO_VEHICLE, {
-                    'distance': distance,
-                    'threshold': self.threshold_cm
-                })
-                return NO_VEHICLE
-        
-        return None
-    
-    def run_continuous(self, interval_seconds: float = 0.5, max_iterations: Optional[int] = None):
-        """Run continuous detection loop."""
-        iteration = 0
-        while max_iterations is None or iteration < max_iterations:
-            self.check()
-            time.sleep(interval_seconds)
-            iteration += 1
+            target = VEHICLE_DETECTED if value < self.threshold_cm else None
+        if target is None:
+            self._pending_since = None
+            return None
+        if self.min_dwell_s > 0:
+            if self._pending_since is None:
+                self._pending_since = now
+            if now - self._pending_since < self.min_dwell_s:
+                return None
+            self._pending_since = None
+        self.current_state = target
+        self._emit_event(target, {
+            'distance': distance,
+            'threshold': self.threshold_cm
+        }, timestamp)
+        return target
+    
+    @property
+    def _filtered(self) -> bool:
+        """True if hysteresis, dwell or the median filter make a reading's effect depend on history."""
+        return self.exit_threshold_cm != self.threshold_cm or self.min_dwell_s > 0 or self._median is not None
+    
+    def process_batch(self, distances, timestamps: Optional[Sequence] = None) -> List[Tuple[int, str]]:
+        """
+        Feed a whole trace of readings, as if check() ran once per sample.
+
+        Emits the same events, in the same order, as the per-sample loop and
+        leaves current_state where it would end; returns (sample index, event type)
+        for each event. The state changes are found with NumPy (a diff of the
+        below-threshold mask), so only transitions cost Python time.
+        `timestamps` (datetimes, ISO strings or epoch seconds, one per sample)
+        stamp the events instead of the wall clock, and time min_dwell_s.
+        With hysteresis, dwell or the median filter on, samples go through the
+        same per-reading step as check().
+        """
+        if timestamps is not None and len(timestamps) != len(distances):
+            raise ValueError("timestamps must have one entry per distance")
+        if self._filtered:
+            emitted = []
+            readings = np.asarray(distances, dtype=float).tolist() if np is not None else distances
+            for i, distance in enumerate(readings):
+                if timestamps is None:
+                    event_type = self.process_reading(float(distance))
+                else:
+                    event_type = self.process_reading(
+                        float(distance), _seconds(timestamps[i]), _isoformat(timestamps[i])
+                    )
+                if event_type is not None:
+                    emitted.append((i, event_type))
+            return emitted
+        if np is not None:
+            values = np.asarray(distances, dtype=float)
+            below = values < self.threshold_cm
+            previous = np.empty_like(below)
+            previous[:1] = self.current_state == VEHICLE_DETECTED
+            previous[1:] = below[:-1]
+            changes = np.flatnonzero(below != previous).tolist()
+            readings = values.tolist()
+        else:
+            readings = [float(d) for d in distances]
+            detected = self.current_state == VEHICLE_DETECTED
+            changes = []
+            for i, distance in enumerate(readings):
+                if (distance < self.threshold_cm) != detected:
+                    detected = not detected
+                    changes.append(i)
+        emitted = []
+        for i in changes:
+            event_type = NO_VEHICLE if self.current_state == VEHICLE_DETECTED else VEHICLE_DETECTED
+            self.current_state = event_type
+            stamp = None if timestamps is None else _isoformat(timestamps[i])
+            self._emit_event(event_type, {
+                'distance': readings[i],
+                'threshold': self.threshold_cm
+            }, stamp)
+            emitted.append((i, event_type))
+        return emitted
+    
+    def run_continuous(
+        self, interval_seconds: float = 0.5, max_iterations: Optional[int] = None
+    ) -> LoopStats:
+        """Run continuous detection loop (one check() every interval_seconds, on a fixed schedule)."""
+        return run_every(self.check, interval_seconds, max_iterations)
+    
+    async def run(
+        self, interval_seconds: float = 0.5, max_iterations: Optional[int] = None,
+        stats: Optional[LoopStats] = None,
+    ) -> LoopStats:
+        """
+        Asyncio detection loop: check() every interval_seconds against the event
+        loop's monotonic clock, without holding a thread, so many detectors can
+        share one loop. Cancel the task to stop it; pass `stats` to read the
+        jitter/overrun figures while it runs or after cancellation.
+        """
+        return await run_every_async(self.check, interval_seconds, max_iterations, stats)
+
+
+def _isoformat(timestamp) -> str:
+    """ISO 8601 string for a datetime, ISO string or epoch seconds."""
+    if isinstance(timestamp, str):
+        return timestamp
+    if isinstance(timestamp, datetime):
+        return timestamp.isoformat()
+    if np is not None and isinstance(timestamp, np.datetime64):
+        return str(timestamp)
+    return datetime.fromtimestamp(float(timestamp)).isoformat()
+
+
+def _seconds(timestamp) -> float:
+    """Seconds (any fixed origin) for a datetime, ISO string or epoch seconds."""
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp).timestamp()
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if np is not None and isinstance(timestamp, np.datetime64):
+        return timestamp.astype('datetime64[ns]').astype('int64') / 1e9
+    return float(timestamp)
@@ -0,0 +1,234 @@
+"""Event dispatch - Deliver detector events to listeners inline, on threads or in worker processes."""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src.core.bounded_queue import DEFAULT_OVERFLOW, BoundedQueue
+
+logger = logging.getLogger(__name__)
+
+# Delivery policies
+INLINE = "inline"    # called in the detector's thread, before check() returns (the original behaviour)
+THREAD = "thread"    # queued and called by the listener's own worker thread(s)
+PROCESS = "process"  # queued, then run in the dispatcher's process pool (callback and event must pickle)
+POLICIES = (INLINE, THREAD, PROCESS)
+
+_STOP = object()
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of delivery latencies (emit to callback return), in milliseconds."""
+
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-th percentile; max_ms for the overflow bucket."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(self.BOUNDS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+            'buckets': {f"<={b}": n for b, n in zip(self.BOUNDS_MS, self.counts) if n},
+        }
+
+
+class Listener:
+    """
+    One registered callback and how events reach it.
+
+    INLINE listeners run synchronously and let exceptions propagate, exactly
+    like a plain callback. THREAD and PROCESS listeners get a bounded queue
+    drained by `workers` threads (one keeps events in order); submit() never
+    blocks, and when the queue is full `overflow` decides which event is
+    dropped. Their exceptions are counted in `failed` and logged.
+    """
+
+    def __init__(
+        self, callback: Callable, policy: str = INLINE, max_queue: int = 1000,
+        overflow: str = DEFAULT_OVERFLOW, workers: int = 1,
+        process_pool: Optional[ProcessPoolExecutor] = None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown dispatch policy: {policy}")
+        self.callback = callback
+        self.name = getattr(callback, '__name__', type(callback).__name__)
+        self.policy = policy
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+        self._process_pool = process_pool
+        self._queue: Optional[BoundedQueue] = None
+        self._threads: List[threading.Thread] = []
+        if policy != INLINE:
+            self._queue = BoundedQueue(max_queue, overflow)
+            for i in range(max(1, workers)):
+                thread = threading.Thread(target=self._run, name=f"listener-{self.name}-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, event: dict):
+        """Deliver (INLINE) or queue (THREAD/PROCESS) one event."""
+        queued_at = time.perf_counter()
+        if self._queue is None:
+            self.callback(event)
+            self._delivered(queued_at)
+            return
+        if not self._threads or not self._queue.offer((event, queued_at)):
+            # Closed (its stop markers must not be dropped), or full
+            with self._lock:
+                self.dropped += 1
+
+    def _delivered(self, queued_at: float):
+        with self._lock:
+            self.delivered += 1
+            self.latency.record(time.perf_counter() - queued_at)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            event, queued_at = item
+            try:
+                if self._process_pool is not None:
+                    self._process_pool.submit(self.callback, event).result()
+                else:
+                    self.callback(event)
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                logger.exception("Listener %s failed", self.name)
+            else:
+                self._delivered(queued_at)
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event was handled. Returns False on timeout."""
+        return self._queue is None or self._queue.wait_empty(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Handle the queued events, then stop the worker threads."""
+        if self._queue is None or not self._threads:
+            return
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            # Blocking put: the marker must get in even if the queue is full
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'listener': self.name,
+                'policy': self.policy,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'queued': self._queue.qsize() if self._queue is not None else 0,
+                'latency': self.latency.to_dict(),
+            }
+
+
+class EventDispatcher:
+    """
+    Routes events to listeners by event type.
+
+    A callback subscribed to several event types is one Listener with one
+    queue, so it still sees its events in order. PROCESS listeners share one
+    process pool of `process_workers`, created on first use.
+    """
+
+    def __init__(self, process_workers: int = 2):
+        self.process_workers = process_workers
+        self._by_type: Dict[str, List[Listener]] = {}
+        self._by_callback: Dict[Callable, Listener] = {}
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    def subscribe(self, event_type: str, callback: Callable, policy: str = INLINE, **options) -> Listener:
+        """Register callback for event_type; options are passed to Listener (max_queue, overflow, workers)."""
+        listener = self._by_callback.get(callback)
+        if listener is None:
+            if policy == PROCESS and self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            listener = Listener(
+                callback, policy, process_pool=self._process_pool if policy == PROCESS else None, **options
+            )
+            self._by_callback[callback] = listener
+        elif listener.policy != policy:
+            raise ValueError(f"{listener.name} is already subscribed with policy {listener.policy}")
+        self._by_type.setdefault(event_type, []).append(listener)
+        return listener
+
+    def unsubscribe(self, event_type: str, callback: Callable) -> bool:
+        """Remove callback from event_type (once); its workers stop when it has no event types left."""
+        listener = self._by_callback.get(callback)
+        listeners = self._by_type.get(event_type, [])
+        if listener is None or listener not in listeners:
+            return False
+        listeners.remove(listener)
+        if not any(listener in others for others in self._by_type.values()):
+            del self._by_callback[callback]
+            listener.close()
+        return True
+
+    def listeners(self, event_type: str) -> List[Listener]:
+        return list(self._by_type.get(event_type, ()))
+
+    def dispatch(self, event_type: str, event: dict):
+        for listener in self._by_type.get(event_type, ()):
+            listener.submit(event)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every queued event of every listener. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for listener in self._by_callback.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not listener.flush(remaining):
+                return False
+        return True
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Drain and stop every listener's workers and the process pool. Idempotent."""
+        for listener in self._by_callback.values():
+            listener.close(timeout)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+
+    def get_stats(self) -> List[dict]:
+        return [listener.get_stats() for listener in self._by_callback.values()]
@@ -0,0 +1,42 @@
+"""Reading filters - Rolling median over a fixed ring buffer for noisy distance sensors."""
+
+from bisect import bisect_left, insort
+from typing import List
+
+
+class RollingMedian:
+    """
+    Median of the last `window` readings.
+
+    Both buffers are allocated once: `_ring` holds readings in arrival order
+    and `_sorted` the same values in order. Each push replaces the oldest
+    reading in place and moves one value within `_sorted`, so a sample costs
+    two binary searches and no new lists. NaN readings (no echo) are passed
+    through without entering the window, since they have no order.
+    """
+
+    def __init__(self, window: int = 5):
+        if window < 1:
+            raise ValueError("Median window must be at least 1")
+        self.window = window
+        self._ring: List[float] = [0.0] * window
+        self._sorted: List[float] = []
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def reset(self):
+        self._sorted.clear()
+        self._next = 0
+
+    def push(self, value: float) -> float:
+        """Add a reading and return the median of the window (the lower middle one while even)."""
+        if value != value:
+            return value
+        if len(self._sorted) == self.window:
+            del self._sorted[bisect_left(self._sorted, self._ring[self._next])]
+        self._ring[self._next] = value
+        self._next = (self._next + 1) % self.window
+        insort(self._sorted, value)
+        return self._sorted[(len(self._sorted) - 1) // 2]
@@ -0,0 +1,112 @@
+"""Lane Manager - Several sensor/detector lanes polled on one schedule with one event pipeline."""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .detector import NO_VEHICLE, VEHICLE_DETECTED, VehicleDetector
+from .dispatch import INLINE, EventDispatcher
+from .scheduling import LoopStats, run_every, run_every_async
+from .sensor_mock import MockSensor
+
+
+class LaneManager:
+    """
+    One VehicleDetector (and its sensor) per lane of a gate.
+
+    Every lane's events carry its lane_id and go through one shared
+    EventDispatcher, so a listener registered here - typically a VehicleDB
+    EventWriter, see log_events_to() - has one queue and one worker however
+    many lanes there are. The loops read all lanes once per tick on a single
+    Deadlines schedule: one wake-up and one clock read per interval for the
+    whole gate rather than a timer per lane, so a tick costs one sensor read
+    and threshold step per lane and nothing else.
+
+    `detector_options` (threshold_cm, min_dwell_s, median_window, ...) apply
+    to every lane; add_lane() can override them for one.
+    """
+
+    def __init__(
+        self, lanes: Union[int, Iterable[str]] = 1,
+        sensor_factory: Optional[Callable[[str], MockSensor]] = None,
+        clock: Callable[[], float] = time.monotonic, **detector_options,
+    ):
+        self.clock = clock
+        self.detector_options = detector_options
+        self.sensor_factory = sensor_factory or (lambda lane_id: MockSensor(mode="manual"))
+        self.dispatcher = EventDispatcher()
+        self.lanes: Dict[str, VehicleDetector] = {}
+        lane_ids = [f"lane-{i + 1}" for i in range(lanes)] if isinstance(lanes, int) else lanes
+        for lane_id in lane_ids:
+            self.add_lane(lane_id)
+
+    def __len__(self) -> int:
+        return len(self.lanes)
+
+    def __getitem__(self, lane_id: str) -> VehicleDetector:
+        return self.lanes[lane_id]
+
+    def add_lane(self, lane_id: str, sensor: Optional[MockSensor] = None, **detector_options) -> VehicleDetector:
+        """Create a lane (sensor from sensor_factory unless given) sharing this manager's listeners."""
+        if lane_id in self.lanes:
+            raise ValueError(f"Lane already exists: {lane_id}")
+        options = {**self.detector_options, **detector_options}
+        detector = VehicleDetector(
+            sensor if sensor is not None else self.sensor_factory(lane_id),
+            clock=self.clock, lane_id=lane_id, dispatcher=self.dispatcher, **options,
+        )
+        self.lanes[lane_id] = detector
+        return detector
+
+    def remove_lane(self, lane_id: str) -> VehicleDetector:
+        """Stop polling a lane and return its detector."""
+        return self.lanes.pop(lane_id)
+
+    def on_vehicle_detected(self, callback: Callable, policy: str = INLINE, **options):
+        """Register callback for VEHICLE_DETECTED on every lane (see VehicleDetector.on_vehicle_detected)."""
+        self.dispatcher.subscribe(VEHICLE_DETECTED, callback, policy, **options)
+
+    def on_no_vehicle(self, callback: Callable, policy: str = INLINE, **options):
+        """Register callback for NO_VEHICLE on every lane."""
+        self.dispatcher.subscribe(NO_VEHICLE, callback, policy, **options)
+
+    def log_events_to(self, db, **writer_options):
+        """Log every lane's events through db's background EventWriter; returns the writer."""
+        writer = db.get_event_writer(**writer_options)
+        self.on_vehicle_detected(writer)
+        self.on_no_vehicle(writer)
+        return writer
+
+    def check(self) -> List[Tuple[str, str]]:
+        """Read every lane once; returns (lane_id, event type) for the lanes whose state changed."""
+        now = self.clock()
+        emitted = []
+        for lane_id, detector in list(self.lanes.items()):
+            event_type = detector.process_reading(detector.sensor.get_distance(), now)
+            if event_type is not None:
+                emitted.append((lane_id, event_type))
+        return emitted
+
+    def get_states(self) -> Dict[str, str]:
+        """Current state of each lane."""
+        return {lane_id: detector.current_state for lane_id, detector in self.lanes.items()}
+
+    def get_listener_stats(self) -> List[dict]:
+        """Delivered/dropped/failed counts and latency histogram per listener (shared by all lanes)."""
+        return self.dispatcher.get_stats()
+
+    def run_continuous(
+        self, interval_seconds: float = 0.5, max_iterations: Optional[int] = None
+    ) -> LoopStats:
+        """Check all lanes every interval_seconds, on a fixed schedule."""
+        return run_every(self.check, interval_seconds, max_iterations)
+
+    async def run(
+        self, interval_seconds: float = 0.5, max_iterations: Optional[int] = None,
+        stats: Optional[LoopStats] = None,
+    ) -> LoopStats:
+        """Asyncio version of run_continuous: one task for all lanes (see VehicleDetector.run)."""
+        return await run_every_async(self.check, interval_seconds, max_iterations, stats)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Deliver queued events and stop the listener workers."""
+        self.dispatcher.close(timeout)
@@ -0,0 +1,116 @@
+"""Scheduling - Drift-free polling deadlines with jitter and overrun statistics."""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+
+@dataclass
+class LoopStats:
+    """
+    How well a polling loop kept its period (times in seconds).
+
+    - jitter: how late each read started against its deadline
+    - busy: how long each read (with its callbacks) took
+    - overruns: reads that ended past the next deadline; `missed` counts the
+      deadlines skipped as a result (the schedule keeps its phase instead of
+      firing a burst of catch-up reads)
+    """
+    interval: float
+    ticks: int = 0
+    overruns: int = 0
+    missed: int = 0
+    jitter_total: float = 0.0
+    jitter_max: float = 0.0
+    busy_max: float = 0.0
+
+    @property
+    def jitter_mean(self) -> float:
+        return self.jitter_total / self.ticks if self.ticks else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'interval_ms': self.interval * 1000,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'missed': self.missed,
+            'jitter_mean_ms': self.jitter_mean * 1000,
+            'jitter_max_ms': self.jitter_max * 1000,
+            'busy_max_ms': self.busy_max * 1000,
+        }
+
+
+class Deadlines:
+    """
+    Fixed-rate schedule: read k is due at start + k * interval, so time spent in
+    a read never pushes later reads back. Call woke() when a read starts and
+    done() when it ends; done() returns how long to sleep until the next one.
+    """
+
+    def __init__(self, interval: float, start: float, stats: LoopStats):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.deadline = start
+        self.stats = stats
+        self._woke = start
+
+    def woke(self, now: float):
+        late = max(0.0, now - self.deadline)
+        self._woke = now
+        self.stats.ticks += 1
+        self.stats.jitter_total += late
+        self.stats.jitter_max = max(self.stats.jitter_max, late)
+
+    def done(self, now: float) -> float:
+        self.stats.busy_max = max(self.stats.busy_max, now - self._woke)
+        self.deadline += self.interval
+        if now > self.deadline:
+            skipped = math.floor((now - self.deadline) / self.interval) + 1
+            self.stats.overruns += 1
+            self.stats.missed += skipped
+            self.deadline += skipped * self.interval
+        return self.deadline - now
+
+
+def run_every(
+    tick: Callable[[], object], interval_seconds: float, max_iterations: Optional[int] = None,
+    clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], object] = time.sleep,
+) -> LoopStats:
+    """Call tick() every interval_seconds on a fixed schedule (blocking the thread); returns its LoopStats."""
+    stats = LoopStats(interval_seconds)
+    deadlines = Deadlines(interval_seconds, clock(), stats)
+    iteration = 0
+    while max_iterations is None or iteration < max_iterations:
+        deadlines.woke(clock())
+        tick()
+        iteration += 1
+        delay = deadlines.done(clock())
+        if max_iterations is None or iteration < max_iterations:
+            sleep(delay)
+    return stats
+
+
+async def run_every_async(
+    tick: Callable[[], object], interval_seconds: float, max_iterations: Optional[int] = None,
+    stats: Optional[LoopStats] = None, clock: Optional[Callable[[], float]] = None,
+    sleep: Callable[[float], Awaitable] = asyncio.sleep,
+) -> LoopStats:
+    """
+    Asyncio version of run_every, timed by `clock` (default: the event loop's monotonic clock). Cancel
+    the task to stop it; pass `stats` to read the figures while it runs or after cancellation.
+    """
+    clock = clock or asyncio.get_running_loop().time
+    stats = stats if stats is not None else LoopStats(interval_seconds)
+    deadlines = Deadlines(interval_seconds, clock(), stats)
+    iteration = 0
+    while max_iterations is None or iteration < max_iterations:
+        deadlines.woke(clock())
+        tick()
+        iteration += 1
+        delay = deadlines.done(clock())
+        if max_iterations is None or iteration < max_iterations:
+            await sleep(delay)
+    return stats
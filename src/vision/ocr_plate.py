@@ -46,13 +46,24 @@ def _run_ocr_on_image(img_array) -> Tuple[Optional[str], Optional[str]]:
     Run OCR; uses EasyOCR if SMARTGATE_OCR_BACKEND=easyocr and EasyOCR is installed,
     otherwise Tesseract (optimized for European plates).
     """
+    candidates, err = _run_ocr_candidates(img_array)
+    if err is not None:
+        return None, err
+    return candidates[0], None
+
+
+def _run_ocr_candidates(img_array) -> Tuple[List[str], Optional[str]]:
+    """
+    Like _run_ocr_on_image, but return every distinct reading (PSM modes, crops,
+    thresholds), most plate-like first. The first entry is _run_ocr_on_image's result.
+    """
     try:
         import cv2
     except ImportError as e:
-        return None, f"Import failed: {e}"
+        return [], f"Import failed: {e}"
 
     if img_array is None or img_array.size == 0:
-        return None, "Empty image"
+        return [], "Empty image"
 
     # Optional EasyOCR backend (often better for EU plates / odd fonts)
     if os.environ.get("SMARTGATE_OCR_BACKEND", "").strip().lower() == "easyocr":
@@ -67,24 +78,22 @@ def _run_ocr_on_image(img_array) -> Tuple[Optional[str], Optional[str]]:
             else:
                 img = np.asarray(img_array)
             results = reader.readtext(img)
-            for _bbox, text, _conf in results:
-                norm = _normalize(str(text))
-                if len(norm) >= 4:
-                    return norm, None
+            texts = [_normalize(str(text)) for _bbox, text, _conf in results]
             if results:
-                norm = _normalize(" ".join(str(r[1]) for r in results))
-                if len(norm) >= 4:
-                    return norm, None
+                texts.append(_normalize(" ".join(str(r[1]) for r in results)))
+            texts = list(dict.fromkeys(t for t in texts if len(t) >= 4))
+            if texts:
+                return texts, None
         except ImportError:
             pass
         except Exception as e:
-            return None, f"EasyOCR error: {e}"
+            return [], f"EasyOCR error: {e}"
 
     try:
         import pytesseract
         from PIL import Image
     except ImportError as e:
-        return None, f"Import failed: {e}"
+        return [], f"Import failed: {e}"
 
     if len(img_array.shape) == 3:
         gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
@@ -172,7 +181,7 @@ def _run_ocr_on_image(img_array) -> Tuple[Optional[str], Optional[str]]:
     add_candidates(Image.fromarray(gray_eu_35), "eu35_gray")
 
     if not candidates:
-        return None, "OCR returned no characters (try a clearer plate image or check Tesseract)"
+        return [], "OCR returned no characters (try a clearer plate image or check Tesseract)"
 
     # Prefer result that looks like a plate: 5–11 chars, mix of letters and digits; prefer data path
     def score(s: str, label: str) -> Tuple[float, int]:
@@ -202,7 +211,8 @@ def _run_ocr_on_image(img_array) -> Tuple[Optional[str], Optional[str]]:
             best_text = candidate
     elif without_b != best_text and without_b in texts and 5 <= len(without_b) <= 11:
         best_text = without_b
-    return best_text, None
+    ranked = [c[0] for c in sorted(candidates, key=lambda x: score(x[0], x[1]), reverse=True)]
+    return list(dict.fromkeys([best_text] + ranked)), None
 
 
 def ocr_from_path(image_path) -> Tuple[Optional[str], Optional[str]]:
@@ -225,12 +235,8 @@ def ocr_from_path(image_path) -> Tuple[Optional[str], Optional[str]]:
     return _run_ocr_on_image(img)
 
 
-def ocr_from_bytes(data: bytes) -> Tuple[Optional[str], Optional[str]]:
-    """
-    Run plate OCR on image bytes (e.g. from an uploaded file).
-    data: raw bytes of a JPEG/PNG image.
-    Returns (normalized_plate_text, error_message). On success error_message is None.
-    """
+def _decode_image(data: bytes):
+    """Decode JPEG/PNG bytes to a BGR array; returns (image, error_message)."""
     try:
         import cv2
         import numpy as np
@@ -243,4 +249,28 @@ def ocr_from_bytes(data: bytes) -> Tuple[Optional[str], Optional[str]]:
     img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
     if img is None:
         return None, "Unsupported or corrupt image"
+    return img, None
+
+
+def ocr_candidates_from_bytes(data: bytes) -> Tuple[List[str], Optional[str]]:
+    """
+    Run plate OCR on image bytes and return every distinct reading, most plate-like first.
+    Returns (candidates, error_message). On success candidates is non-empty and error_message is None.
+    Pass the candidates to check_plate_candidates to authorize on the best-matching reading.
+    """
+    img, err = _decode_image(data)
+    if err is not None:
+        return [], err
+    return _run_ocr_candidates(img)
+
+
+def ocr_from_bytes(data: bytes) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Run plate OCR on image bytes (e.g. from an uploaded file).
+    data: raw bytes of a JPEG/PNG image.
+    Returns (normalized_plate_text, error_message). On success error_message is None.
+    """
+    img, err = _decode_image(data)
+    if err is not None:
+        return None, err
     return _run_ocr_on_image(img)
@@ -1,5 +1,6 @@
 """Shared pytest fixtures and configuration for SmartGate-IoT tests."""
 
+import glob
 import os
 import sys
 import tempfile
@@ -21,8 +22,9 @@ def temp_db_path():
     fd, path = tempfile.mkstemp(suffix=".db")
     os.close(fd)
     yield path
-    if os.path.exists(path):
-        os.remove(path)
+    # Also remove sidecar files (e.g. the persisted plate index)
+    for leftover in glob.glob(path + "*"):
+        os.remove(leftover)
 
 
 @pytest.fixture
@@ -46,11 +48,14 @@ def vehicle_db(temp_db_path):
     db = VehicleDB(temp_db_path)
     for plate in ["ABC123", "XYZ789", "DEF456"]:
         db.add_vehicle(plate)
-    return db
+    yield db
+    db.close()
 
 
 @pytest.fixture
 def empty_vehicle_db(temp_db_path):
     """Yield an empty VehicleDB instance."""
     from src.database import VehicleDB
-    return VehicleDB(temp_db_path)
+    db = VehicleDB(temp_db_path)
+    yield db
+    db.close()
@@ -0,0 +1,50 @@
+"""Integration tests: dashboard event API against a real database."""
+
+import importlib
+
+import pytest
+
+from src.database import VehicleDB
+
+pytest.importorskip("flask")
+
+
+@pytest.fixture
+def client(temp_db_path, tmp_path, monkeypatch):
+    """Flask test client for run_dashboard with its database swapped for a temporary one."""
+    monkeypatch.chdir(tmp_path)  # the module opens smartgate.db in the working directory
+    run_dashboard = importlib.import_module("run_dashboard")
+    db = VehicleDB(temp_db_path)
+    monkeypatch.setattr(run_dashboard, "db", db)
+    yield run_dashboard.app.test_client(), db
+    db.close()
+
+
+def test_events_after_more_than_limit(client):
+    """A full ?after= page is the oldest events; ?limit= then returns the newest ones."""
+    client, db = client
+    db.log_detection_events([("VEHICLE_DETECTED", 1.0, "2024-01-01 00:00:01.000")])
+    seen = client.get("/api/events").get_json()[0]["id"]
+    db.log_detection_events(
+        [("VEHICLE_DETECTED", float(i), f"2024-01-01 00:00:{i:02d}.000") for i in range(2, 62)]
+    )
+    page = client.get(f"/api/events?after={seen}&limit=50").get_json()
+    assert len(page) == 50
+    assert [e["distance"] for e in page] == [float(i) for i in range(2, 52)]
+    latest = client.get("/api/events?limit=50").get_json()
+    assert latest[0]["distance"] == 61.0 and len(latest) == 50
+    short = client.get(f"/api/events?after={page[-1]['id']}&limit=50").get_json()
+    assert [e["distance"] for e in short] == [float(i) for i in range(52, 62)]
+
+
+@pytest.mark.parametrize("limit", [-1, 0])
+def test_events_limit_clamped_to_at_least_one(client, limit):
+    """SQLite reads a negative LIMIT as unlimited; the API must still cap the page."""
+    client, db = client
+    db.log_detection_events(
+        [("VEHICLE_DETECTED", float(i), f"2024-01-01 00:{i // 60:02d}:{i % 60:02d}.000") for i in range(1200)]
+    )
+    assert len(client.get(f"/api/events?limit={limit}").get_json()) == 1
+    assert len(client.get(f"/api/events?after=0&limit={limit}").get_json()) == 1
+    assert len(client.get(f"/api/events?before=100000&limit={limit}").get_json()) == 1
+    assert len(client.get("/api/events?limit=5000").get_json()) == 1000
@@ -0,0 +1,66 @@
+"""Unit tests for the asyncio VehicleDB adapter."""
+
+import asyncio
+import threading
+
+from src.database import AsyncVehicleDB
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncVehicleDB:
+    """Queries run off the event loop; concurrent lookups are batched."""
+
+    def test_crud_and_events(self, temp_db_path):
+        async def scenario():
+            async with AsyncVehicleDB(temp_db_path) as db:
+                assert await db.add_vehicle("abc123")
+                assert not await db.add_vehicle("ABC123")
+                assert await db.is_authorized("ABC123")
+                await db.log_detection_event("vehicle_detected", 8.0)
+                events = await db.get_recent_events(limit=5)
+                assert events[0]["distance"] == 8.0
+                assert await db.get_events_since(events[0]["id"]) == []
+                assert (await db.find_similar_plates("ABC12", threshold=0.8))[0][0] == "ABC123"
+                assert await db.remove_vehicle("ABC123")
+                assert await db.get_all_vehicles() == []
+                assert db.db._pool.size == 1
+            return db
+
+        db = _run(scenario())
+        assert db.db._pool.closed
+
+    def test_queries_run_on_one_thread(self, temp_db_path):
+        async def scenario():
+            async with AsyncVehicleDB(temp_db_path) as db:
+                names = await asyncio.gather(*(db._run(lambda: threading.current_thread().name) for _ in range(5)))
+                assert len(set(names)) == 1 and names[0] != threading.current_thread().name
+
+        _run(scenario())
+
+    def test_concurrent_lookups_are_batched(self, vehicle_db):
+        async def scenario():
+            db = AsyncVehicleDB(vehicle_db)
+            plates = ["ABC123", "xyz789", "NOPE00", "ABC123"] * 25
+            results = await asyncio.gather(*(db.is_authorized(p) for p in plates))
+            assert results == [True, True, False, True] * 25
+            assert db.lookups == 100 and db.lookup_batches == 1
+            assert await db.is_authorized("DEF456")
+            assert db.lookup_batches == 2
+            await db.close()
+
+        _run(scenario())
+        # A shared VehicleDB is left open for its owner
+        assert vehicle_db.is_authorized("ABC123")
+
+    def test_bulk_import_and_export(self, temp_db_path):
+        async def scenario():
+            async with AsyncVehicleDB(temp_db_path) as db:
+                report = await db.bulk_import((f"P{i:04d}" for i in range(250)), chunk_size=100)
+                assert report.inserted == 250
+                lines = [line async for line in db.bulk_export("jsonl", chunk_size=100)]
+                assert len(lines) == 250
+
+        _run(scenario())
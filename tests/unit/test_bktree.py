@@ -0,0 +1,69 @@
+"""Unit tests for the BK-tree plate index."""
+
+import random
+from difflib import SequenceMatcher
+
+from src.matching import BKTree, levenshtein, max_edit_distance
+
+
+def _random_plates(n, seed=7):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+    plates = set()
+    while len(plates) < n:
+        plates.add("".join(rng.choice(alphabet) for _ in range(rng.randint(4, 9))))
+    return sorted(plates)
+
+
+class TestLevenshtein:
+    """Edit distance used as the BK-tree metric."""
+
+    def test_known_distances(self):
+        assert levenshtein("ABC123", "ABC123") == 0
+        assert levenshtein("ABC123", "ABC12") == 1
+        assert levenshtein("ABC123", "ABD123") == 1
+        assert levenshtein("", "ABC") == 3
+        assert levenshtein("KITTEN", "SITTING") == 3
+
+    def test_max_edit_distance_bounds_ratio(self):
+        plates = _random_plates(200)
+        query = "AB12CD"
+        for threshold in (0.5, 0.7, 0.85, 0.9):
+            radius = max_edit_distance(len(query), threshold)
+            for plate in plates:
+                if SequenceMatcher(None, query, plate).ratio() >= threshold:
+                    assert levenshtein(query, plate) <= radius
+
+    def test_max_edit_distance_unbounded_for_zero_threshold(self):
+        assert max_edit_distance(6, 0.0) is None
+
+
+class TestBKTree:
+    """BK-tree insert/remove/search."""
+
+    def test_search_matches_brute_force(self):
+        plates = _random_plates(500)
+        tree = BKTree(plates)
+        assert len(tree) == len(plates)
+        for query in ["ABC123", plates[10], plates[250][:-1], "Z9"]:
+            for radius in range(4):
+                expected = {p for p in plates if levenshtein(query, p) <= radius}
+                assert {p for p, _ in tree.search(query, radius)} == expected
+
+    def test_add_duplicate_and_remove(self):
+        tree = BKTree(["ABC123", "XYZ789"])
+        assert tree.add("ABC123") is False
+        assert tree.remove("ABC123") is True
+        assert "ABC123" not in tree
+        assert tree.remove("ABC123") is False
+        assert tree.search("ABC123", 0) == []
+        assert tree.add("ABC123") is True
+        assert tree.search("ABC123", 0) == [("ABC123", 0)]
+
+    def test_rebuild_after_many_removals(self):
+        plates = _random_plates(100)
+        tree = BKTree(plates)
+        for plate in plates[:80]:
+            tree.remove(plate)
+        assert sorted(tree) == plates[80:]
+        assert len(tree) == 20
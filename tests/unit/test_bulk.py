@@ -0,0 +1,71 @@
+"""Unit tests for bulk import/export of authorized vehicles."""
+
+import io
+import json
+
+import pytest
+
+from src.database import VehicleDB
+from src.database.bulk import format_from_path, read_plates
+
+
+class TestBulkImport:
+    """Streaming import with duplicate and reject accounting."""
+
+    def test_csv_with_header_counts_outcomes(self, vehicle_db):
+        data = "owner,plate_number\nann,new001\nbob,ABC123\ncid, new001 \ndee,\neve,BAD$1\nfay,NEW002\n"
+        report = vehicle_db.bulk_import(read_plates(io.StringIO(data), "csv"), chunk_size=2)
+        assert (report.inserted, report.duplicates, report.rejected) == (2, 2, 2)
+        assert [row for row, _ in report.errors] == [4, 5]
+        assert vehicle_db.is_authorized("NEW001") and vehicle_db.is_authorized("NEW002")
+        assert vehicle_db.find_similar_plates("NEW00Z", threshold=0.8)[0][0] in ("NEW001", "NEW002")
+
+    def test_csv_without_header_uses_first_column(self):
+        assert list(read_plates(io.StringIO("ABC123,x\n\nXYZ789\n"), "csv")) == ["ABC123", "XYZ789"]
+
+    def test_jsonl_objects_strings_and_garbage(self, empty_vehicle_db):
+        lines = ['{"plate_number": "abc123"}', '"XYZ789"', '{"plate": "DEF456"}', "{oops", '{"other": 1}', ""]
+        report = empty_vehicle_db.bulk_import(read_plates(iter(lines), "jsonl"))
+        assert (report.inserted, report.rejected) == (3, 2)
+        assert [v["plate_number"] for v in empty_vehicle_db.get_all_vehicles()] == ["ABC123", "DEF456", "XYZ789"]
+
+    def test_import_is_lazy(self, empty_vehicle_db):
+        consumed = []
+
+        def plates():
+            for i in range(2500):
+                consumed.append(i)
+                yield f"P{i:05d}"
+
+        report = empty_vehicle_db.bulk_import(plates(), chunk_size=1000)
+        assert report.inserted == 2500 and len(consumed) == 2500
+        assert len(empty_vehicle_db.get_all_vehicles()) == 2500
+
+    def test_errors_capped(self, empty_vehicle_db):
+        report = empty_vehicle_db.bulk_import([""] * 500)
+        assert report.rejected == 500 and len(report.errors) == 100
+
+
+class TestBulkExport:
+    """Export streams in plate order and round-trips through import."""
+
+    @pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+    def test_round_trip(self, vehicle_db, tmp_path, fmt):
+        lines = list(vehicle_db.bulk_export(fmt, chunk_size=2))
+        if fmt == "csv":
+            assert lines[0].startswith("plate_number,created_at")
+        else:
+            assert json.loads(lines[0])["plate_number"] == "ABC123"
+        with VehicleDB(str(tmp_path / "copy.db")) as copy:
+            report = copy.bulk_import(read_plates(iter(lines), fmt))
+            assert report.inserted == 3
+            assert copy.authorized_snapshot().plates == vehicle_db.authorized_snapshot().plates
+
+    def test_empty_csv_export_has_header(self, empty_vehicle_db):
+        assert list(empty_vehicle_db.bulk_export("csv")) == ["plate_number,created_at\n"]
+
+    def test_format_from_path(self):
+        assert format_from_path("fleet.JSONL") == "jsonl"
+        assert format_from_path("fleet.csv") == "csv"
+        with pytest.raises(ValueError):
+            format_from_path("fleet.csv", "xml")
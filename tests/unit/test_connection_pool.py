@@ -0,0 +1,116 @@
+"""Unit tests for the SQLite connection pool."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from src.database import ConnectionPool, VehicleDB
+
+
+class TestConnectionPool:
+    """Reuse, bounds, transactions and shutdown."""
+
+    def test_reuses_connections(self, temp_db_path):
+        pool = ConnectionPool(temp_db_path, size=2)
+        with pool.connection() as first:
+            with pool.connection() as nested:
+                assert nested is first
+        with pool.connection() as again:
+            assert again is first
+        assert pool.created == 1 and pool.reused == 1
+        pool.close()
+
+    def test_threads_share_at_most_size_connections(self, temp_db_path):
+        pool = ConnectionPool(temp_db_path, size=3)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+        errors = []
+
+        def work(n):
+            try:
+                for i in range(20):
+                    with pool.connection() as conn:
+                        conn.execute("INSERT INTO t VALUES (?)", (n * 100 + i,))
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors
+        assert pool.created <= 3
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 160
+        pool.close()
+
+    def test_rolls_back_on_error(self, temp_db_path):
+        pool = ConnectionPool(temp_db_path)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+        with pytest.raises(RuntimeError):
+            with pool.connection() as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                raise RuntimeError("boom")
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        pool.close()
+
+    def test_exhausted_pool_times_out(self, temp_db_path):
+        pool = ConnectionPool(temp_db_path, size=1, timeout=0.05)
+        held = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with pool.connection():
+                held.set()
+                release.wait(2)
+
+        t = threading.Thread(target=hold)
+        t.start()
+        held.wait(2)
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection():
+                pass
+        release.set()
+        t.join()
+        pool.close()
+
+    def test_closed_pool_rejects_use(self, temp_db_path):
+        pool = ConnectionPool(temp_db_path)
+        pool.close()
+        pool.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            with pool.connection():
+                pass
+
+    def test_in_memory_database_keeps_its_data(self):
+        with VehicleDB(":memory:") as db:
+            db.add_vehicle("ABC123")
+            assert db.is_authorized("ABC123")
+
+
+class TestPragmaProfiles:
+    """Profiles are applied on connect and reported by get_storage_stats."""
+
+    def test_default_profile_uses_wal(self, temp_db_path):
+        with VehicleDB(temp_db_path) as db:
+            stats = db.get_storage_stats()
+            assert stats["profile"] == "balanced"
+            assert stats["journal_mode"] == "wal"
+            assert stats["synchronous"] == 1
+            assert stats["temp_store"] == 2
+            assert stats["cache_size"] == -8000
+
+    def test_legacy_profile_keeps_sqlite_defaults(self, temp_db_path):
+        with VehicleDB(temp_db_path, profile="legacy") as db:
+            stats = db.get_storage_stats()
+            assert stats["journal_mode"] == "delete"
+            assert stats["synchronous"] == 2
+            assert stats["connections_created"] >= 1
+
+    def test_unknown_profile_rejected(self, temp_db_path):
+        with pytest.raises(ValueError):
+            VehicleDB(temp_db_path, profile="turbo")
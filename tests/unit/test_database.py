@@ -3,6 +3,7 @@
 import pytest
 
 from src.database import VehicleDB
+from src.database.statements import STATEMENTS, StatementConnection
 
 
 class TestVehicleDB:
@@ -71,3 +72,163 @@ class TestVehicleDB:
         high = vehicle_db.find_similar_plates("ABC123", threshold=0.99)
         low = vehicle_db.find_similar_plates("ABC123", threshold=0.5)
         assert len(high) <= len(low)
+
+    def test_find_similar_plates_tracks_add_and_remove(self, vehicle_db):
+        assert vehicle_db.find_similar_plates("ABC124", threshold=0.8)[0][0] == "ABC123"
+        vehicle_db.add_vehicle("ABC124")
+        assert vehicle_db.find_similar_plates("ABC124", threshold=0.8)[0] == ("ABC124", 1.0)
+        vehicle_db.remove_vehicle("ABC124")
+        assert [p for p, _ in vehicle_db.find_similar_plates("ABC124", threshold=0.8)] == ["ABC123"]
+
+    def test_find_similar_plates_matches_linear_scan(self, empty_vehicle_db):
+        from difflib import SequenceMatcher
+        plates = ["ABC123", "ABC124", "ABD123", "XBC123", "AB123", "ZZZ999", "ABC1234", "CBA321"]
+        for plate in plates:
+            empty_vehicle_db.add_vehicle(plate)
+        for threshold in (0.5, 0.7, 0.85):
+            expected = sorted(
+                ((p, SequenceMatcher(None, "ABC123", p).ratio()) for p in sorted(plates)),
+                key=lambda x: x[1], reverse=True,
+            )
+            expected = [m for m in expected if m[1] >= threshold]
+            assert empty_vehicle_db.find_similar_plates("abc123", threshold) == expected
+
+    def test_deletion_index_persisted_and_refreshed(self, vehicle_db, temp_db_path):
+        import os
+        assert vehicle_db.find_similar_plates("ABC12", threshold=0.8)[0][0] == "ABC123"
+        vehicle_db.save_deletion_index()  # waits for the background save
+        assert os.path.exists(vehicle_db.deletion_index_path)
+        vehicle_db.add_vehicle("ABC12")
+        vehicle_db.close()
+        reopened = VehicleDB(temp_db_path)
+        assert reopened.get_deletion_index().lookup("ABC12", 0) == [("ABC12", 0)]
+        # A write that bypasses this instance leaves the sidecar stale: it must be rebuilt
+        other = VehicleDB(temp_db_path)
+        other.remove_vehicle("ABC12")
+        fresh = VehicleDB(temp_db_path)
+        assert "ABC12" not in fresh.get_deletion_index()
+        assert fresh.find_similar_plates("ABC12", threshold=0.8)[0][0] == "ABC123"
+
+    def test_rebuild_waits_for_pending_deletion_index_save(self, vehicle_db):
+        import glob
+        assert vehicle_db.get_deletion_index() is not None  # rebuilt, saving in the background
+        saver = vehicle_db._deletion_index_saver
+        vehicle_db.bulk_import(["ABC12", "XYZ78"])  # drops the index mid-save
+        assert saver is not None and not saver.is_alive()
+        assert "ABC12" in vehicle_db.get_deletion_index()
+        vehicle_db.close()
+        assert vehicle_db._deletion_index_saver is None
+        assert not glob.glob(vehicle_db.deletion_index_path + "*.tmp")
+
+    def test_find_similar_plates_without_deletion_index(self, temp_db_path):
+        db = VehicleDB(temp_db_path, deletion_distance=0)
+        db.add_vehicle("ABC123")
+        db.add_vehicle("ABC124")
+        assert db.get_deletion_index() is None
+        assert db.find_similar_plates("ABC123", threshold=0.95) == [("ABC123", 1.0)]
+        assert [p for p, _ in db.find_similar_plates("ABC123", threshold=0.8)] == ["ABC123", "ABC124"]
+        db.close()
+
+    def test_find_similar_plates_limit(self, empty_vehicle_db):
+        for plate in ["ABC123", "ABC124", "ABD123", "XBC123", "ZZZ999"]:
+            empty_vehicle_db.add_vehicle(plate)
+        full = empty_vehicle_db.find_similar_plates("ABC123", threshold=0.5)
+        assert empty_vehicle_db.find_similar_plates("ABC123", threshold=0.5, limit=2) == full[:2]
+        assert empty_vehicle_db.find_similar_plates("ABC123", threshold=0.9, limit=5) == full[:1]
+
+    def test_keyset_pagination(self, empty_vehicle_db):
+        for i in range(7):
+            empty_vehicle_db.log_detection_event("vehicle_detected", float(i))
+        first = empty_vehicle_db.get_events_before(limit=3)
+        assert [e["distance"] for e in first] == [6.0, 5.0, 4.0]
+        second = empty_vehicle_db.get_events_before(first[-1]["id"], limit=3)
+        assert [e["distance"] for e in second] == [3.0, 2.0, 1.0]
+        newer = empty_vehicle_db.get_events_since(second[0]["id"])
+        assert [e["distance"] for e in newer] == [4.0, 5.0, 6.0]
+        assert empty_vehicle_db.get_events_since(first[0]["id"]) == []
+
+    def test_recent_events_use_timestamp_index(self, empty_vehicle_db):
+        with empty_vehicle_db._connection() as conn:
+            plan = conn.execute("EXPLAIN QUERY PLAN " + STATEMENTS["recent_events"], (50,)).fetchall()
+        details = " ".join(str(row[-1]) for row in plan)
+        assert "idx_detection_events_timestamp" in details
+        assert "TEMP B-TREE" not in details
+
+    def test_event_rows_as_tuples(self, empty_vehicle_db):
+        empty_vehicle_db.log_detection_events([("vehicle_detected", 7.5, "2024-01-01 00:00:00.000")])
+        rows = empty_vehicle_db.get_events_since(0, as_tuples=True)
+        assert rows == [(rows[0][0], "vehicle_detected", 7.5, "2024-01-01 00:00:00.000", None)]
+        assert empty_vehicle_db.get_recent_events(as_tuples=True) == rows
+        assert empty_vehicle_db.get_events_before(None, as_tuples=True) == rows
+
+    def test_events_filtered_by_lane(self, empty_vehicle_db):
+        empty_vehicle_db.log_detection_event("vehicle_detected", 5.0, lane_id="lane-1")
+        empty_vehicle_db.log_detection_events([
+            ("vehicle_detected", 6.0, "2024-01-01 00:00:00.000", "lane-2"),
+            ("no_vehicle", 40.0, "2024-01-01 00:00:01.000"),
+        ])
+        assert [e["lane_id"] for e in empty_vehicle_db.get_events_since(0)] == ["lane-1", "lane-2", None]
+        assert [e["distance"] for e in empty_vehicle_db.get_recent_events(lane_id="lane-2")] == [6.0]
+        with empty_vehicle_db._connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN " + STATEMENTS["recent_lane_events"], ("lane-1", 50)
+            ).fetchall()
+        assert "idx_detection_events_lane" in " ".join(str(row[-1]) for row in plan)
+
+    def test_lane_column_added_to_old_database(self, temp_db_path):
+        import sqlite3
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("""
+            CREATE TABLE detection_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, event_type TEXT NOT NULL,
+                distance REAL, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("INSERT INTO detection_events (event_type, distance) VALUES ('no_vehicle', 30.0)")
+        conn.commit()
+        conn.close()
+        with VehicleDB(temp_db_path) as db:
+            db.log_detection_event("vehicle_detected", 4.0, lane_id="lane-3")
+            assert [e["lane_id"] for e in db.get_events_since(0)] == [None, "lane-3"]
+
+    def test_named_statements_reuse_one_cursor(self, empty_vehicle_db):
+        with empty_vehicle_db._connection() as conn:
+            assert isinstance(conn, StatementConnection)
+            conn.run("insert_event", ("no_vehicle", 1.0, None))
+            cursor = conn._cursor
+            assert conn.fetchone("plates_fingerprint") == (0, 0)
+            assert conn._cursor is cursor
+        assert empty_vehicle_db.get_storage_stats()["connections_created"] == 1
+
+    def test_snapshot_serves_reads_without_sql(self, vehicle_db):
+        vehicle_db.snapshot_interval = 60
+        snapshot = vehicle_db.authorized_snapshot()
+        assert snapshot.plates == frozenset({"ABC123", "XYZ789", "DEF456"})
+        assert [row[1] for row in snapshot.vehicles] == ["ABC123", "DEF456", "XYZ789"]
+        vehicle_db._pool.close()  # any SQL from here on would raise
+        assert vehicle_db.is_authorized("abc123 ")
+        assert not vehicle_db.is_authorized("QQQ111")
+        assert [v["plate_number"] for v in vehicle_db.get_all_vehicles()] == ["ABC123", "DEF456", "XYZ789"]
+
+    def test_snapshot_follows_own_writes_immediately(self, vehicle_db):
+        vehicle_db.authorized_snapshot()
+        vehicle_db.add_vehicle("NEW001")
+        assert vehicle_db.is_authorized("NEW001")
+        vehicle_db.remove_vehicle("ABC123")
+        assert "ABC123" not in vehicle_db.authorized_snapshot().plates
+
+    def test_snapshot_picks_up_other_writers(self, temp_db_path):
+        db = VehicleDB(temp_db_path, snapshot_interval=0)
+        other = VehicleDB(temp_db_path)
+        db.add_vehicle("ABC123")
+        assert db.find_similar_plates("ABC12", threshold=0.8)[0][0] == "ABC123"
+        version = db.version
+        db.log_detection_event("no_vehicle", 100.0)  # other tables changing must not reload
+        assert db.authorized_snapshot().version == version
+        other.add_vehicle("XYZ789")
+        other.remove_vehicle("ABC123")
+        assert db.is_authorized("XYZ789") and not db.is_authorized("ABC123")
+        assert db.version > version
+        assert db.find_similar_plates("XYZ78", threshold=0.8)[0][0] == "XYZ789"
+        db.close()
+        other.close()
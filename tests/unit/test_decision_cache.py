@@ -0,0 +1,37 @@
+"""Unit tests for the LRU decision cache."""
+
+import pytest
+
+from src.matching import DecisionCache
+
+
+class TestDecisionCache:
+    """Hits, misses and LRU eviction."""
+
+    def test_hits_and_misses(self):
+        cache = DecisionCache(maxsize=4)
+        calls = []
+        for _ in range(3):
+            assert cache.get_or_compute("k", lambda: calls.append(1) or 42) == 42
+        assert len(calls) == 1
+        info = cache.info()
+        assert info["hits"] == 2 and info["misses"] == 1 and info["size"] == 1
+        assert info["hit_rate"] == pytest.approx(2 / 3)
+
+    def test_evicts_least_recently_used(self):
+        cache = DecisionCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("c", lambda: 3)
+        assert cache.info()["evictions"] == 1
+        assert cache.get_or_compute("a", lambda: -1) == 1
+        assert cache.get_or_compute("b", lambda: -2) == -2
+
+    def test_clear_and_invalid_size(self):
+        cache = DecisionCache()
+        cache.get_or_compute("a", lambda: 1)
+        cache.clear()
+        assert len(cache) == 0 and cache.info()["misses"] == 0
+        with pytest.raises(ValueError):
+            DecisionCache(maxsize=0)
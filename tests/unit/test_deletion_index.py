@@ -0,0 +1,97 @@
+"""Unit tests for the SymSpell-style deletion index."""
+
+import random
+
+import pytest
+
+from src.matching import DeletionIndex, levenshtein
+
+
+def _random_plates(n, seed=11):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+    plates = set()
+    while len(plates) < n:
+        plates.add("".join(rng.choice(alphabet) for _ in range(rng.randint(4, 8))))
+    return sorted(plates)
+
+
+class TestDeletionIndex:
+    """Lookup, maintenance and persistence."""
+
+    def test_lookup_matches_brute_force(self):
+        plates = _random_plates(300)
+        index = DeletionIndex(plates, max_distance=2)
+        rng = random.Random(3)
+        for query in rng.sample(plates, 20) + ["ABC123", "Z", ""]:
+            for k in (0, 1, 2):
+                expected = sorted(
+                    ((p, levenshtein(query, p)) for p in plates if levenshtein(query, p) <= k),
+                    key=lambda x: (x[1], x[0]),
+                )
+                assert index.lookup(query, k) == expected
+
+    def test_add_and_remove(self):
+        index = DeletionIndex(["ABC123"], max_distance=1)
+        assert index.add("ABC124")
+        assert not index.add("ABC124")
+        assert [p for p, _ in index.lookup("ABC125")] == ["ABC123", "ABC124"]
+        assert index.remove("ABC123")
+        assert not index.remove("ABC123")
+        assert "ABC123" not in index
+        assert index.lookup("ABC125") == [("ABC124", 1)]
+        assert len(index) == 1
+
+    def test_distance_above_index_limit_rejected(self):
+        index = DeletionIndex(["ABC123"], max_distance=1)
+        with pytest.raises(ValueError):
+            index.candidates("ABC123", 2)
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / "plates.deletes.idx")
+        index = DeletionIndex(["ABC123", "XYZ789"], max_distance=2)
+        index.save(path, (2, 2))
+        loaded = DeletionIndex.load(path, (2, 2), max_distance=2)
+        assert loaded is not None
+        assert loaded.lookup("ABC12") == index.lookup("ABC12")
+        assert loaded.add("ABC124")
+
+    def test_load_rejects_stale_or_missing(self, tmp_path):
+        path = str(tmp_path / "plates.deletes.idx")
+        assert DeletionIndex.load(path, (0, 0)) is None
+        DeletionIndex(["ABC123"]).save(path, (1, 1))
+        assert DeletionIndex.load(path, (1, 2)) is None
+        assert DeletionIndex.load(path, (1, 1), max_distance=1) is None
+        with open(path, "w") as f:
+            f.write("{not json")
+        assert DeletionIndex.load(path, (1, 1)) is None
+
+    def test_loaded_index_matches_built_after_changes(self, tmp_path):
+        path = str(tmp_path / "plates.deletes.idx")
+        plates = _random_plates(300)
+        DeletionIndex(plates, max_distance=2).save(path, (300, 300))
+        loaded = DeletionIndex.load(path, (300, 300), max_distance=2)
+        built = DeletionIndex(plates, max_distance=2)
+        for index in (loaded, built):
+            index.remove(plates[0])
+            index.remove(plates[1])
+            index.add(plates[1])
+            index.add("ABC123")
+        assert len(loaded) == len(built) == 300
+        rng = random.Random(5)
+        for query in rng.sample(plates, 20) + [plates[0], "ABC12"]:
+            assert loaded.lookup(query) == built.lookup(query)
+
+    def test_concurrent_saves_to_one_path(self, tmp_path):
+        import threading
+        path = str(tmp_path / "plates.deletes.idx")
+        plates = _random_plates(2000)
+        indexes = [DeletionIndex(plates[:1000]), DeletionIndex(plates)]
+        threads = [threading.Thread(target=index.save, args=(path, (len(index), 0))) for index in indexes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Whichever save finished last, the file is complete and no temporary file is left behind
+        assert any(DeletionIndex.load(path, (len(index), 0)) is not None for index in indexes)
+        assert [p.name for p in tmp_path.iterdir()] == ["plates.deletes.idx"]
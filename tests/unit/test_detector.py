@@ -1,9 +1,23 @@
 """Unit tests for vehicle detection module (detector + mock sensor)."""
 
+import math
+import os
+import random
+import threading
+import time
+
 import pytest
 
-from src.vehicle_detection import VehicleDetector, MockSensor
+from src.vehicle_detection import VehicleDetector, MockSensor, LoopStats, LaneManager
 from src.vehicle_detection.detector import VEHICLE_DETECTED, NO_VEHICLE
+from src.core.bounded_queue import DROP_NEWEST, DROP_OLDEST
+from src.vehicle_detection.dispatch import EventDispatcher, LatencyHistogram, THREAD, PROCESS
+
+
+def _outside_parent(event):
+    """PROCESS listener: fails if it runs in the process that dispatched the event."""
+    if os.getpid() == event["parent_pid"]:
+        raise RuntimeError("ran in the parent process")
 
 
 class TestVehicleDetector:
@@ -115,3 +129,362 @@ class TestMockSensor:
 
     def test_predefined_scenario_unknown_returns_none(self, mock_sensor):
         assert mock_sensor.get_predefined_scenario("nonexistent") is None
+
+
+class TestProcessBatch:
+    """process_batch matches the per-sample check() loop."""
+
+    @staticmethod
+    def _loop_events(distances, threshold, start_detected=False):
+        sensor = MockSensor(mode="manual")
+        detector = VehicleDetector(sensor, threshold_cm=threshold)
+        if start_detected:
+            detector.current_state = VEHICLE_DETECTED
+        events = []
+        detector.on_vehicle_detected(events.append)
+        detector.on_no_vehicle(events.append)
+        for d in distances:
+            sensor.set_distance(d)
+            detector.check()
+        return [(e["type"], e["data"]) for e in events], detector.current_state
+
+    @pytest.mark.parametrize("start_detected", [False, True])
+    def test_same_events_as_loop(self, start_detected):
+        rng = random.Random(4)
+        distances = [rng.choice([5.0, 9.99, 10.0, 10.01, 50.0, float("nan")]) for _ in range(500)]
+        expected, final_state = self._loop_events(distances, 10.0, start_detected)
+        detector = VehicleDetector(MockSensor(mode="manual"), threshold_cm=10.0)
+        if start_detected:
+            detector.current_state = VEHICLE_DETECTED
+        events = []
+        detector.on_vehicle_detected(events.append)
+        detector.on_no_vehicle(events.append)
+        emitted = detector.process_batch(distances)
+        got = [(e["type"], e["data"]) for e in events]
+        assert len(got) == len(expected) and len(emitted) == len(events)
+        for (t1, d1), (t2, d2) in zip(got, expected):
+            assert t1 == t2 and d1["threshold"] == d2["threshold"]
+            assert d1["distance"] == d2["distance"] or math.isnan(d1["distance"]) and math.isnan(d2["distance"])
+        assert detector.current_state == final_state
+
+    def test_numpy_input_and_timestamps(self, detector):
+        np = pytest.importorskip("numpy")
+        events = []
+        detector.on_vehicle_detected(events.append)
+        detector.on_no_vehicle(events.append)
+        distances = np.array([50, 8, 7, 30, 30, 5])
+        emitted = detector.process_batch(distances, timestamps=[0, 1, 2, 3, 4, "2024-01-01T00:00:05"])
+        assert emitted == [(1, VEHICLE_DETECTED), (3, NO_VEHICLE), (5, VEHICLE_DETECTED)]
+        assert events[0]["data"]["distance"] == 8.0 and isinstance(events[0]["data"]["distance"], float)
+        assert events[-1]["timestamp"] == "2024-01-01T00:00:05"
+        assert detector.process_batch(np.array([])) == []
+        with pytest.raises(ValueError):
+            detector.process_batch([1.0, 2.0], timestamps=[0])
+
+
+class TestDebounce:
+    """Hysteresis, dwell time and median filtering."""
+
+    @staticmethod
+    def _run(detector, distances, step=0.2):
+        clock = [0.0]
+        detector.clock = lambda: clock[0]
+        events = []
+        detector.on_vehicle_detected(events.append)
+        detector.on_no_vehicle(events.append)
+        for d in distances:
+            detector.sensor.set_distance(d)
+            detector.check()
+            clock[0] += step
+        return [e["type"] for e in events]
+
+    def test_hysteresis_band_absorbs_jitter(self):
+        noisy = [50, 9, 11, 9, 11, 9, 11, 50]
+        plain = self._run(VehicleDetector(MockSensor(mode="manual"), threshold_cm=10.0), noisy)
+        assert len(plain) == 6
+        banded = VehicleDetector(MockSensor(mode="manual"), threshold_cm=10.0, exit_threshold_cm=15.0)
+        assert self._run(banded, noisy) == [VEHICLE_DETECTED, NO_VEHICLE]
+
+    def test_min_dwell_ignores_blips(self):
+        detector = VehicleDetector(MockSensor(mode="manual"), threshold_cm=10.0, min_dwell_s=0.5)
+        false_alarm = [d["distance"] for d in MockSensor().get_predefined_scenario("false_alarm")]
+        assert self._run(detector, false_alarm) == []
+        assert self._run(detector, [8, 8, 8, 8, 50, 50, 50, 50]) == [VEHICLE_DETECTED, NO_VEHICLE]
+
+    def test_median_filter_drops_spikes(self):
+        detector = VehicleDetector(MockSensor(mode="manual"), threshold_cm=10.0, median_window=3)
+        assert self._run(detector, [50, 50, 5, 50, 50, 8, 7, 90, 6, 50, 50]) == [VEHICLE_DETECTED, NO_VEHICLE]
+
+    def test_batch_uses_same_engine(self):
+        trace = [50, 9, 11, 9, 12, 16, 8, 8, 8, 20, 20, 20]
+        loop = VehicleDetector(MockSensor(mode="manual"), 10.0, exit_threshold_cm=15.0,
+                               min_dwell_s=0.3, median_window=3)
+        expected = self._run(loop, trace, step=0.2)
+        batch = VehicleDetector(MockSensor(mode="manual"), 10.0, exit_threshold_cm=15.0,
+                                min_dwell_s=0.3, median_window=3)
+        emitted = batch.process_batch(trace, timestamps=[i * 0.2 for i in range(len(trace))])
+        assert [t for _, t in emitted] == expected and expected
+
+    def test_invalid_exit_threshold(self):
+        with pytest.raises(ValueError):
+            VehicleDetector(MockSensor(mode="manual"), threshold_cm=10.0, exit_threshold_cm=5.0)
+
+
+class TestRollingMedian:
+    """Ring-buffer median."""
+
+    def test_matches_sorted_window(self):
+        from src.vehicle_detection.filters import RollingMedian
+        rng = random.Random(8)
+        median = RollingMedian(5)
+        values = [rng.uniform(0, 100) for _ in range(200)]
+        for i, value in enumerate(values):
+            window = sorted(values[max(0, i - 4):i + 1])
+            assert median.push(value) == window[(len(window) - 1) // 2]
+        assert len(median) == 5
+        assert math.isnan(median.push(float("nan"))) and len(median) == 5
+
+
+class TestScheduling:
+    """Fixed-rate deadlines for the polling loops."""
+
+    def test_deadlines_keep_phase_and_count_overruns(self):
+        from src.vehicle_detection.scheduling import Deadlines
+        stats = LoopStats(1.0)
+        deadlines = Deadlines(1.0, 0.0, stats)
+        deadlines.woke(0.0)
+        assert deadlines.done(0.3) == pytest.approx(0.7)
+        deadlines.woke(1.05)
+        assert deadlines.done(3.5) == pytest.approx(0.5)  # due at 2 and 3 missed, next at 4
+        assert (stats.ticks, stats.overruns, stats.missed) == (2, 1, 2)
+        assert stats.jitter_max == pytest.approx(0.05) and stats.busy_max == pytest.approx(2.45)
+
+    def test_async_run_does_not_drift(self):
+        import asyncio
+        from src.vehicle_detection.scheduling import run_every_async
+        now = [0.0]
+        delays = []
+
+        def tick():
+            now[0] += 0.03  # a 30 ms round of reads and callbacks
+
+        async def sleep(delay):
+            delays.append(delay)
+            now[0] += delay
+
+        stats = asyncio.run(run_every_async(tick, 0.05, max_iterations=4, clock=lambda: now[0], sleep=sleep))
+        # Sleeps only the rest of each interval, so every read starts on its deadline
+        assert delays == pytest.approx([0.02] * 3) and now[0] == pytest.approx(0.18)
+        assert stats.ticks == 4 and stats.jitter_max == pytest.approx(0.0)
+        assert stats.busy_max == pytest.approx(0.03)
+
+    def test_async_run_shares_loop(self):
+        import asyncio
+
+        class AlternatingSensor(MockSensor):
+            """Vehicle in, vehicle out: every read changes state."""
+
+            def get_distance(self):
+                self.current_distance = 5.0 if self.current_distance >= 10 else 50.0
+                return self.current_distance
+
+        events = []
+        detectors = []
+        for _ in range(3):
+            detector = VehicleDetector(AlternatingSensor(mode="manual"))
+            detector.on_vehicle_detected(events.append)
+            detector.on_no_vehicle(events.append)
+            detectors.append(detector)
+
+        async def scenario():
+            return await asyncio.gather(*(d.run(0.001, max_iterations=6) for d in detectors))
+
+        results = asyncio.run(scenario())
+        assert all(stats.ticks == 6 for stats in results)
+        assert len(events) == 18
+
+    def test_async_run_cancellation_keeps_stats(self, detector):
+        import asyncio
+        stats = LoopStats(0.01)
+
+        async def scenario():
+            task = asyncio.ensure_future(detector.run(0.01, stats=stats))
+            await asyncio.sleep(0.06)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        assert stats.ticks >= 2 and stats.to_dict()["interval_ms"] == 10
+
+
+class TestDispatch:
+    """Listener policies, bounded queues and latency stats."""
+
+    def test_slow_thread_listener_does_not_delay_readings(self, mock_sensor, detector):
+        release = threading.Event()
+        events = []
+
+        def slow_listener(event):
+            release.wait(5)
+            events.append(event["type"])
+
+        detector.on_vehicle_detected(slow_listener, policy=THREAD)
+        detector.on_no_vehicle(slow_listener, policy=THREAD)
+        for distance in (5.0, 50.0, 5.0, 50.0):
+            mock_sensor.set_distance(distance)
+            detector.check()
+        # Every reading was handled while the listener is still blocked on the first event
+        assert detector.current_state == NO_VEHICLE and events == []
+        release.set()
+        detector.close()
+        # One listener for both event types, so they arrive in order
+        assert events == [VEHICLE_DETECTED, NO_VEHICLE, VEHICLE_DETECTED, NO_VEHICLE]
+        assert detector.event_listeners[NO_VEHICLE] == [slow_listener]
+        stats, = detector.get_listener_stats()
+        assert stats["delivered"] == 4 and stats["latency"]["count"] == 4
+
+    @pytest.mark.parametrize("overflow, expected", [(DROP_NEWEST, [0, 1, 2]), (DROP_OLDEST, [0, 4, 5])])
+    def test_overflow_policies(self, overflow, expected):
+        release = threading.Event()
+        seen = []
+
+        def blocked_listener(event):
+            release.wait(5)
+            seen.append(event["n"])
+
+        dispatcher = EventDispatcher()
+        dispatcher.subscribe("E", blocked_listener, THREAD, max_queue=2, overflow=overflow)
+        dispatcher.dispatch("E", {"n": 0})
+        deadline = time.monotonic() + 2
+        while dispatcher.get_stats()[0]["queued"] and time.monotonic() < deadline:
+            time.sleep(0.001)  # worker has taken event 0 and is blocked on it
+        for n in range(1, 6):
+            dispatcher.dispatch("E", {"n": n})
+        release.set()
+        dispatcher.close()
+        assert seen == expected
+        assert dispatcher.get_stats()[0]["dropped"] == 3
+
+    def test_thread_listener_failures_are_counted_and_logged(self, caplog):
+        def broken_listener(event):
+            raise ValueError("boom")
+
+        dispatcher = EventDispatcher()
+        dispatcher.subscribe("E", broken_listener, THREAD)
+        dispatcher.dispatch("E", {})
+        assert dispatcher.flush(timeout=2)
+        stats, = dispatcher.get_stats()
+        assert (stats["delivered"], stats["failed"]) == (0, 1)
+        dispatcher.close()
+        assert "Listener broken_listener failed" in caplog.text
+
+    def test_event_listeners_list_stays_mutable(self, mock_sensor, detector):
+        events = []
+        detector.event_listeners[VEHICLE_DETECTED].append(events.append)
+        assert detector.event_listeners[VEHICLE_DETECTED] == [events.append]
+        mock_sensor.set_distance(5.0)
+        detector.check()
+        assert len(events) == 1
+        detector.event_listeners[VEHICLE_DETECTED].remove(events.append)
+        assert len(detector.event_listeners[VEHICLE_DETECTED]) == 0
+        with pytest.raises(ValueError):
+            detector.event_listeners[VEHICLE_DETECTED].remove(events.append)
+        with pytest.raises(TypeError):
+            detector.event_listeners[NO_VEHICLE] = []
+        with pytest.raises(AttributeError):
+            detector.event_listeners[NO_VEHICLE].insert(0, print)
+
+    def test_inline_listener_errors_propagate(self, mock_sensor, detector):
+        def broken_listener(event):
+            raise ValueError("boom")
+
+        detector.on_vehicle_detected(broken_listener)
+        mock_sensor.set_distance(5.0)
+        with pytest.raises(ValueError):
+            detector.check()
+
+    def test_resubscribing_with_another_policy_rejected(self, detector):
+        detector.on_vehicle_detected(print, policy=THREAD)
+        with pytest.raises(ValueError):
+            detector.on_no_vehicle(print)
+        detector.close()
+
+    def test_process_listener_runs_in_worker_process(self):
+        dispatcher = EventDispatcher(process_workers=1)
+        dispatcher.subscribe("E", _outside_parent, PROCESS)
+        for _ in range(3):
+            dispatcher.dispatch("E", {"parent_pid": os.getpid()})
+        dispatcher.close()
+        stats, = dispatcher.get_stats()
+        assert (stats["policy"], stats["delivered"], stats["failed"]) == (PROCESS, 3, 0)
+
+    def test_latency_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for ms in [0.05] * 90 + [3] * 9 + [5000]:
+            histogram.record(ms / 1000)
+        summary = histogram.to_dict()
+        assert summary["count"] == 100
+        assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (0.1, 5.0, 5.0)
+        assert histogram.percentile(100) == pytest.approx(5000)
+        assert summary["buckets"] == {"<=0.1": 90, "<=5": 9}
+
+
+class TestLaneManager:
+    """Several lanes on one schedule and one event pipeline."""
+
+    def test_lanes_tag_events_and_share_listeners(self):
+        manager = LaneManager(["north", "south"], threshold_cm=10.0)
+        events = []
+        manager.on_vehicle_detected(events.append)
+        manager.on_no_vehicle(events.append)
+        manager["south"].sensor.set_distance(5.0)
+        assert manager.check() == [("south", VEHICLE_DETECTED)]
+        manager["north"].sensor.set_distance(5.0)
+        manager["south"].sensor.set_distance(50.0)
+        assert manager.check() == [("north", VEHICLE_DETECTED), ("south", NO_VEHICLE)]
+        assert [(e["lane_id"], e["type"]) for e in events] == [
+            ("south", VEHICLE_DETECTED), ("north", VEHICLE_DETECTED), ("south", NO_VEHICLE),
+        ]
+        assert manager.get_states() == {"north": VEHICLE_DETECTED, "south": NO_VEHICLE}
+        stats, = manager.get_listener_stats()
+        assert stats["delivered"] == 3
+
+    def test_add_and_remove_lanes(self):
+        manager = LaneManager(2, min_dwell_s=1.0)
+        assert list(manager.lanes) == ["lane-1", "lane-2"]
+        fast = manager.add_lane("lane-3", min_dwell_s=0.0)
+        assert fast.min_dwell_s == 0.0 and manager["lane-1"].min_dwell_s == 1.0
+        with pytest.raises(ValueError):
+            manager.add_lane("lane-3")
+        manager.remove_lane("lane-1")
+        assert len(manager) == 2
+
+    def test_events_logged_with_lane(self, empty_vehicle_db):
+        manager = LaneManager(3)
+        writer = manager.log_events_to(empty_vehicle_db, flush_interval_ms=10)
+        for lane_id in ("lane-1", "lane-3"):
+            manager[lane_id].sensor.set_distance(5.0)
+        manager.check()
+        assert writer.flush(timeout=5)
+        rows = empty_vehicle_db.get_events_since(0)
+        assert sorted(e["lane_id"] for e in rows) == ["lane-1", "lane-3"]
+        assert empty_vehicle_db.get_recent_events(lane_id="lane-3")[0]["event_type"] == VEHICLE_DETECTED
+
+    def test_many_lanes_share_one_schedule(self):
+        clock_reads = []
+
+        def clock():
+            clock_reads.append(None)
+            return float(len(clock_reads))
+
+        manager = LaneManager(48, clock=clock)
+        for i, detector in enumerate(manager.lanes.values()):
+            detector.sensor.set_distance(5.0 if i % 2 else 50.0)
+        events = []
+        manager.on_vehicle_detected(events.append, policy=THREAD)
+        stats = manager.run_continuous(0.02, max_iterations=5)
+        manager.close()
+        # One clock read per tick for the whole gate, not one per lane
+        assert stats.ticks == 5 and len(clock_reads) == 5
+        assert len(events) == 24
@@ -0,0 +1,78 @@
+"""Unit tests for the background batched event writer."""
+
+import threading
+
+import pytest
+
+from src.database import EventWriter, VehicleDB
+
+
+class _SlowDB:
+    """Stand-in database whose writes block until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+
+    def log_detection_events(self, events):
+        self.release.wait(2)
+        self.batches.append(list(events))
+
+
+class TestEventWriter:
+    """Batching, ordering, overflow and shutdown."""
+
+    def test_events_written_in_batches_with_submit_time(self, empty_vehicle_db):
+        writer = empty_vehicle_db.get_event_writer(batch_size=10, flush_interval_ms=50)
+        for i in range(25):
+            writer.submit("vehicle_detected", float(i))
+        assert writer.flush(timeout=5)
+        stats = writer.get_stats()
+        assert stats["written"] == 25 and stats["dropped"] == 0
+        assert 3 <= stats["batches"] < 25
+        events = empty_vehicle_db.get_recent_events(limit=100)
+        assert len(events) == 25
+        assert all(e["timestamp"] for e in events)
+
+    def test_detector_listener_interface(self, empty_vehicle_db):
+        writer = empty_vehicle_db.get_event_writer()
+        writer({"type": "no_vehicle", "timestamp": "x", "data": {"distance": 42.0}})
+        writer.flush(timeout=5)
+        event = empty_vehicle_db.get_recent_events(limit=1)[0]
+        assert event["event_type"] == "no_vehicle" and event["distance"] == 42.0
+
+    def test_full_queue_drops_without_blocking(self):
+        db = _SlowDB()
+        writer = EventWriter(db, batch_size=1, max_queue=2)
+        results = [writer.submit("e", float(i)) for i in range(10)]
+        assert results.count(False) >= 6
+        assert writer.get_stats()["dropped"] == results.count(False)
+        db.release.set()
+        writer.close()
+        written = [event for batch in db.batches for event in batch]
+        assert len(written) + writer.dropped == 10
+
+    def test_drop_oldest_keeps_newest(self):
+        db = _SlowDB()
+        writer = EventWriter(db, batch_size=1, max_queue=2, overflow="drop_oldest")
+        for i in range(10):
+            writer.submit("e", float(i))
+        db.release.set()
+        writer.close()
+        distances = [event[1] for batch in db.batches for event in batch]
+        assert distances[-2:] == [8.0, 9.0]
+
+    def test_close_writes_queued_events(self, temp_db_path):
+        db = VehicleDB(temp_db_path)
+        writer = db.get_event_writer(batch_size=1000, flush_interval_ms=10000)
+        for _ in range(5):
+            writer.submit("vehicle_detected", 5.0)
+        db.close()
+        assert writer.get_stats()["written"] == 5
+        assert writer.submit("late") is False
+        with VehicleDB(temp_db_path) as reopened:
+            assert len(reopened.get_recent_events()) == 5
+
+    def test_unknown_overflow_policy_rejected(self):
+        with pytest.raises(ValueError):
+            EventWriter(_SlowDB(), overflow="block")
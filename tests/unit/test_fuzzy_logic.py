@@ -2,7 +2,7 @@
 
 import pytest
 
-from src.fuzzy_logic import check_plate_authorization
+from src.fuzzy_logic import check_plate_authorization, check_plate_candidates
 
 
 class TestFuzzyLogic:
@@ -32,3 +32,15 @@ class TestFuzzyLogic:
         ok1, _, _ = check_plate_authorization("abc123", authorized)
         ok2, _, _ = check_plate_authorization("ABC123", authorized)
         assert ok1 is True and ok2 is True
+
+    def test_candidates_pick_best_reading(self):
+        authorized = ["ABC123", "XYZ789"]
+        ok, candidate, match, score = check_plate_candidates(["QQQ999", "A8C1Z3", "ABC123"], authorized)
+        assert ok is True
+        assert candidate == "ABC123" and match == "ABC123"
+
+    def test_candidates_none_authorized(self):
+        ok, candidate, match, score = check_plate_candidates(["QQQ999", "WWW000"], ["ABC123"])
+        assert ok is False
+        assert score < 0.85
+        assert check_plate_candidates([], ["ABC123"]) == (False, "", "", 0.0)
@@ -78,3 +78,19 @@ def test_completely_different_plate_is_unauthorized():
     assert decision.status == "UNAUTHORIZED"
     assert decision.plate == "ZZZ999"
 
+
+def test_repeated_plate_served_from_cache_until_list_changes(empty_vehicle_db):
+    from src.common.gate_logic import decision_cache
+    empty_vehicle_db.add_vehicle("ABC123")
+    matcher = empty_vehicle_db.get_matcher()
+    decision_cache.clear()
+    for _ in range(3):
+        decision = decide_gate_action("ABC12X", 30.0, matcher, 50.0, fuzzy_threshold=0.8)
+        assert decision.match == "ABC123"
+    assert decision_cache.info()["hits"] == 2 and decision_cache.info()["misses"] == 1
+    version = empty_vehicle_db.version
+    empty_vehicle_db.add_vehicle("ABC12X")
+    assert empty_vehicle_db.version == version + 1
+    decision = decide_gate_action("ABC12X", 30.0, matcher, 50.0, fuzzy_threshold=0.8)
+    assert decision.match == "ABC12X" and decision.similarity == 1.0
+    assert decision_cache.info()["misses"] == 2
@@ -0,0 +1,58 @@
+"""Unit tests for the counting Bloom filter over authorized plates."""
+
+import random
+
+import pytest
+
+from src.matching import PlateFilter
+from src.matching.bloom import filter_size
+
+
+def _plates(n, seed=5, prefix=""):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+    plates = set()
+    while len(plates) < n:
+        plates.add(prefix + "".join(rng.choice(alphabet) for _ in range(7)))
+    return sorted(plates)
+
+
+class TestPlateFilter:
+    """Membership, false-positive rate, deletes and persistence."""
+
+    def test_no_false_negatives_and_rate_near_target(self):
+        plates = _plates(2000)
+        plate_filter = PlateFilter(plates, capacity=2000, false_positive_rate=0.01)
+        assert all(p in plate_filter for p in plates)
+        others = _plates(20000, seed=9, prefix="Q")
+        rate = sum(p in plate_filter for p in others) / len(others)
+        assert rate < 0.02
+        assert plate_filter.estimated_false_positive_rate() == pytest.approx(0.01, rel=0.2)
+
+    def test_size_follows_rate(self):
+        loose, strict = filter_size(1000, 0.05), filter_size(1000, 0.001)
+        assert strict[0] > loose[0] and strict[1] > loose[1]
+        with pytest.raises(ValueError):
+            filter_size(1000, 0)
+
+    def test_normalized_and_removable(self):
+        plate_filter = PlateFilter(["abc123 "], capacity=10)
+        assert "ABC123" in plate_filter
+        assert plate_filter.remove("ABC123")
+        assert "ABC123" not in plate_filter and len(plate_filter) == 0
+        assert not plate_filter.remove("ABC123")
+
+    def test_save_and_memory_mapped_load(self, tmp_path):
+        path = str(tmp_path / "plates.bloom")
+        plates = _plates(500)
+        PlateFilter.for_plates(plates).save(path, (500, 500))
+        loaded = PlateFilter.load(path, (500, 500), 0.01)
+        assert loaded is not None and len(loaded) == 500
+        assert all(p in loaded for p in plates)
+        loaded.add("NEW0001")  # copy-on-write: the file is untouched
+        assert "NEW0001" in loaded
+        assert len(PlateFilter.load(path, (500, 500))) == 500
+        assert PlateFilter.load(path, (499, 500)) is None
+        assert PlateFilter.load(path, (500, 500), 0.05) is None
+        assert PlateFilter.load(str(tmp_path / "missing.bloom")) is None
+
@@ -0,0 +1,251 @@
+"""Unit tests for the shared compiled plate matcher."""
+
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from src.matching import PlateMatcher, get_plate_matcher, position_score, RATIO, OPTICAL
+
+
+def _reference_optical(input_plate, authorized_plates):
+    """Original check_plate_authorization scan (before PlateMatcher)."""
+    best_match, highest_score = None, 0.0
+    for auth_plate in authorized_plates:
+        ratio_score = SequenceMatcher(None, input_plate.upper(), auth_plate.upper()).ratio()
+        final_score = (ratio_score + position_score(input_plate, auth_plate)) / 2
+        if final_score > highest_score:
+            highest_score, best_match = final_score, auth_plate
+    return best_match, highest_score
+
+
+def _reference_ratio(plate_text, authorized_plates):
+    """Original decide_gate_action scan (before PlateMatcher)."""
+    normalized = plate_text.strip().upper()
+    best_match, best_ratio = None, 0.0
+    for auth in authorized_plates:
+        candidate = auth.strip().upper()
+        if not candidate:
+            continue
+        ratio = SequenceMatcher(None, normalized, candidate).ratio()
+        if ratio > best_ratio:
+            best_ratio, best_match = ratio, candidate
+    return best_match, best_ratio
+
+
+def _random_plates(n, seed=3):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGILOSZ0123456789"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(5, 8))) for _ in range(n)]
+
+
+class TestPlateMatcher:
+    """PlateMatcher reproduces the scans it replaces."""
+
+    def test_best_match_matches_reference_scans(self):
+        plates = _random_plates(300) + ["ABC123", "abc120", " XYZ789 "]
+        matcher = PlateMatcher(plates)
+        queries = ["ABC12O", "abc123", "XYZ78g", " xyz789", "QQQ999"] + _random_plates(20, seed=9)
+        for query in queries:
+            assert matcher.best_match(query, scorer=OPTICAL) == _reference_optical(query, plates)
+            assert matcher.best_match(query) == _reference_ratio(query, plates)
+
+    def test_all_above_and_top_k(self):
+        plates = ["ABC123", "ABC124", "ABD123", "ZZZ999"]
+        matcher = PlateMatcher(plates)
+        above = matcher.all_above("abc123", 0.8)
+        assert [p for p, _ in above] == ["ABC123", "ABC124", "ABD123"]
+        assert above[0][1] == 1.0
+        assert matcher.top_k("abc123", 2) == above[:2]
+
+    def test_add_remove_bump_version(self):
+        matcher = PlateMatcher(["ABC123"])
+        version = matcher.version
+        matcher.add("XYZ789")
+        assert "xyz789" in matcher and matcher.version == version + 1
+        assert matcher.remove("XYZ789") is True
+        assert matcher.remove("XYZ789") is False
+        assert matcher.best_match("XYZ789")[0] != "XYZ789"
+        assert matcher.version == version + 2
+
+    def test_get_plate_matcher_reuses_compiled_list(self):
+        first = get_plate_matcher(["ABC123", "XYZ789"])
+        assert get_plate_matcher(["ABC123", "XYZ789"]) is first
+        assert get_plate_matcher(["ABC123"]) is not first
+        assert get_plate_matcher(first) is first
+
+    def test_unknown_scorer_rejected(self):
+        with pytest.raises(ValueError):
+            PlateMatcher(["ABC123"]).best_match("ABC123", scorer="nope")
+
+
+class TestPruning:
+    """Bound-based pruning never changes results and is counted."""
+
+    @pytest.mark.parametrize("vectorize", [True, False])
+    def test_pruned_results_match_reference(self, vectorize):
+        plates = _random_plates(400, seed=17) + ["ABC123", "ABC12", "XABC123"]
+        matcher = PlateMatcher(plates, vectorize=vectorize)
+        for query in ["ABC123", "abc12O", "ZZ", ""] + _random_plates(25, seed=23):
+            assert matcher.best_match(query, scorer=OPTICAL) == _reference_optical(query, plates)
+            assert matcher.best_match(query) == _reference_ratio(query, plates)
+            for threshold in (0.5, 0.85):
+                expected = sorted(
+                    {(p.strip().upper(), SequenceMatcher(None, query.strip().upper(), p.strip().upper()).ratio())
+                     for p in plates},
+                    key=lambda x: (-x[1], x[0]),
+                )
+                assert matcher.all_above(query, threshold) == [m for m in expected if m[1] >= threshold]
+
+    @pytest.mark.parametrize("backend", ["indel", "levenshtein"])
+    def test_pruning_is_safe_for_other_backends(self, backend):
+        plates = _random_plates(300, seed=29)
+        pruned = PlateMatcher(plates, backend=backend)
+        for query in _random_plates(20, seed=31):
+            scores = sorted(((p, pruned._similarity(query, p)) for p in dict.fromkeys(plates)),
+                            key=lambda x: (-x[1], x[0]))
+            assert pruned.all_above(query, 0.6) == [s for s in scores if s[1] >= 0.6]
+            assert pruned.best_match(query)[1] == scores[0][1]
+
+    def test_stats_count_skipped_candidates(self):
+        from src.matching.plate_matcher import MatchStats
+        plates = ["ABC123"] + _random_plates(500, seed=37)
+        matcher = PlateMatcher(plates)
+        stats = MatchStats()
+        assert matcher.best_match("ABC123", stats=stats) == ("ABC123", 1.0)
+        assert stats.queries == 1
+        assert stats.candidates == len(set(plates))
+        assert stats.scored + stats.skipped == stats.candidates
+        assert stats.skipped > 0
+        matcher.all_above("ABC123", 0.85, stats=stats)
+        assert stats.queries == 2
+        assert matcher.stats.queries == 2 and matcher.stats.skipped == stats.skipped
+        matcher.reset_stats()
+        assert matcher.stats.queries == 0
+
+    def test_bk_tree_built_only_for_unvectorized_queries(self):
+        plates = _random_plates(200, seed=39)
+        vectorized = PlateMatcher(plates)
+        vectorized.all_above("ABC123", 0.8)
+        assert vectorized._norm_index is None or not vectorized.vectorize
+        matcher = PlateMatcher(plates, vectorize=False)
+        assert matcher._norm_index is None
+        matcher.all_above("ABC123", 0.8)
+        matcher.add("ABC124")
+        matcher.remove(plates[0])
+        expected = PlateMatcher(plates[1:] + ["ABC124"]).all_above("ABC123", 0.8)
+        assert matcher._norm_index is not None
+        assert matcher.all_above("ABC123", 0.8) == expected and ("ABC124", pytest.approx(5 / 6)) in expected
+
+
+class TestConfusionIndex:
+    """Confusion-class lookup seeds best_match without changing its result."""
+
+    def test_canonical_form_merges_optical_typos(self):
+        from src.matching.optical import canonical_form
+        assert canonical_form(" abc1o0 ") == canonical_form("ABCI00") == canonical_form("ABCLOO")
+        assert canonical_form("ABC123") != canonical_form("ABC124")
+
+    @pytest.mark.parametrize("vectorize", [True, False])
+    def test_seeded_best_match_matches_reference(self, vectorize):
+        rng = random.Random(41)
+        typos = {"0": "O", "1": "I", "5": "S", "2": "Z", "8": "B"}
+        plates = _random_plates(300, seed=43) + ["ABC100", "ABCI00"]
+        matcher = PlateMatcher(plates, vectorize=vectorize)
+        for plate in rng.sample(plates, 30):
+            query = "".join(typos.get(c, c) if rng.random() < 0.5 else c for c in plate)
+            assert matcher.best_match(query, scorer=OPTICAL) == _reference_optical(query, plates)
+            assert matcher.best_match(query) == _reference_ratio(query, plates)
+
+    def test_stop_on_exact_returns_full_scan_result(self):
+        from src.matching.plate_matcher import MatchStats
+        plates = ["ABC100"] + _random_plates(500, seed=47)
+        matcher = PlateMatcher(plates)
+        stats = MatchStats()
+        assert matcher.best_match("ABC100", scorer=OPTICAL, stats=stats, stop_on_exact=True) == ("ABC100", 1.0)
+        assert stats.accepted == 1 and stats.candidates == stats.canonical == 1
+        for query in ["ABCIOO", "ABC1O0", "XYZ999"] + _random_plates(20, seed=53):
+            for scorer in (RATIO, OPTICAL):
+                full = matcher.best_match(query, scorer=scorer)
+                assert matcher.best_match(query, scorer=scorer, stop_on_exact=True) == full
+
+    def test_stop_on_exact_keeps_better_plate_outside_confusion_class(self):
+        from src.common.gate_logic import decide_gate_action
+        from src.fuzzy_logic import check_plate_authorization
+        plates = ["MH12DE1438", "MH12DE14335"]
+        matcher = PlateMatcher(plates)
+        # MH12DE1438 shares the read's confusion class and clears 0.85, but scores lower
+        assert matcher.best_match("MH12DE1433", stop_on_exact=True) == matcher.best_match("MH12DE1433")
+        decision = decide_gate_action("MH12DE1433", 10, plates, 20, 0.85, use_cache=False)
+        assert decision.match == "MH12DE14335"
+        assert decision.similarity == pytest.approx(0.952, abs=1e-3)
+        authorized, plate, score = check_plate_authorization("MH12DE1433", plates, use_cache=False)
+        assert (authorized, plate) == (True, "MH12DE14335")
+        assert score == pytest.approx(0.9307, abs=1e-4)
+
+    def test_whitespace_plate_with_blank_query(self):
+        matcher = PlateMatcher(["   ", "ABC123"])
+        for scorer in (RATIO, OPTICAL):
+            assert matcher.best_match("  ", scorer=scorer, stop_on_exact=True)[0] != "ABC123"
+        assert matcher.best_match("  ") == _reference_ratio("  ", ["   ", "ABC123"])
+
+    def test_remove_updates_confusion_index(self):
+        matcher = PlateMatcher(["ABC100", "XYZ789"])
+        matcher.remove("ABC100")
+        assert matcher.best_match("ABCIOO", stop_on_exact=True)[0] != "ABC100"
+
+
+class TestBestOf:
+    """Batch scoring of several readings against one matcher."""
+
+    @pytest.mark.parametrize("scorer", [RATIO, OPTICAL])
+    def test_best_of_matches_independent_queries(self, scorer):
+        plates = _random_plates(300, seed=59)
+        matcher = PlateMatcher(plates)
+        rng = random.Random(61)
+        for _ in range(10):
+            queries = rng.sample(plates, 3) + _random_plates(5, seed=rng.randint(0, 999))
+            rng.shuffle(queries)
+            expected = (None, None, 0.0)
+            for query in queries:
+                plate, score = matcher.best_match(query, scorer=scorer)
+                if plate is not None and score > expected[2]:
+                    expected = (query, plate, score)
+            assert matcher.best_of(queries, scorer=scorer) == expected
+
+    def test_best_of_shares_pruning_floor(self):
+        from src.matching.plate_matcher import MatchStats
+        plates = ["ABC123"] + _random_plates(500, seed=67)
+        matcher = PlateMatcher(plates, vectorize=False)
+        stats = MatchStats()
+        queries = ["ABC123"] + _random_plates(10, seed=71)
+        assert matcher.best_of(queries, stats=stats) == ("ABC123", "ABC123", 1.0)
+        assert stats.queries == len(queries)
+        assert stats.scored + stats.skipped == stats.candidates
+        assert stats.scored < len(queries) * len(plates) // 10
+        assert matcher.best_of(queries, stop_on_exact=True) == ("ABC123", "ABC123", 1.0)
+        assert matcher.best_of([]) == (None, None, 0.0)
+
+
+class TestTopK:
+    """Heap-based top_k returns exactly the head of all_above."""
+
+    @pytest.mark.parametrize("vectorize", [True, False])
+    @pytest.mark.parametrize("scorer", [RATIO, OPTICAL])
+    def test_top_k_is_prefix_of_all_above(self, vectorize, scorer):
+        plates = _random_plates(400, seed=73) + ["ABC123", "ABC124", "ABC125"]
+        matcher = PlateMatcher(plates, vectorize=vectorize)
+        for query in ["ABC12X", "abc123"] + _random_plates(10, seed=79):
+            for threshold in (float("-inf"), 0.5):
+                expected = matcher.all_above(query, threshold, scorer=scorer)
+                for k in (1, 5, 1000):
+                    assert matcher.top_k(query, k, scorer=scorer, threshold=threshold) == expected[:k]
+        assert matcher.top_k("ABC123", 0) == []
+
+    def test_top_k_skips_plates_that_cannot_enter(self):
+        from src.matching.plate_matcher import MatchStats
+        matcher = PlateMatcher(["ABC123", "ABC124"] + _random_plates(500, seed=83))
+        stats = MatchStats()
+        assert [p for p, _ in matcher.top_k("ABC123", 2, stats=stats)] == ["ABC123", "ABC124"]
+        assert stats.scored + stats.skipped == stats.candidates
+        assert stats.scored < 50
@@ -0,0 +1,83 @@
+"""Unit tests for detection event retention, rollups and archives."""
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from src.database import RetentionPolicy
+
+NOW = datetime(2024, 3, 20, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _seed(db):
+    """Old events over two days plus recent ones that must stay raw."""
+    db.log_detection_events([
+        ("vehicle_detected", 40.0, "2024-03-01 08:15:01.000"),
+        ("vehicle_detected", 20.0, "2024-03-01 08:15:30.000"),
+        ("vehicle_detected", None, "2024-03-01 08:16:00.000"),
+        ("no_vehicle", 300.0, "2024-03-01 08:59:59.000"),
+        ("vehicle_detected", 10.0, "2024-03-02 23:00:00.000"),
+        ("vehicle_detected", 5.0, "2024-03-19 09:00:00.000"),
+        ("no_vehicle", 250.0, "2024-03-20 11:00:00.000"),
+    ])
+
+
+class TestRetention:
+    """Rolling raw events up, archiving them and pruning old rollups."""
+
+    def test_raw_events_rolled_up_per_minute(self, empty_vehicle_db):
+        _seed(empty_vehicle_db)
+        policy = RetentionPolicy(raw_days=7, minute_days=None, hour_days=None)
+        report = empty_vehicle_db.apply_retention(policy, now=NOW)
+        assert report.complete and report.raw_rolled_up == 5
+        remaining = empty_vehicle_db.get_recent_events(limit=10)
+        assert [e["timestamp"][:10] for e in remaining] == ["2024-03-20", "2024-03-19"]
+        rollups = {(r["bucket"], r["event_type"]): r
+                   for r in empty_vehicle_db.get_event_rollups("minute")}
+        first = rollups[("2024-03-01 08:15", "vehicle_detected")]
+        assert first["count"] == 2
+        assert first["distance_min"] == 20.0 and first["distance_avg"] == pytest.approx(30.0)
+        no_distance = rollups[("2024-03-01 08:16", "vehicle_detected")]
+        assert no_distance["count"] == 1 and no_distance["distance_avg"] is None
+
+    def test_minutes_merged_into_hours_and_hours_pruned(self, empty_vehicle_db):
+        _seed(empty_vehicle_db)
+        empty_vehicle_db.apply_retention(RetentionPolicy(raw_days=7, minute_days=10, hour_days=None), now=NOW)
+        assert empty_vehicle_db.get_event_rollups("minute") == []
+        hours = {(r["bucket"], r["event_type"]): r for r in empty_vehicle_db.get_event_rollups("hour")}
+        merged = hours[("2024-03-01 08", "vehicle_detected")]
+        assert merged["count"] == 3
+        assert merged["distance_min"] == 20.0 and merged["distance_avg"] == pytest.approx(30.0)
+        assert hours[("2024-03-01 08", "no_vehicle")]["count"] == 1
+
+        report = empty_vehicle_db.apply_retention(RetentionPolicy(hour_days=18.5), now=NOW)
+        assert report.hours_deleted == 2
+        assert [r["bucket"] for r in empty_vehicle_db.get_event_rollups("hour")] == ["2024-03-02 23"]
+
+    def test_archive_written_per_day(self, empty_vehicle_db, tmp_path):
+        _seed(empty_vehicle_db)
+        policy = RetentionPolicy(raw_days=7, archive_dir=str(tmp_path), batch_size=2)
+        report = empty_vehicle_db.apply_retention(policy, now=NOW)
+        assert report.raw_archived == 5
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "events-2024-03-01.jsonl.gz", "events-2024-03-02.jsonl.gz"
+        ]
+        with gzip.open(tmp_path / "events-2024-03-01.jsonl.gz", "rt", encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+        assert [e["distance"] for e in events] == [40.0, 20.0, None, 300.0]
+
+    def test_max_batches_resumes(self, empty_vehicle_db):
+        _seed(empty_vehicle_db)
+        policy = RetentionPolicy(raw_days=7, minute_days=None, hour_days=None, batch_size=2)
+        first = empty_vehicle_db.apply_retention(policy, now=NOW, max_batches=1)
+        assert not first.complete and first.raw_rolled_up == 2
+        rest = empty_vehicle_db.apply_retention(policy, now=NOW)
+        assert rest.complete and rest.raw_rolled_up == 3
+        total = sum(r["count"] for r in empty_vehicle_db.get_event_rollups("minute"))
+        assert total == 5
+
+    def test_unknown_resolution(self, empty_vehicle_db):
+        with pytest.raises(ValueError):
+            empty_vehicle_db.get_event_rollups("day")
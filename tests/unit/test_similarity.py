@@ -0,0 +1,60 @@
+"""Unit tests for the similarity kernels."""
+
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from src.matching import PlateMatcher, SIMILARITY_BACKENDS, levenshtein, lcs_length, sequence_ratio, indel_ratio
+from src.matching.similarity import get_similarity, index_positions
+
+
+def _dp_levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def _pairs(n, alphabet="ABO018", max_len=12, seed=21):
+    rng = random.Random(seed)
+    word = lambda: "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+    return [(word(), word()) for _ in range(n)]
+
+
+class TestSimilarityKernels:
+    """Kernels agree with difflib and a reference DP."""
+
+    def test_sequence_ratio_identical_to_difflib(self):
+        for a, b in _pairs(5000):
+            assert sequence_ratio(a, b) == SequenceMatcher(None, a, b).ratio()
+            assert sequence_ratio(a, b, index_positions(b)) == SequenceMatcher(None, a, b).ratio()
+
+    def test_sequence_ratio_long_strings_fall_back_to_difflib(self):
+        a, b = "AB" * 150, "BA" * 150
+        assert sequence_ratio(a, b) == SequenceMatcher(None, a, b).ratio()
+
+    def test_levenshtein_matches_dp(self):
+        for a, b in _pairs(3000, max_len=70):
+            assert levenshtein(a, b) == _dp_levenshtein(a, b)
+
+    def test_indel_ratio_bounds_sequence_ratio(self):
+        for a, b in _pairs(3000):
+            assert indel_ratio(a, b) >= sequence_ratio(a, b)
+        assert lcs_length("ABC123", "AC13") == 4
+
+    def test_backends_registered(self):
+        assert set(SIMILARITY_BACKENDS) == {"difflib", "compat", "indel", "levenshtein"}
+        with pytest.raises(ValueError):
+            get_similarity("nope")
+
+    def test_matcher_compat_backend_matches_difflib_backend(self):
+        plates = [a for a, _ in _pairs(300, alphabet="ABCO0158", seed=4) if a]
+        compat = PlateMatcher(plates)
+        reference = PlateMatcher(plates, backend="difflib")
+        for query, _ in _pairs(30, alphabet="ABCO0158", seed=8):
+            assert compat.all_above(query, 0.5) == reference.all_above(query, 0.5)
+            assert compat.best_match(query, scorer="optical") == reference.best_match(query, scorer="optical")
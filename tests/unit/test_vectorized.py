@@ -0,0 +1,48 @@
+"""Unit tests for the NumPy batch position score."""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.matching import PlateMatcher, position_score, OPTICAL
+from src.matching.vectorized import PositionScoreBatch
+
+
+def _noisy_plates(n, seed=11):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGILOSTZabglqsz0123456789"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 10))) for _ in range(n)]
+
+
+class TestPositionScoreBatch:
+    """Batch scores are identical to the scalar position_score."""
+
+    def test_scores_identical_to_scalar(self):
+        plates = _noisy_plates(2000)
+        batch = PositionScoreBatch(plates)
+        for query in _noisy_plates(50, seed=5) + ["", "ABC12O", "abc120"]:
+            scores = batch.scores(query).tolist()
+            assert scores == [position_score(query, plate) for plate in plates]
+
+    def test_non_ascii_plates_use_scalar_path(self):
+        plates = ["ABC123", "ÄBC123", "ABC12O"]
+        batch = PositionScoreBatch(plates)
+        assert batch.scores("ABC120").tolist() == [position_score("ABC120", p) for p in plates]
+        assert batch.scores("ÄBC120") is None
+
+    def test_matcher_vectorized_matches_scalar(self):
+        plates = _noisy_plates(500)
+        fast = PlateMatcher(plates)
+        slow = PlateMatcher(plates, vectorize=False)
+        assert fast.vectorize is True
+        for query in _noisy_plates(30, seed=2):
+            assert fast.best_match(query, scorer=OPTICAL) == slow.best_match(query, scorer=OPTICAL)
+            assert fast.position_scores(query) == slow.position_scores(query)
+
+    def test_matcher_rebuilds_batch_after_change(self):
+        matcher = PlateMatcher(["ABC123"])
+        assert matcher.best_match("XYZ78g", scorer=OPTICAL)[0] is None
+        matcher.add("XYZ789")
+        assert matcher.best_match("XYZ78g", scorer=OPTICAL)[0] == "XYZ789"